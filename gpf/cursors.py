@@ -24,7 +24,17 @@ but there are some differences:
       similar to their legacy predecessors;
     - The ported :func:`getValue` function can return a *default* value when the field was not found
       (in the legacy function, it would raise an exception);
-    - The cursors *where_clause* argument also accepts a :class:`gpf.tools.queries.Where` instance.
+    - The cursors *where_clause* argument also accepts a :class:`gpf.tools.queries.Where` instance;
+    - The SearchCursor can fetch rows in batches or as columns (see :func:`SearchCursor.fetch_batches` and
+      :func:`SearchCursor.as_columns`), which avoids the per-row wrapper overhead for large scans;
+    - The SearchCursor can read rows ahead on a background thread (see its *prefetch* keyword);
+    - The SearchCursor can return rows as named tuples (see :func:`SearchCursor.as_namedtuples`) and
+      the Search- and UpdateCursor can return fast positional getters for fields (see :func:`SearchCursor.accessor`);
+    - The InsertCursor can load large amounts of rows in chunks (see :func:`InsertCursor.bulk_insert`);
+    - Rows that match a large list of values can be read or updated chunk by chunk (see :func:`search_in` and
+      :func:`iter_in`), which avoids IN lists that are too large for the database;
+    - All cursors and the Editor accept an optional *profile* keyword, which reports timings (e.g. rows per second
+      and the time spent in ArcPy versus the wrapper) to a :class:`gpf.loggers.Logger` or a callback function.
 
 In theory, one should be able to simply replace the legacy Esri cursors (in an old script, for example)
 with the ones in this module without too much hassle, since all legacy methods have been ported to the cursors
@@ -38,7 +48,19 @@ for the ported functions and the `Data Access classes
 for cursor initialization and function overrides.
 """
 
-from functools import wraps as _wraps
+import keyword as _keyword
+import re as _re
+import sys as _sys
+import weakref as _weakref
+from Queue import Queue as _Queue, Full as _Full
+from array import array as _array
+from collections import OrderedDict as _OrderedDict, namedtuple as _namedtuple
+from functools import partial as _partial, wraps as _wraps
+from itertools import islice as _islice, izip as _izip
+from operator import itemgetter as _itemgetter
+from multiprocessing.pool import ThreadPool as _ThreadPool
+from threading import Thread as _Thread, Event as _Event, Lock as _Lock
+from timeit import default_timer as _timer
 
 import gpf.common.const as _const
 import gpf.common.textutils as _tu
@@ -47,10 +69,108 @@ import gpf.paths as _paths
 import gpf.tools.queries as _q
 from gpf import arcpy as _arcpy
 
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+#: The default number of rows in a batch, as returned by :func:`SearchCursor.fetch_batches` for example.
+BATCH_SIZE = 10000
+
+# Maximum number of rows that a prefetching SearchCursor puts on its queue at once
+_PREFETCH_BLOCK = 1000
+
+# Characters that are not allowed in a named tuple field name (e.g. the "@" in "SHAPE@XY")
+_INVALID_CHARS = _re.compile(r'\W')
+
+# Cache of named tuple types for each tuple of field names (see get_rowtype), of which the least recently used
+# types are removed first when it holds more than _ROWTYPES_SIZE types
+_rowtypes = _OrderedDict()
+_rowtypes_lock = _Lock()
+_ROWTYPES_SIZE = 64
+
+
+class _FieldMap(dict):
+    """
+    Maps (upper case) field names to their position (index) in a row.
+
+    A single field map is shared by all rows of a cursor, so that the field names in order of their position and the
+    positions of requested field names are only determined once for each cursor (and not for each row).
+    """
+
+    __slots__ = 'names', 'positions'
+
+    def __init__(self, field_map):
+        super(_FieldMap, self).__init__(field_map)
+        # Cache of field positions for each field name that was requested (as-is, so that no upper() is required)
+        self.positions = {}
+        # Field names in order of their position (if all positions are taken), so that asDict() can use zip
+        names = sorted(self, key=self.get)
+        self.names = names if [self[n] for n in names] == range(len(names)) else None
+
+    def get_position(self, field):
+        """ Returns the position of the (case-insensitive) *field* or ``None`` if it does not exist. """
+        try:
+            return self.positions[field]
+        except KeyError:
+            pos = self.positions[field] = self.get(field.upper())
+            return pos
+
 
 def _map_fields(fields):
     """ Maps a list of field names to their position (index). """
-    return {f.upper(): i for i, f in enumerate(fields)}
+    return _FieldMap((f.upper(), i) for i, f in enumerate(fields))
+
+
+def _get_identifier(field):
+    """ Returns a valid identifier (e.g. "SHAPE_XY" for "SHAPE@XY") for a field name, for use in a named tuple. """
+    name = _INVALID_CHARS.sub('_', _tu.to_str(field)).lstrip('_')
+    if not name or name[0].isdigit():
+        name = 'F_' + name
+    if _keyword.iskeyword(name):
+        name += '_'
+    return name
+
+
+def _get_accessor(field_map, fields):
+    """ Returns an ``itemgetter`` for the positions of the given *fields* in the *field_map*. """
+    _vld.pass_if(fields, ValueError, 'accessor() requires at least 1 field name')
+    positions = []
+    for field in fields:
+        pos = field_map.get(field.upper())
+        _vld.raise_if(pos is None, ValueError, 'accessor() field {!r} does not exist in the cursor'.format(field))
+        positions.append(pos)
+    return _itemgetter(*positions)
+
+
+def get_rowtype(field_names):
+    """
+    Returns a named tuple type (class) for rows with the given field names, as returned by
+    :func:`SearchCursor.as_namedtuples`. The field names are turned into valid attribute names:
+    invalid characters are replaced by an underscore (e.g. ``OID@`` becomes ``OID_`` and ``SHAPE@XY`` becomes
+    ``SHAPE_XY``). Duplicate names are replaced by their position (e.g. ``_2``).
+    The most recently used types are cached.
+
+    Example:
+
+        >>> Row = get_rowtype(['OID@', 'SHAPE@XY', 'Name'])
+        >>> Row(1, (2.0, 3.0), 'Test')
+        Row(OID_=1, SHAPE_XY=(2.0, 3.0), Name='Test')
+
+    :param field_names: A sequence of field names (e.g. the cursor :attr:`SearchCursor.fields`).
+    :type field_names:  list, tuple
+    :rtype:             type
+    """
+    key = tuple(field_names)
+    with _rowtypes_lock:
+        rowtype = _rowtypes.pop(key, None)
+        if rowtype is None:
+            rowtype = _namedtuple('Row', [_get_identifier(f) for f in key], rename=True)
+        # (Re)insert the type, so that it becomes the most recently used type
+        _rowtypes[key] = rowtype
+        while len(_rowtypes) > _ROWTYPES_SIZE:
+            _rowtypes.popitem(False)
+    return rowtype
 
 
 def _default_tuple(length):
@@ -63,6 +183,24 @@ def _default_list(length):
     return [None for _ in xrange(length)]
 
 
+def _make_column(values):
+    """
+    Turns a sequence of field values into a column array.
+    If NumPy is available, a NumPy array is returned (the data type is inferred from the values).
+    Otherwise, a Python ``array`` is returned for numeric columns without NULL values and a ``tuple`` for the rest.
+    """
+    if _np:
+        return _np.array(values)
+    try:
+        if all(type(v) is float for v in values):
+            return _array('d', values)
+        if all(type(v) in (int, long) for v in values):
+            return _array('l', values)
+    except OverflowError:
+        pass
+    return tuple(values)
+
+
 def _disable(func):
     """ Decorator that raises a NotImplementedError for the 'disabled' wrapped function or method. """
 
@@ -85,6 +223,7 @@ class _Row(object):
     This class is only intended for use by a ``SearchCursor``.
 
     :param field_map:   The field map (name, position) to use for the row value lookup.
+                        Cursors pass their (shared) field map, as returned by :func:`_map_fields`.
     :keyword default:   The iterable type (``list`` or ``tuple``) to use as a data container.
     :type field_map:    dict
     :type default:      type
@@ -93,7 +232,7 @@ class _Row(object):
     __slots__ = '_fieldmap', '_data', '_repr'
 
     def __init__(self, field_map, **kwargs):
-        self._fieldmap = field_map
+        self._fieldmap = field_map if isinstance(field_map, _FieldMap) else _FieldMap(field_map)
         self._data = kwargs.get('default', _default_tuple(len(field_map)))
         self._repr = '({})'
 
@@ -113,6 +252,10 @@ class _Row(object):
         self._data = _default_tuple(len(self._fieldmap)) if row is None else row
         return self
 
+    def _get_position(self, field):
+        """ Returns the position of the (case-insensitive) *field* or ``None`` if it does not exist. """
+        return self._fieldmap.get_position(field)
+
     def getValue(self, field, default=_const.OBJ_EMPTY):
         """
         Returns the value that matches the given *field* name for the current row.
@@ -125,12 +268,15 @@ class _Row(object):
         :raise ValueError:  If *default* is omitted and a value cannot be found.
         :return:            A value (an Esri or Python basic type) or ``None``.
         """
-        try:
-            return self[self._fieldmap[field.upper()]]
-        except (KeyError, IndexError):
-            _vld.raise_if(default is _const.OBJ_EMPTY, ValueError,
-                          'getValue() field {!r} does not exist and no default value was provided'.format(field))
-            return default
+        pos = self._get_position(field)
+        if pos is not None:
+            try:
+                return self._data[pos]
+            except IndexError:
+                pass
+        _vld.raise_if(default is _const.OBJ_EMPTY, ValueError,
+                      'getValue() field {!r} does not exist and no default value was provided'.format(field))
+        return default
 
     def isNull(self, field):
         """
@@ -148,7 +294,10 @@ class _Row(object):
 
         :rtype:     dict
         """
-        return {k: self[i] for k, i in self._fieldmap.iteritems()}
+        names = self._fieldmap.names
+        if names is None:
+            return {k: self[i] for k, i in self._fieldmap.iteritems()}
+        return dict(_izip(names, self._data))
 
 
 # noinspection PyPep8Naming
@@ -184,9 +333,12 @@ class _MutableRow(_Row):
         :param value:       The value to set (must be an Esri or Python basic type).
         :type field:        str, unicode
         """
+        pos = self._get_position(field)
+        if pos is None:
+            return
         try:
-            self[self._fieldmap[field.upper()]] = value
-        except (KeyError, IndexError):
+            self[pos] = value
+        except IndexError:
             pass
 
     def setNull(self, field):
@@ -202,6 +354,240 @@ class _MutableRow(_Row):
         self.setValue(field, None)
 
 
+class InsertStats(object):
+    """
+    Simple counter class that is returned by :func:`InsertCursor.bulk_insert`.
+
+    :ivar rows:     The number of inserted rows.
+    :ivar chunks:   The number of committed chunks (edit operations).
+    :ivar seconds:  The total number of seconds that the insert took.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return '{}(rows={}, chunks={}, seconds={:.3f})'.format(self.__class__.__name__,
+                                                                self.rows, self.chunks, self.seconds)
+
+    @property
+    def rows_per_second(self):
+        """
+        Returns the average insert throughput (rows per second).
+
+        :rtype: float
+        """
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class _Profiler(object):
+    """
+    Collects the timings of a cursor or :class:`Editor` and reports them to a *sink* when :func:`report` is called.
+
+    The *sink* can be a :class:`gpf.loggers.Logger` (or any object with an ``info()`` method),
+    which receives a single formatted message, or a callable, which receives a ``dict`` with all statistics.
+
+    :param sink:            The Logger or callable to report to.
+    :param name:            The name of the profiled object (e.g. "SearchCursor").
+    :param table:           The table (or workspace) on which the object operates.
+    :param where_clause:    The optional where clause text.
+    """
+
+    # Order in which the statistics are reported in a message
+    _KEYS = ('rows', 'edits', 'operations', 'rows_per_second', 'open_seconds', 'arcpy_seconds',
+             'wrapper_seconds', 'commit_seconds', 'close_seconds', 'total_seconds', 'where_clause')
+
+    def __init__(self, sink, name, table, where_clause=None):
+        _vld.raise_if(not (callable(sink) or hasattr(sink, 'info')), ValueError,
+                      'profile should be a Logger or a callable')
+        self._sink = sink
+        self._name = name
+        self._table = table
+        self._start = _timer()
+        self._done = False
+        self.where_clause = where_clause
+        self.open_seconds = 0.0
+        self.arcpy_seconds = 0.0
+        self.wrapper_seconds = 0.0
+        self.commit_seconds = 0.0
+        self.close_seconds = 0.0
+        self.rows = 0
+        self.edits = 0
+        self.operations = 0
+
+    def opened(self):
+        """ Registers that the cursor (or edit session) has been opened, which sets the open time. """
+        self.open_seconds = _timer() - self._start
+
+    def add(self, arcpy_seconds, wrapper_seconds=0.0, rows=1, edits=0):
+        """ Adds the given ArcPy and wrapper time (in seconds) for a number of *rows* (and *edits*). """
+        self.arcpy_seconds += arcpy_seconds
+        self.wrapper_seconds += wrapper_seconds
+        self.rows += rows
+        self.edits += edits
+
+    def as_dict(self):
+        """ Returns all statistics as a ``dict``. """
+        total = _timer() - self._start
+        return {
+            'name': self._name,
+            'table': _tu.to_unicode(self._table),
+            'where_clause': self.where_clause,
+            'rows': self.rows,
+            'edits': self.edits,
+            'operations': self.operations,
+            'rows_per_second': self.rows / total if total else 0.0,
+            'open_seconds': self.open_seconds,
+            'arcpy_seconds': self.arcpy_seconds,
+            'wrapper_seconds': self.wrapper_seconds,
+            'commit_seconds': self.commit_seconds,
+            'close_seconds': self.close_seconds,
+            'total_seconds': total
+        }
+
+    def report(self):
+        """ Reports the statistics to the sink. This only happens once (until :func:`reset` is called). """
+        if self._done:
+            return
+        self._done = True
+        stats = self.as_dict()
+        if hasattr(self._sink, 'info'):
+            values = []
+            for k in self._KEYS:
+                v = stats[k]
+                if not v:
+                    continue
+                values.append(u'{}={}'.format(k, '{:.3f}'.format(v) if isinstance(v, float) else _tu.to_unicode(v)))
+            self._sink.info(u'{} on {}: {}'.format(self._name, stats['table'], u', '.join(values)))
+        else:
+            self._sink(stats)
+
+    def reset(self):
+        """ Resets all counters, so that the profiler can report again. """
+        self.__init__(self._sink, self._name, self._table, self.where_clause)
+
+
+def _get_profiler(kwargs, name, table):
+    """ Pops the *profile* keyword from *kwargs* and returns a :class:`_Profiler` for it (or ``None``). """
+    sink = kwargs.pop('profile', None)
+    if not sink:
+        return None
+    return _Profiler(sink, name, table, kwargs.get('where_clause'))
+
+
+class _Prefetcher(object):
+    """
+    Iterator that reads rows ahead on a background thread (using the *next_func* of a cursor) and puts them on a
+    bounded queue in blocks, so that reading the rows and processing them can overlap.
+    If reading fails, the exception is raised again in the thread that iterates over the rows.
+
+    The background thread is started when the first row is requested. It stops when all rows have been read,
+    when :func:`close` is called or when the iterator is garbage collected. The thread only references the cursor
+    (weakly) while it reads a block of rows, so that an abandoned cursor and its iterator can be garbage collected.
+
+    :param cursor:      The cursor from which the rows are read. The cursor must support weak references.
+    :param next_func:   The (unbound) function that returns the next row of the *cursor*
+                        (and raises ``StopIteration`` if there are no more rows).
+    :param size:        The (approximate) maximum number of rows that are read ahead.
+    """
+
+    def __init__(self, cursor, next_func, size):
+        self._blocksize = max(1, min(size, _PREFETCH_BLOCK))
+        self._queue = _Queue(max(1, size // self._blocksize))
+        self._source = _weakref.ref(cursor), next_func
+        self._rows = iter(())
+        self._done = False
+        self._stopped = _Event()
+        self._thread = None
+
+    def __del__(self):
+        # Only signal the thread to stop: this may be called on the background thread itself
+        self._stopped.set()
+
+    def __iter__(self):
+        return self
+
+    @staticmethod
+    def _put(queue, stopped, item):
+        """ Puts an item on the queue. Returns ``False`` if the iterator was stopped while waiting for a free slot. """
+        while not stopped.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except _Full:
+                continue
+        return False
+
+    @staticmethod
+    def _run(cursor_ref, next_func, queue, stopped, blocksize):
+        """
+        Reads all rows in blocks and puts them on the queue, followed by ``None`` or the exception info.
+        This function does not reference the iterator itself, so that it can be garbage collected.
+        """
+        put = _Prefetcher._put
+        cursor = None
+        block = []
+        try:
+            while True:
+                cursor = cursor_ref()
+                if cursor is None:
+                    # The cursor has been garbage collected, so there are no more rows
+                    break
+                block = []
+                # list.extend() keeps the rows that were read before a failure
+                block.extend(_islice(iter(_partial(next_func, cursor), _const.OBJ_EMPTY), blocksize))
+                cursor = None
+                if block and not put(queue, stopped, block):
+                    return
+                if len(block) < blocksize:
+                    break
+                block = []
+            put(queue, stopped, None)
+        except Exception:
+            cursor = None
+            exc_info = _sys.exc_info()
+            # Return the rows that were read before the failure first
+            if block and not put(queue, stopped, block):
+                return
+            put(queue, stopped, exc_info)
+
+    def next(self):
+        for row in self._rows:
+            return row
+        if self._done:
+            raise StopIteration
+        if self._thread is None:
+            cursor_ref, next_func = self._source
+            self._thread = _Thread(target=self._run,
+                                   args=(cursor_ref, next_func, self._queue, self._stopped, self._blocksize))
+            self._thread.daemon = True
+            self._thread.start()
+        item = self._queue.get()
+        if isinstance(item, list):
+            self._rows = iter(item)
+            return self._rows.next()
+
+        # All rows have been read (or reading failed), so the background thread has finished
+        self._done = True
+        self._thread.join()
+        if item is None:
+            raise StopIteration
+        raise item[0], item[1], item[2]
+
+    def close(self):
+        """ Stops reading rows and waits for the background thread (if started) to finish. """
+        self._done = True
+        self._rows = iter(())
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+        # Release the blocks of rows that were read ahead
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+
 # noinspection PyPep8Naming, PyUnusedLocal
 class Editor(_arcpy.da.Editor):
     """
@@ -229,18 +615,70 @@ class Editor(_arcpy.da.Editor):
         For versioned workspaces, this setting has no effect (always ``True``).
         For all other workspaces, having this value set to ``False`` improves performance.
 
+    **Keyword params:**
+
+    -   **chunk_size** (int):
+
+        If set, the Editor runs in *chunked mode* and commits the current edit operation (and starts a new one)
+        after every *chunk_size* edits. Edits are counted by :func:`tick`, which is called automatically by
+        the :class:`InsertCursor` and :class:`UpdateCursor` when they are initialized with this Editor
+        (using their *editor* keyword).
+        This keeps the edit operations (and for versioned databases, the undo stack and state tree) small.
+
+    -   **interval** (int, float):
+
+        If set, the Editor runs in *chunked mode* and commits the current edit operation (and starts a new one)
+        when it has been open for more than *interval* seconds. This can be combined with *chunk_size*.
+
+    -   **on_commit** (function):
+
+        An optional callback function that is called after each :func:`commit`.
+        The function receives the number of edits in the committed operation as its only argument.
+
+    -   **profile** (:class:`gpf.loggers.Logger`, function):
+
+        If set, the Editor reports the edit session timings (start, commit and stop time, number of operations and
+        registered edits) to the given Logger or callback function when the edit session is stopped.
+        A Logger receives a formatted info message, whereas a callback function receives a ``dict`` of statistics.
+
+    :raises ValueError: If an unsupported keyword argument or an invalid keyword value was specified.
+
+    Example of a chunked edit session:
+
+        >>> with Editor('C:/Temp/test.sde', chunk_size=50000) as editor:
+        >>>     with UpdateCursor('C:/Temp/test.sde/user.my_table', ['Field1'], editor=editor) as cursor:
+        >>>         for row in cursor:
+        >>>             row.setValue('Field1', 'test')
+        >>>             cursor.updateRow(row)
+
     .. note::           The :class:`InsertCursor` and :class:`UpdateCursor` in this module use the Editor on demand,
                         if these cursors are initialized with the *auto_edit* option set to ``True`` (default).
     .. seealso::        https://desktop.arcgis.com/en/arcmap/latest/analyze/arcpy-data-access/editor.htm
     """
 
-    def __init__(self, path, with_undo=False):
+    # Supported keyword arguments
+    _KWARGS = frozenset(('chunk_size', 'interval', 'on_commit', 'profile'))
+
+    def __init__(self, path, with_undo=False, **kwargs):
+        unsupported = sorted(frozenset(kwargs) - self._KWARGS)
+        _vld.pass_if(not unsupported, ValueError,
+                     'Unsupported Editor keyword argument(s): {}'.format(', '.join(unsupported)))
         if not isinstance(path, _paths.Workspace):
             path = _paths.get_workspace(path, True)
         super(Editor, self).__init__(str(path))
         self._versioned = (len(_arcpy.da.ListVersions(str(path))) > 1) if path.is_remote else False
         # If the database is versioned, always use the undo stack
         self._undo = self._versioned or with_undo
+        self._chunksize = kwargs.get('chunk_size') or 0
+        self._interval = kwargs.get('interval') or 0
+        self._callback = kwargs.get('on_commit')
+        _vld.raise_if(self._chunksize < 0 or self._interval < 0, ValueError,
+                      'Editor chunk_size and interval should be positive numbers')
+        _vld.raise_if(self._callback and not callable(self._callback), ValueError,
+                      'Editor on_commit should be a callable')
+        self._edits = 0
+        self._opstart = _timer()
+        self._profiler = _get_profiler(kwargs, self.__class__.__name__, path)
 
     def __enter__(self):
         self.start(self._undo)
@@ -263,10 +701,17 @@ class Editor(_arcpy.da.Editor):
         if self.isEditing:
             # If the Editor already is in an editing state, do nothing
             return
+        if self._profiler:
+            self._profiler.reset()
         # If the database is versioned, always use the undo stack
         self._undo = self._versioned or with_undo
         super(Editor, self).startEditing(self._undo, self._versioned)
         super(Editor, self).startOperation()
+        self._edits = 0
+        self._opstart = _timer()
+        if self._profiler:
+            self._profiler.opened()
+            self._profiler.operations += 1
 
     def stop(self, save=True):
         """
@@ -282,6 +727,7 @@ class Editor(_arcpy.da.Editor):
         if not self.isEditing:
             # If the Editor is not in an editing state, do nothing
             return
+        start = _timer()
         if save:
             super(Editor, self).stopOperation()
         else:
@@ -290,6 +736,51 @@ class Editor(_arcpy.da.Editor):
             else:
                 super(Editor, self).abortOperation()
         super(Editor, self).stopEditing(save)
+        if self._profiler:
+            self._profiler.close_seconds = _timer() - start
+            self._profiler.edits += self._edits
+            self._profiler.report()
+
+    def commit(self, edits=0):
+        """
+        Stops the current edit operation (so that its edits are committed when the edit session is saved)
+        and immediately starts a new one. The edit session itself remains open.
+        If the Editor is not in an editing state, this method will do nothing.
+
+        Calling this method every once in a while during large edits keeps the edit operations (and the memory
+        that they claim) small.
+
+        :param edits:   The number of edits in the operation that have not been registered using :func:`tick`.
+        :type edits:    int
+        """
+        if not self.isEditing:
+            return
+        start = _timer()
+        super(Editor, self).stopOperation()
+        super(Editor, self).startOperation()
+        edits += self._edits
+        self._edits = 0
+        self._opstart = _timer()
+        if self._profiler:
+            self._profiler.commit_seconds += self._opstart - start
+            self._profiler.operations += 1
+            self._profiler.edits += edits
+        if self._callback:
+            self._callback(edits)
+
+    def tick(self, count=1):
+        """
+        Registers *count* edits in the current edit operation.
+        If the Editor runs in chunked mode (*chunk_size* and/or *interval* were set), the operation is committed
+        when the number of edits or the time since the operation started exceeds the limit (see :func:`commit`).
+
+        :param count:   The number of edits to register (default = 1).
+        :type count:    int
+        """
+        self._edits += count
+        if (self._chunksize and self._edits >= self._chunksize) or \
+                (self._interval and _timer() - self._opstart >= self._interval):
+            self.commit()
 
     @_disable
     def startEditing(self, *args): pass
@@ -349,18 +840,167 @@ class SearchCursor(_arcpy.da.SearchCursor):
         An optional sequence of 2 elements, containing a SQL prefix and postfix query respectively.
         These queries support clauses like GROUP BY, DISTINCT, ORDER BY and so on.
         The clauses do not support the use of :class:`gpf.tools.queries.Where` instances.
+
+    -   **profile** (:class:`gpf.loggers.Logger`, function):
+
+        If set, the cursor reports its timings (open time, rows per second, time spent in ArcPy and in the wrapper)
+        and the where clause to the given Logger or callback function, once all rows have been read or when the
+        cursor is closed. A Logger receives a formatted info message, a callback function a ``dict`` of statistics.
+
+    -   **prefetch** (int):
+
+        If set, (approximately) *prefetch* rows are read ahead on a background thread, while the caller processes
+        the rows that have already been read. This is useful for remote (SDE) data sources, where the time spent
+        waiting for the database and the time spent processing the rows can then overlap.
+        The background thread is started when the first row is requested. If reading the rows fails, the error is
+        raised when the next row is requested.
+        Use the cursor in a ``with`` statement, so that the background thread is stopped as soon as possible.
+        Note that the underlying ArcPy cursor is then driven from another thread than the one that created it.
+        Esri does not document this as supported, so do not use this option with data sources (or in applications,
+        e.g. ArcMap) that require all cursor calls to be made on the same thread.
+
+    .. note::   Iterating over the cursor returns a :class:`_Row` for each record. For very large tables,
+                consider using :func:`fetch_batches` or :func:`as_columns` instead, which return plain row tuples
+                or column arrays for a whole block of records at once.
     """
 
     def __init__(self, datatable, field_names=_const.CHAR_ASTERISK, where_clause=None, **kwargs):
+        self._prefetch = kwargs.pop('prefetch', None) or 0
+        self._fetcher = None
+        _vld.raise_if(self._prefetch < 0, ValueError, 'SearchCursor prefetch should be a positive integer')
         _q.add_where(kwargs, where_clause, datatable)
+        self._profiler = _get_profiler(kwargs, self.__class__.__name__, datatable)
         super(SearchCursor, self).__init__(datatable, field_names, **kwargs)
         self._row = _Row(_map_fields(self.fields))
+        if self._profiler:
+            self._profiler.opened()
+        if self._prefetch:
+            self._fetcher = _Prefetcher(self, _arcpy.da.SearchCursor.next, self._prefetch)
 
     def __iter__(self):
         return super(SearchCursor, self).__iter__()
 
     def next(self):
-        return self._row(super(SearchCursor, self).next())
+        if not self._profiler:
+            return self._row(self._fetcher.next() if self._fetcher else super(SearchCursor, self).next())
+        start = _timer()
+        try:
+            values = self._fetcher.next() if self._fetcher else super(SearchCursor, self).next()
+        except StopIteration:
+            self._profiler.add(_timer() - start, rows=0)
+            self._profiler.report()
+            raise
+        fetched = _timer()
+        row = self._row(values)
+        self._profiler.add(fetched - start, _timer() - fetched)
+        return row
+
+    def _iter_raw(self):
+        """ Returns an iterator over the (remaining) plain row tuples, bypassing the :class:`_Row` wrapper. """
+        if self._fetcher:
+            return self._fetcher
+        return iter(super(SearchCursor, self).next, _const.OBJ_EMPTY)
+
+    def _stop_prefetch(self):
+        """ Stops the background thread that reads rows ahead (if any). """
+        if self._fetcher:
+            self._fetcher.close()
+            self._fetcher = None
+
+    def fetch_batches(self, size=BATCH_SIZE):
+        """
+        Returns a generator of row batches, where each batch is a ``list`` of (at most) *size* plain row tuples.
+        The tuples are returned as-is by ArcPy, which means that they do not have a :func:`_Row.getValue` method.
+
+        Example:
+
+            >>> with SearchCursor('C:/Temp/test.gdb/my_table', ['OID@', 'Field1']) as rows:
+            >>>     for batch in rows.fetch_batches(5000):
+            >>>         process(batch)  # batch is a list of 5000 (OID, Field1) tuples (or less for the last batch)
+
+        :param size:    The maximum number of rows in each batch. Defaults to :data:`BATCH_SIZE`.
+        :type size:     int
+        :rtype:         generator
+        """
+        _vld.pass_if(size > 0, ValueError, 'fetch_batches() size must be a positive integer')
+        rows = self._iter_raw()
+        while True:
+            start = _timer()
+            batch = list(_islice(rows, size))
+            if self._profiler:
+                self._profiler.add(_timer() - start, rows=len(batch))
+            if not batch:
+                if self._profiler:
+                    self._profiler.report()
+                return
+            yield batch
+
+    def as_columns(self, size=BATCH_SIZE):
+        """
+        Returns a generator of column blocks for (at most) *size* rows at a time.
+        Each block is a ``tuple`` that contains an array of values for each cursor field (in cursor field order).
+
+        If NumPy is available, each column will be a NumPy array (of which the data type is inferred from the values).
+        Otherwise, numeric columns without NULL values become Python ``array`` objects and all other columns a
+        ``tuple`` of values.
+
+        Example:
+
+            >>> with SearchCursor('C:/Temp/test.gdb/my_table', ['OID@', 'LENGTH']) as rows:
+            >>>     for oids, lengths in rows.as_columns():
+            >>>         print(sum(lengths))
+
+        :param size:    The maximum number of rows in each column block. Defaults to :data:`BATCH_SIZE`.
+        :type size:     int
+        :rtype:         generator
+        """
+        for batch in self.fetch_batches(size):
+            yield tuple(_make_column(column) for column in zip(*batch))
+
+    def as_namedtuples(self, size=BATCH_SIZE):
+        """
+        Returns a generator of named tuples (see :func:`get_rowtype`) for the (remaining) rows, which are read
+        in batches of *size* rows (see :func:`fetch_batches`). The values can be accessed by position or by
+        attribute name, which is faster than calling :func:`_Row.getValue` and the named tuples can be kept
+        (e.g. in a list), whereas the :class:`_Row` wrapper is reused for each row.
+
+        Example:
+
+            >>> with SearchCursor('C:/Temp/test.gdb/my_table', ['OID@', 'Field1']) as rows:
+            >>>     for row in rows.as_namedtuples():
+            >>>         print(row.OID_, row.Field1)
+
+        :param size:    The number of rows that are read at once. Defaults to :data:`BATCH_SIZE`.
+        :type size:     int
+        :rtype:         generator
+        """
+        make_row = get_rowtype(self.fields)._make
+        for batch in self.fetch_batches(size):
+            for row in batch:
+                yield make_row(row)
+
+    def accessor(self, *fields):
+        """
+        Returns a function that gets the value of *fields* from a row (i.e. ``operator.itemgetter`` for the
+        field positions). This works for the rows returned by the cursor as well as for the plain row tuples returned
+        by :func:`fetch_batches`. If multiple fields are specified, the function returns a tuple of values.
+
+        Because the field positions are resolved only once, this is faster than calling :func:`_Row.getValue`
+        for each row.
+
+        Example:
+
+            >>> with SearchCursor('C:/Temp/test.gdb/my_table', ['OID@', 'ASSET_ID']) as rows:
+            >>>     get_asset_id = rows.accessor('ASSET_ID')
+            >>>     for row in rows:
+            >>>         print(get_asset_id(row))
+
+        :param fields:      One or more (case-insensitive) field names.
+        :type fields:       str, unicode
+        :rtype:             operator.itemgetter
+        :raises ValueError: If no fields were specified or if a field does not exist in the cursor.
+        """
+        return _get_accessor(self._row._fieldmap, fields)
 
     @property
     def fields(self):
@@ -373,19 +1013,28 @@ class SearchCursor(_arcpy.da.SearchCursor):
 
     def reset(self):
         """ Resets the cursor position to the first row so it can be iterated over again. """
-        return super(SearchCursor, self).reset()
+        if self._profiler:
+            self._profiler.report()
+            self._profiler.reset()
+        self._stop_prefetch()
+        result = super(SearchCursor, self).reset()
+        if self._prefetch:
+            self._fetcher = _Prefetcher(self, _arcpy.da.SearchCursor.next, self._prefetch)
+        return result
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        return
+        self._stop_prefetch()
+        if self._profiler:
+            self._profiler.report()
 
 
 # noinspection PyPep8Naming
 class InsertCursor(_arcpy.da.InsertCursor):
     """
-    InsertCursor(in_table, field_names, {auto_edit})
+    InsertCursor(in_table, field_names, {auto_edit}, {editor})
 
     Wrapper class to properly expose ArcPy's Data Access InsertCursor and its methods.
     Returns a cursor to insert new records into a table.
@@ -406,21 +1055,38 @@ class InsertCursor(_arcpy.da.InsertCursor):
     -   **auto_edit** (bool):
 
         If set to ``True`` (default), an edit session is started automatically, if required.
+
+    -   **editor** (:class:`Editor`):
+
+        An optional (started) Editor that should be notified of each edit (see :func:`Editor.tick`).
+        Use this with an Editor in chunked mode to commit the edits in chunks.
+
+    -   **profile** (:class:`gpf.loggers.Logger`, function):
+
+        If set, the cursor reports its timings (open time, rows per second, time spent in ArcPy and in the wrapper)
+        to the given Logger or callback function when the cursor is closed. If the cursor starts its own edit session,
+        the Editor reports its timings as well. A Logger receives a formatted info message,
+        whereas a callback function receives a ``dict`` of statistics.
     """
 
     def __init__(self, datatable, field_names, **kwargs):
         self._editor = None
+        self._tracker = kwargs.get('editor')
+        sink = kwargs.get('profile')
+        self._profiler = _get_profiler(kwargs, self.__class__.__name__, datatable)
         try:
             super(InsertCursor, self).__init__(datatable, field_names)
         except RuntimeError as e:
             if 'edit session' in str(e).lower() and kwargs.get('auto_edit', True):
-                self._editor = Editor(datatable)
+                self._editor = Editor(datatable, profile=sink)
                 self._editor.start()
                 super(InsertCursor, self).__init__(datatable, field_names)
-                return
-            raise
+            else:
+                raise
 
         self._field_map = _map_fields(self.fields)
+        if self._profiler:
+            self._profiler.opened()
 
     @property
     def fields(self):
@@ -448,6 +1114,7 @@ class InsertCursor(_arcpy.da.InsertCursor):
 
         # Although it would be more efficient to initialize _MutableRow once and simply call it
         # to set its values, this might not be what the user expects. Therefore, we (re)initialize it each time.
+        # This is cheap, because all rows share the field map (and its field name positions) of the cursor.
         if isinstance(values, dict):
             row = _MutableRow(self._field_map)
             for k, v in values.iteritems():
@@ -466,9 +1133,88 @@ class InsertCursor(_arcpy.da.InsertCursor):
         :return:    The ObjectID of the inserted row (when successful).
         :rtype:     int
         """
-        return super(InsertCursor, self).insertRow(row)
+        if self._profiler:
+            start = _timer()
+            result = super(InsertCursor, self).insertRow(row)
+            self._profiler.add(_timer() - start)
+        else:
+            result = super(InsertCursor, self).insertRow(row)
+        if self._tracker:
+            self._tracker.tick()
+        return result
+
+    def bulk_insert(self, rows, chunk_size=BATCH_SIZE, editor=None):
+        """
+        Inserts all rows from an iterable (e.g. a list or generator) and returns an :class:`InsertStats` instance.
+
+        Rows can be ``tuple`` or ``list`` values in the correct ``InsertCursor`` field order, or ``dict`` rows
+        with (case-insensitive) field names as keys. Unlike :func:`newRow`, this function does not create a new
+        row object for each record: ``tuple`` and ``list`` rows are passed as-is, and ``dict`` rows are copied into
+        a single reusable buffer. Field positions for ``dict`` keys are only resolved once.
+        Keys that do not match any of the cursor fields are ignored and missing fields are set to ``None``.
+
+        If an *editor* is specified (here or during cursor initialization) or if the cursor started its own
+        edit session (*auto_edit*), the edit operation is committed every *chunk_size* rows (see :func:`Editor.commit`).
+
+        Example:
+
+            >>> with InsertCursor('C:/Temp/test.gdb/my_table', ['Field1', 'Field2']) as cursor:
+            >>>     stats = cursor.bulk_insert(({'field1': i, 'field2': 'test'} for i in xrange(5000000)))
+            >>> print(stats)
+            InsertStats(rows=5000000, chunks=500, seconds=123.456)
+
+        :param rows:        An iterable of rows to insert.
+        :param chunk_size:  The number of rows after which the edit operation is committed (default = 10000).
+                            If set to 0 or ``None``, no intermediate commits take place.
+        :param editor:      An optional :class:`Editor` to use for the intermediate commits.
+                            Defaults to the *editor* of the cursor or the Editor that was started by the cursor itself.
+        :type chunk_size:   int
+        :type editor:       Editor
+        :rtype:             InsertStats
+        """
+        stats = InsertStats()
+        editor = editor or self._tracker or self._editor
+        chunk_size = (chunk_size or 0) if editor else 0
+        insert = super(InsertCursor, self).insertRow
+        profiler = self._profiler
+        arcpy_seconds = profiler.arcpy_seconds if profiler else 0.0
+        buffer = _default_list(len(self._field_map))
+        defaults = tuple(buffer)
+        positions = {}
+
+        start = _timer()
+        for row in rows:
+            if isinstance(row, dict):
+                buffer[:] = defaults
+                for k, v in row.iteritems():
+                    pos = positions.get(k, _const.OBJ_EMPTY)
+                    if pos is _const.OBJ_EMPTY:
+                        pos = positions[k] = self._field_map.get(k.upper())
+                    if pos is not None:
+                        buffer[pos] = v
+                row = buffer
+            if profiler:
+                insert_start = _timer()
+                insert(row)
+                profiler.add(_timer() - insert_start)
+            else:
+                insert(row)
+            stats.rows += 1
+            if chunk_size and stats.rows % chunk_size == 0:
+                editor.commit(chunk_size)
+                stats.chunks += 1
+
+        if chunk_size and stats.rows % chunk_size:
+            editor.commit(stats.rows % chunk_size)
+            stats.chunks += 1
+        stats.seconds = _timer() - start
+        if profiler:
+            profiler.wrapper_seconds += stats.seconds - (profiler.arcpy_seconds - arcpy_seconds)
+        return stats
 
     def _close(self, save):
+        if self._profiler:
+            self._profiler.report()
         if self._editor:
             self._editor.stop(save)
 
@@ -529,28 +1275,59 @@ class UpdateCursor(_arcpy.da.UpdateCursor):
     -   **auto_edit** (bool):
 
         If set to ``True`` (default), an edit session is started automatically, if required.
+
+    -   **editor** (:class:`Editor`):
+
+        An optional (started) Editor that should be notified of each edit (see :func:`Editor.tick`).
+        Use this with an Editor in chunked mode to commit the edits in chunks.
+
+    -   **profile** (:class:`gpf.loggers.Logger`, function):
+
+        If set, the cursor reports its timings (open time, rows per second, time spent in ArcPy and in the wrapper)
+        to the given Logger or callback function once all rows have been read or when the cursor is closed.
+        If the cursor starts its own edit session, the Editor reports its timings as well. A Logger receives a formatted info message,
+        whereas a callback function receives a ``dict`` of statistics.
     """
 
     def __init__(self, datatable, field_names, where_clause=None, **kwargs):
         self._editor = None
+        self._profiler = None
+        self._tracker = kwargs.pop('editor', None)
+        auto_edit = kwargs.pop('auto_edit', True)
+        sink = kwargs.get('profile')
         _q.add_where(kwargs, where_clause, datatable)
+        self._profiler = _get_profiler(kwargs, self.__class__.__name__, datatable)
         try:
             super(UpdateCursor, self).__init__(datatable, field_names, **kwargs)
         except RuntimeError as e:
-            if 'edit session' in str(e).lower() and kwargs.get('auto_edit', True):
-                self._editor = Editor(datatable)
+            if 'edit session' in str(e).lower() and auto_edit:
+                self._editor = Editor(datatable, profile=sink)
                 self._editor.start()
                 super(UpdateCursor, self).__init__(datatable, field_names, **kwargs)
             else:
                 raise
 
         self._row = _MutableRow(_map_fields(self.fields))
+        if self._profiler:
+            self._profiler.opened()
 
     def __iter__(self):
         return super(UpdateCursor, self).__iter__()
 
     def next(self):
-        return self._row(super(UpdateCursor, self).next())
+        if not self._profiler:
+            return self._row(super(UpdateCursor, self).next())
+        start = _timer()
+        try:
+            values = super(UpdateCursor, self).next()
+        except StopIteration:
+            self._profiler.add(_timer() - start, rows=0)
+            self._profiler.report()
+            raise
+        fetched = _timer()
+        row = self._row(values)
+        self._profiler.add(fetched - start, _timer() - fetched)
+        return row
 
     @property
     def fields(self):
@@ -561,6 +1338,18 @@ class UpdateCursor(_arcpy.da.UpdateCursor):
         """
         return super(UpdateCursor, self).fields
 
+    def accessor(self, *fields):
+        """
+        Returns a function that gets the value of *fields* from a row (i.e. ``operator.itemgetter`` for the
+        field positions). See :func:`SearchCursor.accessor` for more information.
+
+        :param fields:      One or more (case-insensitive) field names.
+        :type fields:       str, unicode
+        :rtype:             operator.itemgetter
+        :raises ValueError: If no fields were specified or if a field does not exist in the cursor.
+        """
+        return _get_accessor(self._row._fieldmap, fields)
+
     def reset(self):
         """ Resets the cursor position to the first row so it can be iterated over again. """
         return super(UpdateCursor, self).reset()
@@ -573,7 +1362,15 @@ class UpdateCursor(_arcpy.da.UpdateCursor):
         :return:    The ObjectID of the deleted row (when successful).
         :rtype:     int
         """
-        return super(UpdateCursor, self).deleteRow()
+        if self._profiler:
+            start = _timer()
+            result = super(UpdateCursor, self).deleteRow()
+            self._profiler.add(_timer() - start, rows=0, edits=1)
+        else:
+            result = super(UpdateCursor, self).deleteRow()
+        if self._tracker:
+            self._tracker.tick()
+        return result
 
     def updateRow(self, row):
         """
@@ -584,9 +1381,19 @@ class UpdateCursor(_arcpy.da.UpdateCursor):
         :return:    The ObjectID of the updated row (when successful).
         :rtype:     int
         """
-        return super(UpdateCursor, self).updateRow(row)
+        if self._profiler:
+            start = _timer()
+            result = super(UpdateCursor, self).updateRow(row)
+            self._profiler.add(_timer() - start, rows=0, edits=1)
+        else:
+            result = super(UpdateCursor, self).updateRow(row)
+        if self._tracker:
+            self._tracker.tick()
+        return result
 
     def _close(self, save):
+        if self._profiler:
+            self._profiler.report()
         if self._editor:
             self._editor.stop(save)
             self._editor = None
@@ -599,3 +1406,128 @@ class UpdateCursor(_arcpy.da.UpdateCursor):
 
     def __del__(self):
         self._close(True)
+
+
+def _get_inclauses(datatable, in_field, values, where_clause, chunk_size):
+    """ Returns a where clause (text) for each chunk of IN values, combined with the optional *where_clause*. """
+    kwargs = {}
+    _q.add_where(kwargs, where_clause, datatable)
+    base_clause = kwargs.get(_q.WHERE_KWARG)
+    clauses = []
+    for chunk in _q.split_in(in_field, values, chunk_size):
+        chunk.delimit_fields(datatable)
+        clause = unicode(chunk)
+        clauses.append(u'({}) {} {}'.format(base_clause, _const.TEXT_AND.upper(), clause) if base_clause else clause)
+    return clauses
+
+
+def _fetch_rows(args):
+    """ Reads all rows for a single where clause and returns them as a list of plain row tuples. """
+    datatable, field_names, where_clause, kwargs = args
+    with SearchCursor(datatable, field_names, where_clause, **kwargs) as rows:
+        return list(rows._iter_raw())
+
+
+def iter_in(cursor_type, datatable, field_names, in_field, values, where_clause=None,
+            chunk_size=_q.MAX_IN_SIZE, **kwargs):
+    """
+    Opens a cursor of type *cursor_type* (i.e. :class:`SearchCursor` or :class:`UpdateCursor`) for each chunk of
+    (at most) *chunk_size* values in *values* and returns a generator of these cursors.
+    This makes it possible to query (and update) the rows where *in_field* matches any value in a very large list,
+    without exceeding the maximum number of values in an IN list (see :func:`gpf.tools.queries.split_in`).
+    Each cursor is closed as soon as the next one is requested.
+
+    Example:
+
+        >>> for cursor in iter_in(UpdateCursor, 'C:/Temp/test.gdb/pipes', ['ID', 'STATUS'], 'ID', many_ids):
+        >>>     for row in cursor:
+        >>>         row.setValue('STATUS', 'inactive')
+        >>>         cursor.updateRow(row)
+
+    :param cursor_type:     The cursor class to open (:class:`SearchCursor` or :class:`UpdateCursor`).
+    :param datatable:       The path to the feature class or table.
+    :param field_names:     The field names to read.
+    :param in_field:        The name of the field that should match any of the *values*.
+    :param values:          An iterable of values (with similar data types) to match.
+    :param where_clause:    An optional where clause that is combined (AND) with each IN clause.
+    :param chunk_size:      The maximum number of values per cursor. Defaults to :data:`gpf.tools.queries.MAX_IN_SIZE`.
+    :param kwargs:          Optional keyword arguments for the cursor (e.g. *spatial_reference*, *editor*).
+    :type where_clause:     str, unicode, gpf.tools.queries.Where
+    :type chunk_size:       int
+    :rtype:                 generator
+
+    .. note::   When an UpdateCursor is used, the edits of each chunk are saved when the cursor is closed,
+                even if the iteration is stopped early. If an exception is thrown into the generator,
+                the edits of the current chunk are rolled back instead. Because an exception that is raised
+                in the body of the ``for`` loop does not reach the generator, use the cursor as a context manager
+                (``with cursor:``) in the loop body to roll back the edits of a chunk that failed.
+    """
+    for clause in _get_inclauses(datatable, in_field, values, where_clause, chunk_size):
+        cursor = cursor_type(datatable, field_names, clause, **kwargs)
+        try:
+            yield cursor
+        except GeneratorExit:
+            # The iteration was stopped early: save the edits
+            cursor.__exit__(None, None, None)
+            raise
+        except BaseException:
+            exc_info = _sys.exc_info()
+            cursor.__exit__(*exc_info)
+            raise exc_info[0], exc_info[1], exc_info[2]
+        else:
+            cursor.__exit__(None, None, None)
+        finally:
+            del cursor
+
+
+def search_in(datatable, field_names, in_field, values, where_clause=None,
+              chunk_size=_q.MAX_IN_SIZE, max_workers=1, **kwargs):
+    """
+    Returns a generator of plain row tuples (as returned by :func:`SearchCursor.fetch_batches`) for all rows
+    where *in_field* matches any value in *values*. The values are split into chunks of (at most) *chunk_size* values
+    and a :class:`SearchCursor` is opened for each chunk (see :func:`iter_in`).
+    The rows of all chunks are returned as a single stream. Since each value only occurs in a single chunk,
+    no row is returned twice.
+
+    If *max_workers* is greater than 1, the chunks are read concurrently in a thread pool and the rows are
+    returned per chunk, in order of completion. This is mostly useful for remote (SDE) data sources, where most of
+    the time is spent waiting for the database. Note that each chunk is then read entirely before its rows are returned.
+
+    Example:
+
+        >>> for oid, name in search_in('C:/Temp/test.gdb/pipes', ['OID@', 'NAME'], 'ID', many_ids, max_workers=4):
+        >>>     print(oid, name)
+
+    :param datatable:       The path to the feature class or table.
+    :param field_names:     The field names to read.
+    :param in_field:        The name of the field that should match any of the *values*.
+    :param values:          An iterable of values (with similar data types) to match.
+    :param where_clause:    An optional where clause that is combined (AND) with each IN clause.
+    :param chunk_size:      The maximum number of values per cursor. Defaults to :data:`gpf.tools.queries.MAX_IN_SIZE`.
+    :param max_workers:     The number of chunks that are read at the same time (default = 1).
+    :param kwargs:          Optional keyword arguments for the SearchCursor (e.g. *spatial_reference*).
+    :type where_clause:     str, unicode, gpf.tools.queries.Where
+    :type chunk_size:       int
+    :type max_workers:      int
+    :rtype:                 generator
+    """
+    _vld.pass_if(max_workers > 0, ValueError, 'search_in() max_workers must be a positive integer')
+    if max_workers == 1:
+        for rows in iter_in(SearchCursor, datatable, field_names, in_field, values, where_clause, chunk_size, **kwargs):
+            for row in rows._iter_raw():
+                yield row
+        return
+
+    jobs = [(datatable, field_names, clause, kwargs)
+            for clause in _get_inclauses(datatable, in_field, values, where_clause, chunk_size)]
+    if not jobs:
+        return
+    pool = _ThreadPool(min(max_workers, len(jobs)))
+    try:
+        for rows in pool.imap_unordered(_fetch_rows, jobs):
+            for row in rows:
+                yield row
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
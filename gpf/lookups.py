@@ -20,22 +20,62 @@ This module can be used to build lookup data structures from Esri tables and fea
 .. automethod:: gpf.lookups._process_row
 """
 
+import cPickle as _pickle
+import hashlib as _hashlib
+import marshal as _marshal
+import mmap as _mmap
+import multiprocessing as _mp
+import os as _os
+import struct as _struct
+import tempfile as _tf
+from heapq import nsmallest as _nsmallest
+from itertools import product as _product
+from math import sqrt as _sqrt
+from warnings import warn as _warn
+
 import gpf.common.const as _const
 import gpf.common.textutils as _tu
 import gpf.common.validate as _vld
 import gpf.cursors as _cursors
+import gpf.paths as _paths
 import gpf.tools.geometry as _geo
 import gpf.tools.metadata as _meta
+import gpf.tools.parallel as _parallel
+import gpf.tools.queries as _q
+
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
 
 _DUPEKEYS_ARG = 'duplicate_keys'
 _MUTABLE_ARG = 'mutable_values'
 _ROWFUNC_ARG = 'row_func'
+_PROCESSES_ARG = 'processes'
+_CACHEDIR_ARG = 'cache_dir'
+_CACHE_EXT = '.lkp'
+
+# Layout of a mapped lookup file: header (magic, number of slots, number of keys, slot table offset),
+# metadata (length-prefixed pickle), records (key length, value length, key, value) and the slot table (hash, offset).
+_MAP_MAGIC = 'GPFMLKP1'
+_MAP_HEADER = _struct.Struct('<8sQQQ')
+_MAP_LENGTH = _struct.Struct('<I')
+_MAP_RECORD = _struct.Struct('<II')
+_MAP_SLOT = _struct.Struct('<QQ')
+_MAP_HASH = _struct.Struct('<Q')
 
 #: The default (Esri-recommended) resolution that is used by the :func:`get_nodekey` function (i.e. for lookups).
 #: If coordinate values fall within this distance, they are considered equal.
 #: Set this to a higher or lower value (coordinate system units) if required.
 XYZ_RESOLUTION = 0.0001
 
+#: Join strategy that queries the keys in the database using (chunked) IN clauses (see :func:`join_keys`).
+JOIN_PUSHDOWN = 'pushdown'
+#: Join strategy that reads the whole table and looks up each key in memory (see :func:`join_keys`).
+JOIN_SCAN = 'scan'
+#: The maximum ratio of keys to table rows for which the :data:`JOIN_PUSHDOWN` strategy is chosen.
+JOIN_PUSHDOWN_RATIO = 0.05
+
 
 def get_nodekey(*args):
     """
@@ -72,6 +112,159 @@ def get_nodekey(*args):
     return tuple(int(v / XYZ_RESOLUTION) for v in _geo.get_xyz(*args) if v is not None)
 
 
+def get_nodekeys(coords):
+    """
+    Creates node keys (see :func:`get_nodekey`) for a whole array of coordinates in one call.
+
+    If *coords* is a NumPy array of shape (n, 2) or (n, 3), a NumPy integer array of the same shape is returned,
+    where each row is a node key. This is much faster than calling :func:`get_nodekey` for each coordinate,
+    because no intermediate Python objects are created. Use ``map(tuple, keys.tolist())`` to obtain a list of tuples.
+    For any other iterable of coordinate tuples, a list of node key tuples is returned.
+
+    Example:
+
+        >>> get_nodekeys([(4.2452, 23.24541), (1.0, 2.0)])
+        [(42451, 232454), (10000, 20000)]
+
+    :param coords:  A NumPy array or an iterable of X, Y(, Z) coordinate tuples.
+    :rtype:         numpy.ndarray, list
+    """
+    if _np and isinstance(coords, _np.ndarray):
+        _vld.pass_if(coords.ndim == 2 and coords.shape[1] in (2, 3), ValueError,
+                     'get_nodekeys() requires an array of shape (n, 2) or (n, 3)')
+        # Casting to an integer type truncates the values, like int() does in get_nodekey()
+        return (coords / XYZ_RESOLUTION).astype(_np.int64)
+    return [tuple(int(v / XYZ_RESOLUTION) for v in coord) for coord in coords]
+
+
+def get_nodekey_neighbors(node_key, neighbors=None):
+    """
+    Returns a list of the node keys in the cells adjacent to the given *node_key*.
+    The orthogonal neighbors are listed first, followed by the diagonal neighbors (if requested).
+
+    Because :func:`get_nodekey` truncates the coordinate values, 2 coordinates that lie very close to each other
+    (i.e. within the ``XYZ_RESOLUTION`` distance) but on different sides of a cell boundary, get different node keys.
+    The neighbors can be probed in that case to find the matching node key (see :func:`find_nodekey`).
+
+    :param node_key:    The 2D or 3D node key for which to get the neighbors.
+    :param neighbors:   The number of neighbors to return. For 2D node keys, this is 4 (orthogonal only) or 8.
+                        For 3D node keys, this is 6 (orthogonal only) or 26. If omitted, all neighbors are returned.
+                        If set to 0, an empty list is returned.
+    :type node_key:     tuple
+    :type neighbors:    int
+    :rtype:             list
+    :raises ValueError: If the number of *neighbors* does not match the number of node key dimensions.
+    """
+    dim = len(node_key)
+    max_neighbors = 3 ** dim - 1
+    neighbors = max_neighbors if neighbors is None else neighbors
+    _vld.pass_if(neighbors in (0, 2 * dim, max_neighbors), ValueError,
+                 'Number of neighbors for a {}D node key must be 0, {} or {}'.format(dim, 2 * dim, max_neighbors))
+
+    offsets = sorted((o for o in _product((-1, 0, 1), repeat=dim) if any(o)), key=lambda o: sum(map(abs, o)))
+    return [tuple(k + d for k, d in zip(node_key, o)) for o in offsets[:neighbors]]
+
+
+def find_nodekey(nodes, point, neighbors=None):
+    """
+    Returns the node key in *nodes* that matches the coordinate *point*, or ``None`` if there is no match.
+
+    If the node key for *point* (see :func:`get_nodekey`) is not found in *nodes*, the adjacent node keys
+    are probed as well (see :func:`get_nodekey_neighbors`). If multiple neighbors are found, the one nearest to the
+    coordinate is returned. This makes sure that 2 nearly identical coordinates that lie on different sides of a cell
+    boundary will still match.
+
+    Example:
+
+        >>> nodes = {get_nodekey(1.0, 2.0)}
+        >>> find_nodekey(nodes, (0.99999999, 2.0))  # the node key for this coordinate would be (9999, 20000)
+        (10000, 20000)
+
+    :param nodes:       A container of node keys, e.g. a :class:`NodeSet` or a lookup with coordinate keys.
+    :param point:       The coordinate to find: a tuple of numeric values, an EsriJSON dictionary,
+                        an ArcPy Point or PointGeometry instance.
+    :param neighbors:   The number of neighbors to probe (see :func:`get_nodekey_neighbors`).
+                        If omitted, all neighbors are probed. If set to 0, only the exact node key is checked.
+    :type neighbors:    int
+    :rtype:             tuple
+    """
+    coord = _get_unitcoord(point)
+    node_key = tuple(int(v) for v in coord)
+    if node_key in nodes:
+        return node_key
+    hits = [(sum((c - k) ** 2 for c, k in zip(coord, n)), n)
+            for n in get_nodekey_neighbors(node_key, neighbors) if n in nodes]
+    return min(hits)[1] if hits else None
+
+
+def _get_unitcoord(point):
+    """ Converts a coordinate (tuple, Point, PointGeometry or EsriJSON) into a tuple of node key units (floats). """
+    args = point if isinstance(point, (tuple, list)) else (point, )
+    return tuple(v / XYZ_RESOLUTION for v in _geo.get_xyz(*args) if v is not None)
+
+
+def _build_partial(args):
+    """
+    Creates a lookup of type *lookup_type* for a single table partition and returns it as a plain ``dict``.
+    This function is called by the worker processes of a parallel lookup population (see :class:`Lookup`).
+    """
+    lookup_type, table_path, key_field, value_fields, where_clause, kwargs = args
+    return dict(lookup_type(table_path, key_field, value_fields, where_clause, **kwargs))
+
+
+def _normalize_key(key):
+    """ Returns a normalized key for a mapped lookup file, so that equal keys have the same (marshalled) bytes. """
+    if isinstance(key, basestring):
+        return _tu.to_unicode(key)
+    if isinstance(key, (int, long)) and not isinstance(key, bool):
+        return int(key)
+    if isinstance(key, (tuple, list)):
+        return tuple(_normalize_key(k) for k in key)
+    return key
+
+
+def _hash_key(key_bytes):
+    """ Returns a 64-bit hash for the marshalled key bytes that is the same in every process (and platform). """
+    return _MAP_HASH.unpack(_hashlib.md5(key_bytes).digest()[:_MAP_HASH.size])[0]
+
+
+def _write_mapped(path, items, num_keys, meta):
+    """
+    Writes the key-value pairs in *items* to a mapped lookup file (an open-addressing hash table with linear probing).
+    The slot table has at least twice as many slots as there are keys (i.e. the load factor is 0.5 or less).
+    """
+    num_slots = 8
+    while num_slots < 2 * num_keys:
+        num_slots *= 2
+    mask = num_slots - 1
+    slots = bytearray(num_slots * _MAP_SLOT.size)
+
+    with open(path, 'wb') as f:
+        f.write(_MAP_HEADER.pack(_MAP_MAGIC, num_slots, num_keys, 0))
+        meta_bytes = _pickle.dumps(meta, _pickle.HIGHEST_PROTOCOL)
+        f.write(_MAP_LENGTH.pack(len(meta_bytes)))
+        f.write(meta_bytes)
+
+        for key, value in items:
+            offset = f.tell()
+            key_bytes = _marshal.dumps(_normalize_key(key))
+            value_bytes = _pickle.dumps(value, _pickle.HIGHEST_PROTOCOL)
+            f.write(_MAP_RECORD.pack(len(key_bytes), len(value_bytes)))
+            f.write(key_bytes)
+            f.write(value_bytes)
+
+            key_hash = _hash_key(key_bytes)
+            i = key_hash & mask
+            while _MAP_SLOT.unpack_from(slots, i * _MAP_SLOT.size)[1]:
+                i = (i + 1) & mask
+            _MAP_SLOT.pack_into(slots, i * _MAP_SLOT.size, key_hash, offset)
+
+        table_offset = f.tell()
+        f.write(slots)
+        f.seek(0)
+        f.write(_MAP_HEADER.pack(_MAP_MAGIC, num_slots, num_keys, table_offset))
+
+
 def get_coordtuple(node_key):
     """
     This function converts a node key (created by :func:`get_nodekey`) of integer tuples
@@ -88,6 +281,173 @@ def get_coordtuple(node_key):
     return tuple((v * XYZ_RESOLUTION) for v in node_key)
 
 
+class NodeIndex(object):
+    """
+    NodeIndex(node_keys, {cell_size})
+
+    Uniform grid spatial index for node keys (as created by :func:`get_nodekey`), which can be used to find
+    the node keys that lie within a certain distance of a coordinate, or the nearest node keys of a coordinate.
+    Typically, a ``NodeIndex`` is obtained by calling :func:`NodeSet.get_index` or :func:`Lookup.get_index`.
+
+    The node keys are distributed over square grid cells (in the XY plane) of *cell_size* coordinate units.
+    A query only needs to look at the node keys in the cells surrounding the query coordinate,
+    which is much faster than comparing the query coordinate to all node keys.
+    Distances are calculated in coordinate units, using all dimensions of the node keys (i.e. 3D for XYZ node keys).
+
+    Example:
+
+        >>> nodes = NodeSet('C:/Temp/test.gdb/my_lines')
+        >>> index = nodes.get_index(10)
+        >>> index.within((2600000.0, 1200000.0), 0.5)  # all node keys within 0.5 units (sorted by distance)
+        [(26000000012L, 12000000030L)]
+        >>> index.nearest((2600000.0, 1200000.0), 2)   # the 2 nearest node keys (sorted by distance)
+        [(26000000012L, 12000000030L), (26000051235L, 11999988004L)]
+
+    **Params:**
+
+    -   **node_keys** (iterable):
+
+        The node keys (2D or 3D) to index. All node keys should have the same number of dimensions.
+
+    -   **cell_size** (int, float):
+
+        The optional size of a grid cell in coordinate units. Ideally, a cell contains a few node keys on average.
+        If omitted, a cell size will be derived from the extent and the number of node keys.
+
+    .. note::   The index is a snapshot: node keys that are added to the source afterwards are not included.
+    """
+
+    __slots__ = '_cells', '_cellsize', '_dim', '_bounds', '_count'
+
+    def __init__(self, node_keys, cell_size=None):
+        _vld.raise_if(cell_size is not None and cell_size <= 0, ValueError, 'cell_size must be a positive number')
+        node_keys = list(node_keys)
+        self._count = len(node_keys)
+        self._dim = len(node_keys[0]) if node_keys else 2
+        self._cellsize = (cell_size / XYZ_RESOLUTION) if cell_size else self._get_cellsize(node_keys)
+        self._cells = {}
+        for key in node_keys:
+            self._cells.setdefault(self._get_cell(key), []).append(key)
+        self._bounds = None
+        if self._cells:
+            cols, rows = zip(*self._cells)
+            self._bounds = min(cols), min(rows), max(cols), max(rows)
+
+    def __len__(self):
+        return self._count
+
+    @staticmethod
+    def _get_cellsize(node_keys):
+        """ Returns a cell size (in node key units) so that a cell contains about 4 node keys on average. """
+        if len(node_keys) < 2:
+            return 1.
+        xs, ys = zip(*node_keys)[:2]
+        area = float(max(xs) - min(xs) + 1) * float(max(ys) - min(ys) + 1)
+        return max(_sqrt(4. * area / len(node_keys)), 1.)
+
+    def _get_cell(self, coord):
+        """ Returns the (column, row) grid cell for a node key or unit coordinate. """
+        return int(coord[0] // self._cellsize), int(coord[1] // self._cellsize)
+
+    def _get_coord(self, point):
+        """ Converts a coordinate (tuple, Point, PointGeometry or EsriJSON) into node key units. """
+        coord = _get_unitcoord(point)
+        _vld.pass_if(len(coord) >= self._dim, ValueError,
+                     'Coordinate must have at least {} dimensions'.format(self._dim))
+        return coord[:self._dim]
+
+    @staticmethod
+    def _get_sqdist(coord, node_key):
+        """ Returns the squared distance (in node key units) between a unit coordinate and a node key. """
+        return sum((c - k) ** 2 for c, k in zip(coord, node_key))
+
+    def _iter_ring(self, col, row, ring):
+        """ Returns a generator of all node keys in the square ring of cells at distance *ring* from a cell. """
+        # Only visit the cells of the ring that lie within the grid bounds
+        c_min, r_min, c_max, r_max = self._bounds
+        for c in xrange(max(col - ring, c_min), min(col + ring, c_max) + 1):
+            edge = c in (col - ring, col + ring)
+            for r in (xrange(max(row - ring, r_min), min(row + ring, r_max) + 1) if edge else (row - ring, row + ring)):
+                for key in self._cells.get((c, r), ()):
+                    yield key
+
+    def within(self, point, radius):
+        """
+        Returns a list of all node keys that lie within *radius* coordinate units of *point*.
+        The node keys are sorted by distance (nearest first).
+
+        :param point:   The query coordinate: a tuple of numeric values, an EsriJSON dictionary,
+                        an ArcPy Point or PointGeometry instance.
+        :param radius:  The search distance in coordinate units.
+        :type radius:   int, float
+        :rtype:         list
+        """
+        if not self._bounds:
+            return []
+
+        coord = self._get_coord(point)
+        dist = radius / XYZ_RESOLUTION
+        max_sqdist = dist ** 2
+        (c_min, r_min), (c_max, r_max) = (self._get_cell((coord[0] + d, coord[1] + d)) for d in (-dist, dist))
+        # Only visit the cells within the grid bounds
+        c_min, r_min = max(c_min, self._bounds[0]), max(r_min, self._bounds[1])
+        c_max, r_max = min(c_max, self._bounds[2]), min(r_max, self._bounds[3])
+        hits = []
+        for c in xrange(c_min, c_max + 1):
+            for r in xrange(r_min, r_max + 1):
+                for key in self._cells.get((c, r), ()):
+                    sq_dist = self._get_sqdist(coord, key)
+                    if sq_dist <= max_sqdist:
+                        hits.append((sq_dist, key))
+        return [key for _, key in sorted(hits)]
+
+    def nearest(self, point, k=1):
+        """
+        Returns a list of (at most) the *k* nearest node keys for *point*, sorted by distance (nearest first).
+
+        :param point:   The query coordinate: a tuple of numeric values, an EsriJSON dictionary,
+                        an ArcPy Point or PointGeometry instance.
+        :param k:       The number of node keys to return. Defaults to 1.
+        :type k:        int
+        :rtype:         list
+        """
+        _vld.pass_if(k > 0, ValueError, 'k must be a positive integer')
+        if not self._bounds:
+            return []
+
+        coord = self._get_coord(point)
+        col, row = self._get_cell(coord)
+        c_min, r_min, c_max, r_max = self._bounds
+        max_ring = max(col - c_min, c_max - col, row - r_min, r_max - row)
+        # Skip the (empty) rings that do not intersect the grid bounds if the coordinate lies outside of it
+        min_ring = max(c_min - col, col - c_max, r_min - row, row - r_max, 0)
+
+        candidates = []
+        for ring in xrange(min_ring, max_ring + 1):
+            candidates.extend((self._get_sqdist(coord, key), key) for key in self._iter_ring(col, row, ring))
+            if len(candidates) >= k:
+                # Node keys outside of the current ring are at least (ring * cell size) units away
+                best = _nsmallest(k, candidates)
+                if best[-1][0] <= (ring * self._cellsize) ** 2:
+                    return [key for _, key in best]
+        return [key for _, key in _nsmallest(k, candidates)]
+
+
+def _get_funckey(func):
+    """
+    Returns a tuple that identifies a function (or method) by its module, name, code and default arguments,
+    so that the cache key changes when the function is modified. Returns ``None`` for other callables
+    (e.g. built-in functions, ``functools.partial`` objects or callable instances) and for closures,
+    since their behavior cannot be derived from their code.
+    """
+    func = getattr(func, 'im_func', func)
+    code = getattr(func, 'func_code', None)
+    if code is None or func.func_closure:
+        return None
+    return (func.__module__, func.__name__, _hashlib.md5(_marshal.dumps(code)).hexdigest(),
+            repr(func.func_defaults))
+
+
 # noinspection PyUnusedLocal
 def _process_row(lookup, row, **kwargs):
     """
@@ -156,17 +516,68 @@ class Lookup(dict):
         If the user wishes to call the standard `Lookup` class but simply wants to use
         a custom row processor function, you can pass in this function using the keyword *row_func*.
 
+    -   **processes** (int):
+
+        If set to a value greater than 1, the table is split into ObjectID ranges, which are read by a pool of
+        *processes* worker processes. The partial lookups are merged into this lookup afterwards.
+        This can considerably speed up the population of large lookups (e.g. on File or SDE Geodatabases).
+        If the ObjectID range of the table cannot be determined, the lookup will be populated serially.
+
+    -   **cache_dir** (str, unicode):
+
+        If set to a directory path, the populated lookup is stored in a cache file in this directory.
+        When the same lookup (i.e. same type, table, fields, where clause and options) is created again
+        and the source table has not changed since, the lookup is loaded from the cache file instead.
+        A table is considered unchanged if its row count, its highest ObjectID and the last modification time of
+        its (local) workspace (see :func:`gpf.paths.Workspace.last_modified`) are still the same.
+        If the cache cannot be read or written, a warning is shown and the lookup is populated as usual.
+        This also applies to tables for which the last modification time cannot be determined (e.g. in SDE and
+        in-memory workspaces): the cache is not used for those tables at all.
+        A *row_func* is identified by its module, name and (compiled) code, so that the cache is not used
+        after the function has been changed. For callables that cannot be identified that way
+        (e.g. closures or ``functools.partial`` objects), a warning is shown and the cache is not used.
+
     :raises RuntimeError:       When the lookup cannot be created or populated.
     :raises ValueError:         When a specified lookup field does not exist in the source table,
                                 or when multiple value fields were specified.
+
+    .. warning::                For a parallel population, the lookup class and the *row_func* (if any) must be
+                                importable by the worker processes, i.e. they must be defined at module level.
+                                On Windows, the script that creates the lookup should also use an
+                                ``if __name__ == '__main__':`` guard.
     """
 
+    # Indicates if the lookup values are lists of values or rows (i.e. if duplicate keys are allowed)
+    _dupekeys = False
+
     def __init__(self, table_path, key_field, value_fields, where_clause=None, **kwargs):
         super(dict, self).__init__()
 
         fields = tuple([key_field] + list(value_fields if _vld.is_iterable(value_fields) else (value_fields, )))
         self._hascoordkey = key_field.upper().startswith(_const.FIELD_X)
-        self._populate(table_path, fields, where_clause, **kwargs)
+
+        cache_dir = kwargs.pop(_CACHEDIR_ARG, None)
+        if not cache_dir:
+            self._populate(table_path, fields, where_clause, **kwargs)
+            return
+
+        state = self._get_state(table_path)
+        if state is None:
+            _warn('The lookup cache is not used for {}, because its last modification time cannot be determined '
+                  '(e.g. for SDE workspaces)'.format(_tu.to_repr(table_path)))
+            self._populate(table_path, fields, where_clause, **kwargs)
+            return
+
+        cache_path = self._get_cachepath(cache_dir, table_path, fields, where_clause, **kwargs)
+        if cache_path is None:
+            _warn('The lookup cache is not used for {}, because a function option (e.g. row_func) is not a plain '
+                  'function or uses a closure'.format(_tu.to_repr(table_path)))
+            self._populate(table_path, fields, where_clause, **kwargs)
+            return
+
+        if not self._load_cache(cache_path, state):
+            self._populate(table_path, fields, where_clause, **kwargs)
+            self._save_cache(cache_path, state)
 
     @staticmethod
     def _get_fields(table_path):
@@ -207,12 +618,183 @@ class Lookup(dict):
         """ Instance method version of the :func:`_process_row` module function. """
         return _process_row(self, row, **kwargs)
 
+    def get_index(self, cell_size=None):
+        """
+        Returns a :class:`NodeIndex` for the coordinate keys of the lookup,
+        so that the keys within a certain distance of (or nearest to) a coordinate can be found.
+
+        :param cell_size:   The optional grid cell size in coordinate units. See :class:`NodeIndex`.
+        :type cell_size:    int, float
+        :rtype:             NodeIndex
+        :raises ValueError: When the lookup was not created using a *SHAPE@XY* or *SHAPE@XYZ* key field.
+        """
+        _vld.pass_if(self._hascoordkey, ValueError,
+                     '{} does not have coordinate keys'.format(self.__class__.__name__))
+        return NodeIndex(self.iterkeys(), cell_size)
+
+    def find_nodekey(self, point, neighbors=None):
+        """
+        Returns the coordinate key in the lookup that matches *point* (probing the adjacent node keys if required),
+        or ``None`` if there is no match. See :func:`find_nodekey` for details.
+
+        Example:
+
+            >>> coord_lookup = ValueLookup('C:/Temp/test.gdb/my_points', 'SHAPE@XY', 'GlobalID')
+            >>> coord_lookup.get(coord_lookup.find_nodekey((4.2452, 23.24541)))
+            '{628ee94d-2063-47be-b57f-8c2af6345d4e}'
+
+        :param point:       The coordinate to find.
+        :param neighbors:   The number of neighbors to probe. If omitted, all neighbors are probed.
+        :type neighbors:    int
+        :rtype:             tuple
+        :raises ValueError: When the lookup was not created using a *SHAPE@XY* or *SHAPE@XYZ* key field.
+        """
+        _vld.pass_if(self._hascoordkey, ValueError,
+                     '{} does not have coordinate keys'.format(self.__class__.__name__))
+        return find_nodekey(self, point, neighbors)
+
+    def _get_cachepath(self, cache_dir, table_path, fields, where_clause, **kwargs):
+        """
+        Returns the cache file path for a lookup with the given arguments.
+        Returns ``None`` if one of the options is a callable that cannot be identified by its code.
+        """
+        where_kwargs = {}
+        _q.add_where(where_kwargs, where_clause)
+        options = []
+        for k, v in sorted(kwargs.iteritems()):
+            if k == _PROCESSES_ARG:
+                continue
+            if callable(v):
+                v = _get_funckey(v)
+                if v is None:
+                    return None
+            options.append((k, v))
+        identity = repr((self.__class__.__module__, self.__class__.__name__, _paths.normalize(table_path),
+                         tuple(f.upper() for f in fields), where_kwargs.get(_q.WHERE_KWARG), options))
+        return _os.path.join(cache_dir, self.__class__.__name__ + '_' +
+                             _hashlib.md5(_tu.to_str(identity)).hexdigest() + _CACHE_EXT)
+
+    @staticmethod
+    def _get_state(table_path):
+        """
+        Returns a tuple that describes the state of the source table (row count, max ObjectID, last modified).
+        Returns ``None`` if the last modification time cannot be determined: the row count and max ObjectID alone
+        do not change when attributes are updated, so the state would not be reliable.
+        """
+        desc = _meta.Describe(table_path)
+        try:
+            last_modified = _paths.get_workspace(desc.catalogPath or table_path, True).last_modified
+        except (TypeError, ValueError):
+            last_modified = None
+        if last_modified is None:
+            return None
+        return desc.num_rows(), desc.get_oid_range()[1], last_modified
+
+    def _load_cache(self, cache_path, state):
+        """ Populates the lookup from the cache file if the table state matches. Returns ``True`` on success. """
+        if not _os.path.isfile(cache_path):
+            return False
+        try:
+            with open(cache_path, 'rb') as f:
+                if _pickle.load(f) != state:
+                    return False
+                self.update(_pickle.load(f))
+            return True
+        except Exception as e:
+            _warn('Failed to read lookup cache file {}: {}'.format(_tu.to_repr(cache_path), e))
+            self.clear()
+            return False
+
+    def _save_cache(self, cache_path, state):
+        """ Writes the table state and the lookup data to the cache file. """
+        cache_dir = _os.path.dirname(cache_path)
+        tmp_path = None
+        try:
+            if not _os.path.isdir(cache_dir):
+                _os.makedirs(cache_dir)
+            # Write to a temporary file first, so that other processes never read an incomplete cache file
+            with _tf.NamedTemporaryFile(dir=cache_dir, suffix=_CACHE_EXT, delete=False) as f:
+                tmp_path = f.name
+                _pickle.dump(state, f, _pickle.HIGHEST_PROTOCOL)
+                _pickle.dump(dict(self), f, _pickle.HIGHEST_PROTOCOL)
+            if _os.path.exists(cache_path):
+                _os.remove(cache_path)
+            _os.rename(tmp_path, cache_path)
+        except Exception as e:
+            _warn('Failed to write lookup cache file {}: {}'.format(_tu.to_repr(cache_path), e))
+            if tmp_path and _os.path.exists(tmp_path):
+                _os.remove(tmp_path)
+
+    def export(self, path):
+        """
+        Exports the lookup to a file that can be opened as a :class:`MappedLookup`.
+
+        The file contains a hash table that is memory-mapped when it is opened. This means that multiple processes
+        that open the same file share the same (read-only) data in memory, instead of each process having its
+        own copy of the lookup. This is useful when many worker processes need the same (large) lookup.
+
+        Example:
+
+            >>> RowLookup('C:/Temp/test.gdb/my_table', 'GlobalID', ['Field1', 'Field2']).export('C:/Temp/my_table.map')
+            >>> # In each worker process:
+            >>> with MappedLookup('C:/Temp/my_table.map') as lookup:
+            >>>     print(lookup.get_value('{628ee94d-2063-47be-b57f-8c2af6345d4e}', 'Field1'))
+            'ThisIsTheValueOfField1'
+
+        :param path:    The path of the output file. An existing file will be overwritten.
+        :type path:     str, unicode
+
+        .. note::       All lookup values must be picklable (e.g. geometries are not).
+                        Keys should be simple types like text, integers, floats or tuples thereof (e.g. node keys).
+        """
+        meta = {
+            'type': self.__class__.__name__,
+            'fields': getattr(self, '_fieldmap', None)
+        }
+        _write_mapped(path, self.iteritems(), len(self), meta)
+
+    def _merge(self, partial):
+        """ Merges a partial lookup ``dict`` into the current lookup. """
+        if not self._dupekeys:
+            self.update(partial)
+            return
+        for key, values in partial.iteritems():
+            self.setdefault(key, []).extend(values)
+
+    def _populate_parallel(self, table_path, fields, where_clause, processes, **kwargs):
+        """
+        Populates the lookup using a pool of worker processes, where each process creates a partial lookup
+        for an ObjectID range of the table. Returns ``False`` if the table could not be partitioned.
+        """
+        parts = _meta.Describe(table_path).get_partitions(processes * _parallel.PARTS_PER_PROCESS, where_clause)
+        if not parts:
+            return False
+
+        key_field, value_fields = fields[0], fields[1] if len(fields) == 2 else fields[1:]
+        jobs = [(self.__class__, table_path, key_field, value_fields, part, kwargs) for part in parts]
+        pool = _mp.Pool(processes)
+        try:
+            # Results are returned in ObjectID order, so that the outcome equals that of a serial population
+            for partial in pool.imap(_build_partial, jobs):
+                self._merge(partial)
+            pool.close()
+        except Exception:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+        return True
+
     def _populate(self, table_path, fields, where_clause=None, **kwargs):
         """ Populates the lookup with data, calling _process_row() on each row returned by the SearchCursor. """
         try:
             # Validate fields
             self._check_fields(fields, self._get_fields(table_path))
 
+            processes = kwargs.pop(_PROCESSES_ARG, None) or 1
+            if processes > 1 and self._populate_parallel(table_path, fields, where_clause, processes, **kwargs):
+                return
+
             # Validate row processor function (if any)
             row_func = kwargs.get(_ROWFUNC_ARG, self._process_row)
             has_self = self._has_self(row_func)
@@ -271,6 +853,16 @@ class ValueLookup(Lookup):
         when *duplicate_keys* is ``False`` and duplicates *are* encountered,
         the last existing key-value pair will be overwritten.
 
+    -   **processes** (int):
+
+        If set to a value greater than 1, the lookup is populated in parallel by a pool of worker processes.
+        See :class:`Lookup` for details.
+
+    -   **cache_dir** (str, unicode):
+
+        If set to a directory path, the lookup is cached on disk and reused as long as the source table
+        does not change. See :class:`Lookup` for details.
+
     :raises RuntimeError:       When the lookup cannot be created or populated.
     :raises ValueError:         When a specified lookup field does not exist in the source table,
                                 or when multiple value fields were specified.
@@ -357,6 +949,16 @@ class RowLookup(Lookup):
         The default is ``False``, which causes the RowLookup values to become ``tuple`` objects.
         These are immutable, which consumes less memory and allows for faster retrieval.
 
+    -   **processes** (int):
+
+        If set to a value greater than 1, the lookup is populated in parallel by a pool of worker processes.
+        See :class:`Lookup` for details.
+
+    -   **cache_dir** (str, unicode):
+
+        If set to a directory path, the lookup is cached on disk and reused as long as the source table
+        does not change. See :class:`Lookup` for details.
+
     :raises RuntimeError:       When the lookup cannot be created or populated.
     :raises ValueError:         When a specified lookup field does not exist in the source table,
                                 or when a single value field was specified.
@@ -434,6 +1036,367 @@ class RowLookup(Lookup):
             return default
 
 
+class CompactLookup(object):
+    """
+    CompactLookup(table_path, key_field, value_field(s), {where_clause}, {duplicate_keys})
+
+    Creates a memory-efficient, read-only lookup from a given table or feature class, using NumPy arrays for storage.
+
+    Where a :class:`ValueLookup` or :class:`RowLookup` stores each row as a Python object in a ``dict``
+    (which typically costs hundreds of bytes per record), the ``CompactLookup`` stores all keys in a single sorted
+    NumPy array and all values in a structured NumPy array. Values are retrieved using a binary search.
+    This makes it possible to keep lookups for tables with millions of rows in memory (e.g. in a 32-bit process),
+    at the cost of a slightly slower retrieval and a read-only lookup.
+
+    The ``CompactLookup`` exposes the same :func:`get` and :func:`get_value` functions as the other lookups.
+    When a single value field was specified, :func:`get` returns a single value (like a :class:`ValueLookup`).
+    When multiple value fields were specified, :func:`get` returns a tuple of values (like a :class:`RowLookup`).
+    When an empty key (``None``) is encountered, the row will be discarded.
+
+    **Params:**
+
+    -   **table_path** (str, unicode):
+
+        Full source table or feature class path.
+
+    -   **key_field** (str, unicode):
+
+        The field to use for the lookup keys. Coordinate (*SHAPE@X[Y[Z]]*) keys are not supported.
+
+    -   **value_fields** (list, tuple, str, unicode):
+
+        The field or fields to include as the lookup value(s).
+
+    -   **where_clause** (str, unicode, :class:`gpf.tools.queries.Where`):
+
+        An optional where clause to filter the table.
+
+    **Keyword params:**
+
+    -   **duplicate_keys** (bool):
+
+        If ``True``, the lookup allows for duplicate keys in the input and :func:`get` will return **lists** of values
+        or tuples (in table order) instead of a **single** value or tuple.
+        If ``False`` (default) and duplicates are encountered, the last row for that key will be returned.
+
+    :raises ImportError:        When the ``numpy`` module is not available.
+    :raises RuntimeError:       When the lookup cannot be created or populated.
+    :raises ValueError:         When a specified lookup field does not exist in the source table,
+                                or when a coordinate key field was specified.
+
+    .. note::                   Values are returned as native Python types. Only numeric fields that cannot be NULL
+                                (and the key field) are stored as numbers. All other fields (e.g. text fields,
+                                nullable fields and tuples like *SHAPE@XY*) are stored as Python objects,
+                                which requires more memory.
+    """
+
+    # NumPy data types for numeric field types that cannot be NULL (all other fields are stored as Python objects)
+    _DTYPES = {
+        'OID': 'i4',
+        'SmallInteger': 'i2',
+        'Integer': 'i4',
+        'Single': 'f8',
+        'Double': 'f8'
+    }
+
+    def __init__(self, table_path, key_field, value_fields, where_clause=None, **kwargs):
+        _vld.pass_if(_np, ImportError, '{} requires the numpy module'.format(CompactLookup.__name__))
+        _vld.pass_if(all(_vld.has_value(v) for v in (table_path, key_field, value_fields)), ValueError,
+                     '{} requires valid table_path, key_field and value_fields arguments'.format(
+                             CompactLookup.__name__))
+        _vld.raise_if(key_field.upper().startswith(_const.FIELD_X), ValueError,
+                      '{} does not support coordinate keys: use {} instead'.format(CompactLookup.__name__,
+                                                                                 ValueLookup.__name__))
+
+        value_fields = list(value_fields) if _vld.is_iterable(value_fields) else [value_fields]
+        self._dupekeys = kwargs.get(_DUPEKEYS_ARG, False)
+        self._single = len(value_fields) == 1
+        self._fieldmap = {name.lower(): i for i, name in enumerate(value_fields)}
+        self._keys = None
+        self._values = None
+        self._numkeys = 0
+        self._uniquekeys = None
+        self._populate(table_path, [key_field] + value_fields, where_clause)
+
+    def __len__(self):
+        return self._numkeys
+
+    def __iter__(self):
+        if self._uniquekeys is None:
+            # The keys are sorted, so that each unique key is the first key of a sequence of equal keys
+            keys = self._keys
+            self._uniquekeys = keys[_np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+        return iter(self._uniquekeys.tolist())
+
+    def __contains__(self, key):
+        return self._find(key)[0] is not None
+
+    def __getitem__(self, key):
+        value = self.get(key, _const.OBJ_EMPTY)
+        if value is _const.OBJ_EMPTY:
+            raise KeyError(key)
+        return value
+
+    @classmethod
+    def _get_dtypes(cls, table_path, fields):
+        """ Returns a list of NumPy data types for the given fields, based on the field definitions of the table. """
+        table_fields = {f.name.upper(): f for f in _meta.Describe(table_path).get_fields(False)}
+        dtypes = []
+        for i, name in enumerate(fields):
+            name = name.upper()
+            if name == _const.FIELD_OID:
+                field_type, nullable = 'OID', False
+            else:
+                field = table_fields.get(name)
+                field_type, nullable = getattr(field, 'type', None), getattr(field, 'isNullable', True)
+            # The key field never contains NULL values, because rows with an empty key are skipped
+            numeric = field_type in cls._DTYPES and (i == 0 or not nullable)
+            dtypes.append(_np.dtype(cls._DTYPES[field_type] if numeric else object))
+        return dtypes
+
+    @staticmethod
+    def _to_array(values, dtype):
+        """ Returns a 1-dimensional array of the given values (tuple values are stored as objects as well). """
+        if dtype != object:
+            return _np.array(values, dtype)
+        array = _np.empty(len(values), dtype)
+        for i, value in enumerate(values):
+            array[i] = value
+        return array
+
+    def _populate(self, table_path, fields, where_clause=None):
+        """ Populates the key and value arrays with data, using a SearchCursor that fetches rows in batches. """
+        try:
+            Lookup._check_fields(fields, Lookup._get_fields(table_path))
+            dtypes = self._get_dtypes(table_path, fields)
+
+            chunks = [[] for _ in fields]
+            with _cursors.SearchCursor(table_path, fields, where_clause) as rows:
+                for batch in rows.fetch_batches():
+                    batch = [row for row in batch if row[0] is not None]
+                    if not batch:
+                        continue
+                    for chunk, column, dtype in zip(chunks, zip(*batch), dtypes):
+                        chunk.append(self._to_array(column, dtype))
+            self._build(chunks, dtypes)
+
+        except Exception as e:
+            raise RuntimeError('Failed to create {} for {}: {}'.format(self.__class__.__name__,
+                                                                       _tu.to_repr(table_path), e))
+
+    def _build(self, chunks, dtypes):
+        """ Concatenates all chunks into a sorted key array and a structured value array. """
+        if not chunks[0]:
+            self._keys = _np.array([], dtypes[0])
+            self._values = _np.array([], [('f{}'.format(i), dtype) for i, dtype in enumerate(dtypes[1:])])
+            return
+
+        keys = _np.concatenate(chunks[0])
+        columns = [_np.concatenate(column_chunks) for column_chunks in chunks[1:]]
+        del chunks[:]
+
+        # A stable sort is required, so that duplicate keys are stored in table order
+        order = keys.argsort(kind='mergesort')
+        self._keys = keys[order]
+        self._numkeys = 1 + int(_np.count_nonzero(self._keys[1:] != self._keys[:-1]))
+        self._values = _np.empty(len(order), [('f{}'.format(i), c.dtype) for i, c in enumerate(columns)])
+        for i, column in enumerate(columns):
+            self._values['f{}'.format(i)] = column[order]
+
+    def _find(self, key):
+        """ Returns a tuple of (start, stop) indices for the given key or (None, None) if it was not found. """
+        try:
+            start = self._keys.searchsorted(key, 'left')
+            if start == len(self._keys) or self._keys[start] != key:
+                return None, None
+        except (TypeError, ValueError):
+            # Key type is incompatible with the stored keys
+            return None, None
+        if self._dupekeys:
+            return start, self._keys.searchsorted(key, 'right')
+        # If duplicates were encountered, the last row wins (as for the dict-based lookups)
+        return self._keys.searchsorted(key, 'right') - 1, None
+
+    def _get_row(self, index):
+        """ Returns the value (single field) or tuple of values (multiple fields) at the given index. """
+        row = self._values[index].item()
+        return row[0] if self._single else row
+
+    def get(self, key, default=None):
+        """
+        Returns the value (or tuple of values) for the given *key* or *default* if the key was not found.
+        If the lookup was created with *duplicate_keys* set to ``True``, a list of values (or tuples) is returned.
+
+        :param key:     Key to find in the lookup.
+        :param default: The value to return when the key was not found. Defaults to ``None``.
+        """
+        start, stop = self._find(key)
+        if start is None:
+            return default
+        if stop is None:
+            return self._get_row(start)
+        return [self._get_row(i) for i in xrange(start, stop)]
+
+    def get_value(self, key, field, default=None):
+        """
+        Looks up a value by key for one specific field.
+        If the lookup was created with *duplicate_keys* set to ``True``, the value for the first matching row is
+        returned.
+
+        :param key:     Key to find in the lookup.
+        :param field:   The field name (as used during initialization of the lookup) for which to retrieve the value.
+        :param default: The value to return when the value was not found. Defaults to ``None``.
+        :type field:    str, unicode
+        """
+        start, _ = self._find(key)
+        try:
+            return self._values[start].item()[self._fieldmap[field.lower()]] if start is not None else default
+        except LookupError:
+            return default
+
+    def keys(self):
+        """
+        Returns a list of all (unique) keys in the lookup, in sorted order.
+
+        :rtype: list
+        """
+        return list(self)
+
+
+class MappedLookup(object):
+    """
+    MappedLookup(path)
+
+    Opens a lookup file that was created by :func:`Lookup.export` (e.g. a :class:`ValueLookup` or :class:`RowLookup`)
+    as a read-only lookup.
+
+    The file is memory-mapped and values are only read (and unpickled) when they are requested.
+    Because the operating system loads the file into memory only once, all processes that open the same file
+    share the same physical memory. This makes the ``MappedLookup`` suitable for scenarios where many worker processes
+    need the same large lookup: the lookup is built and exported once and then opened by each process.
+
+    The ``MappedLookup`` has the same :func:`get` and :func:`get_value` functions as the lookup that was exported.
+    It can (and preferably should) be used as a context manager, so that the file is closed automatically.
+
+    **Params:**
+
+    -   **path** (str, unicode):
+
+        The path to the lookup file.
+
+    :raises ValueError:     When the file is not a valid lookup file.
+
+    .. note::               Text keys are compared as unicode and integer keys as ``int``. This means that ``'a'`` and
+                            ``u'a'`` match the same key, but that a float key (e.g. ``1.0``) does not match an
+                            integer key (``1``), which is different from a ``dict`` lookup.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = _mmap.mmap(self._file.fileno(), 0, access=_mmap.ACCESS_READ)
+            magic, self._numslots, self._numkeys, self._table = _MAP_HEADER.unpack_from(self._map, 0)
+            _vld.pass_if(magic == _MAP_MAGIC, ValueError)
+            meta_start = _MAP_HEADER.size + _MAP_LENGTH.size
+            meta_end = meta_start + _MAP_LENGTH.unpack_from(self._map, _MAP_HEADER.size)[0]
+            meta = _pickle.loads(self._map[meta_start:meta_end])
+        except Exception:
+            self.close()
+            raise ValueError('{} is not a valid lookup file'.format(_tu.to_repr(path)))
+        self._fieldmap = meta.get('fields') or {}
+        self._mask = self._numslots - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self._numkeys
+
+    def __iter__(self):
+        for i in xrange(self._numslots):
+            offset = _MAP_SLOT.unpack_from(self._map, self._table + i * _MAP_SLOT.size)[1]
+            if offset:
+                key_len, _ = _MAP_RECORD.unpack_from(self._map, offset)
+                start = offset + _MAP_RECORD.size
+                yield _marshal.loads(self._map[start:start + key_len])
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def __getitem__(self, key):
+        value = self.get(key, _const.OBJ_EMPTY)
+        if value is _const.OBJ_EMPTY:
+            raise KeyError(key)
+        return value
+
+    def _find(self, key):
+        """ Returns a tuple of (start, stop) positions of the pickled value for *key* or ``None`` if not found. """
+        try:
+            key_bytes = _marshal.dumps(_normalize_key(key))
+        except ValueError:
+            # Key cannot be marshalled, so it can't be in the lookup
+            return None
+        key_hash = _hash_key(key_bytes)
+        i = key_hash & self._mask
+        while True:
+            slot_hash, offset = _MAP_SLOT.unpack_from(self._map, self._table + i * _MAP_SLOT.size)
+            if not offset:
+                return None
+            if slot_hash == key_hash:
+                key_len, value_len = _MAP_RECORD.unpack_from(self._map, offset)
+                start = offset + _MAP_RECORD.size
+                if self._map[start:start + key_len] == key_bytes:
+                    return start + key_len, start + key_len + value_len
+            i = (i + 1) & self._mask
+
+    def close(self):
+        """ Closes the lookup file. The lookup cannot be used anymore afterwards. """
+        if getattr(self, '_map', None):
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def get(self, key, default=None):
+        """
+        Returns the value (or row) for the given *key* or *default* if the key was not found.
+
+        :param key:     Key to find in the lookup.
+        :param default: The value to return when the key was not found. Defaults to ``None``.
+        """
+        position = self._find(key)
+        if position is None:
+            return default
+        start, stop = position
+        return _pickle.loads(self._map[start:stop])
+
+    def get_value(self, key, field, default=None):
+        """
+        Looks up a value by key for one specific field.
+        This only works if the exported lookup was a :class:`RowLookup` (without duplicate keys).
+
+        :param key:     Key to find in the lookup.
+        :param field:   The field name (as used during initialization of the lookup) for which to retrieve the value.
+        :param default: The value to return when the value was not found. Defaults to ``None``.
+        :type field:    str, unicode
+        """
+        row = self.get(key, ())
+        try:
+            return row[self._fieldmap[field.lower()]]
+        except LookupError:
+            return default
+
+    def keys(self):
+        """
+        Returns a list of all keys in the lookup (in no particular order).
+
+        :rtype: list
+        """
+        return list(self)
+
+
 class NodeSet(set):
     """
     Builds a set of unique node keys for coordinates in a feature class.
@@ -498,6 +1461,29 @@ class NodeSet(set):
 
         return field, all_vertices
 
+    def get_index(self, cell_size=None):
+        """
+        Returns a :class:`NodeIndex` for the node keys in the ``NodeSet``,
+        so that the nodes within a certain distance of (or nearest to) a coordinate can be found.
+
+        :param cell_size:   The optional grid cell size in coordinate units. See :class:`NodeIndex`.
+        :type cell_size:    int, float
+        :rtype:             NodeIndex
+        """
+        return NodeIndex(self, cell_size)
+
+    def find_nodekey(self, point, neighbors=None):
+        """
+        Returns the node key in the ``NodeSet`` that matches *point* (probing the adjacent node keys if required),
+        or ``None`` if there is no match. See :func:`find_nodekey` for details.
+
+        :param point:       The coordinate to find.
+        :param neighbors:   The number of neighbors to probe. If omitted, all neighbors are probed.
+        :type neighbors:    int
+        :rtype:             tuple
+        """
+        return find_nodekey(self, point, neighbors)
+
     def _populate(self, fc_path, where_clause, all_vertices):
         """ Populates the NodeSet with node keys. """
 
@@ -512,8 +1498,9 @@ class NodeSet(set):
                     continue
 
                 if all_vertices:
-                    for coord in _geo.get_vertices(shape):
-                        self.add(get_nodekey(*coord))
+                    coords, _ = _geo.get_coords(shape)
+                    keys = get_nodekeys(coords)
+                    self.update(map(tuple, keys.tolist()) if _np else keys)
                     continue
 
                 # When *all_vertices* is False (or the geometry is not a Multipoint), only get the start/end nodes
@@ -550,3 +1537,72 @@ class ValueSet(frozenset):
     def __init__(self, table_path, field, where_clause=None):
         # This override is only required for type hint purposes and to match __new__'s signature
         pass
+
+
+def _get_joinstrategy(num_keys, table_path):
+    """ Returns the cheapest join strategy for the number of keys, based on the number of rows in the table. """
+    num_rows = _meta.Describe(table_path).num_rows()
+    if num_rows and num_keys <= num_rows * JOIN_PUSHDOWN_RATIO:
+        return JOIN_PUSHDOWN
+    return JOIN_SCAN
+
+
+def join_keys(keys, table_path, key_field, value_fields, where_clause=None, strategy=None, max_workers=1):
+    """
+    Returns a generator of all rows in a table or feature class of which the *key_field* value occurs in *keys*.
+    Each row is a plain ``tuple`` of the *key_field* value, followed by the values of the *value_fields*.
+    Rows are returned in no particular order and are not held in memory (apart from the *keys*).
+
+    There are 2 join strategies:
+
+    - :data:`JOIN_PUSHDOWN`: the keys are queried in the database using IN clauses of (at most)
+      :data:`gpf.tools.queries.MAX_IN_SIZE` keys each (see :func:`gpf.cursors.search_in`);
+    - :data:`JOIN_SCAN`: all rows of the table are read and each key is looked up in memory.
+
+    If no *strategy* was specified, the pushdown strategy is chosen when the number of keys does not exceed
+    :data:`JOIN_PUSHDOWN_RATIO` times the number of rows in the table. Otherwise, the table is scanned.
+
+    Example:
+
+        >>> pipe_ids = ValueSet('C:/Temp/test.gdb/valves', 'PIPE_ID')
+        >>> for pipe_id, material in join_keys(pipe_ids, 'C:/Temp/test.gdb/pipes', 'ID', ['MATERIAL']):
+        >>>     print(pipe_id, material)
+
+    :param keys:            An iterable of key values (e.g. a :class:`ValueSet` or the keys of a :class:`Lookup`).
+                            ``None`` (NULL) keys are ignored.
+    :param table_path:      The full path to the table or feature class to join.
+    :param key_field:       The field in *table_path* that should match the *keys*.
+    :param value_fields:    The field name(s) for which the values should be returned.
+    :param where_clause:    An optional where clause to filter the table.
+    :param strategy:        The join strategy (:data:`JOIN_PUSHDOWN` or :data:`JOIN_SCAN`) to use.
+                            By default, the cheapest strategy is chosen (see above).
+    :param max_workers:     The number of IN queries that are read at the same time when the pushdown strategy is used.
+    :type keys:             set, frozenset, list, tuple, Lookup
+    :type table_path:       str, unicode
+    :type key_field:        str, unicode
+    :type value_fields:     str, unicode, list, tuple
+    :type where_clause:     str, unicode, gpf.tools.queries.Where
+    :type strategy:         str
+    :type max_workers:      int
+    :rtype:                 generator
+    :raises ValueError:     If an unsupported *strategy* was specified.
+    """
+    _vld.pass_if(strategy in (None, JOIN_PUSHDOWN, JOIN_SCAN), ValueError,
+                 'Join strategy should be {!r} or {!r}'.format(JOIN_PUSHDOWN, JOIN_SCAN))
+    if isinstance(value_fields, basestring):
+        value_fields = (value_fields, )
+    fields = [key_field] + list(value_fields)
+    keys = frozenset(k for k in keys if k is not None)
+    if not keys:
+        return
+
+    if (strategy or _get_joinstrategy(len(keys), table_path)) == JOIN_PUSHDOWN:
+        for row in _cursors.search_in(table_path, fields, key_field, keys, where_clause, max_workers=max_workers):
+            yield row
+        return
+
+    with _cursors.SearchCursor(table_path, fields, where_clause) as rows:
+        for batch in rows.fetch_batches():
+            for row in batch:
+                if row[0] in keys:
+                    yield row
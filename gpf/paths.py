@@ -735,6 +735,28 @@ class Workspace(Path):
         """
         return exists(self._path) if self.is_gdb else _os.path.exists(self._path)
 
+    @property
+    def last_modified(self):
+        """
+        Returns the last modification time (in seconds since the epoch) of the root workspace.
+        This is the most recent modification time of the root workspace directory itself and the files in it
+        (e.g. the tables of a File Geodatabase or the Shapefiles in a directory).
+
+        For remote (SDE) and in-memory workspaces or if the time cannot be determined, ``None`` is returned.
+
+        :rtype: float
+        """
+        root = self.get_root(self._path)
+        if self._is_remote or root.lower() == IN_MEMORY_WORKSPACE:
+            return None
+        try:
+            times = [_os.path.getmtime(root)]
+            if _os.path.isdir(root):
+                times.extend(_os.path.getmtime(_os.path.join(root, name)) for name in _os.listdir(root))
+            return max(times)
+        except OSError:
+            return None
+
     @property
     def qualifier(self):
         """
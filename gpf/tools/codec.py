@@ -0,0 +1,597 @@
+# coding: utf-8
+#
+# Copyright 2019 Geocom Informatik AG / VertiGIS
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The *codec* module reads and writes geometries in the (OGC) WKB and EsriJSON formats,
+without creating any ArcPy objects. This module does not use ``arcpy`` at all.
+
+Geometries are decoded into a compact :class:`Shape`, which stores all vertex coordinates of all parts in a single
+coordinate buffer (a NumPy array if NumPy is available), along with the start offset of each part.
+This makes it possible to read the geometries from a cursor as bytes or text (using the ``SHAPE@WKB`` or
+``SHAPE@JSON`` fields) and calculate envelopes, vertex counts, lengths or node keys without the overhead of
+ArcPy ``Geometry`` objects.
+
+Example:
+
+    >>> with SearchCursor('C:/Temp/test.gdb/pipes', ['OID@', 'SHAPE@WKB']) as rows:
+    >>>     for oid, wkb in rows:
+    >>>         shape = from_wkb(wkb)
+    >>>         print(oid, shape.num_vertices, shape.length)
+"""
+
+import json as _json
+import struct as _struct
+from math import hypot as _hypot
+
+import gpf.common.const as _const
+import gpf.common.validate as _vld
+
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+# WKB geometry type codes (without Z or M flags)
+_WKB_POINT = 1
+_WKB_LINESTRING = 2
+_WKB_POLYGON = 3
+_WKB_MULTIPOINT = 4
+_WKB_MULTILINESTRING = 5
+_WKB_MULTIPOLYGON = 6
+
+# EWKB (PostGIS) dimension flags
+_EWKB_Z = 0x80000000
+_EWKB_M = 0x40000000
+_EWKB_SRID = 0x20000000
+
+# Mapping of WKB geometry types to shape types
+_WKB_SHAPETYPES = {
+    _WKB_POINT: _const.SHP_POINT,
+    _WKB_MULTIPOINT: _const.SHP_MULTIPOINT,
+    _WKB_LINESTRING: _const.SHP_POLYLINE,
+    _WKB_MULTILINESTRING: _const.SHP_POLYLINE,
+    _WKB_POLYGON: _const.SHP_POLYGON,
+    _WKB_MULTIPOLYGON: _const.SHP_POLYGON
+}
+
+_SHAPETYPES = {t.lower(): t for t in _WKB_SHAPETYPES.itervalues()}
+
+# EsriJSON keys that hold the coordinates for each geometry type
+_JSON_PATHS = 'paths'
+_JSON_RINGS = 'rings'
+_JSON_POINTS = 'points'
+_JSON_PARTS = {
+    _JSON_PATHS: _const.SHP_POLYLINE,
+    'curvePaths': _const.SHP_POLYLINE,
+    _JSON_RINGS: _const.SHP_POLYGON,
+    'curveRings': _const.SHP_POLYGON
+}
+
+
+class Shape(object):
+    """
+    Shape(shape_type, coords, {offsets}, {has_z})
+
+    Compact representation of a geometry, which stores the coordinates of all parts in a single buffer.
+
+    **Params:**
+
+    -   **shape_type** (str):
+
+        The geometry type: "Point", "Multipoint", "Polyline" or "Polygon" (case-insensitive).
+
+    -   **coords** (list, tuple, numpy.ndarray):
+
+        A NumPy array of shape (n, 2) or (n, 3) or a list of X, Y(, Z) coordinate tuples.
+
+    -   **offsets** (list, tuple):
+
+        The start index of each part (path or ring) in *coords*, optionally followed by the total number of
+        coordinates. If omitted, the shape has a single part. Point and Multipoint shapes always have 1 part.
+
+    -   **has_z** (bool):
+
+        If ``True``, the shape is Z aware and missing Z values are set to 0. If ``False``, Z values are ignored.
+        By default, this is derived from the number of values in the first coordinate.
+
+    After initialization, :attr:`coords` is a NumPy float array of shape (n, 2) or (n, 3) if NumPy is available,
+    or a list of float tuples otherwise. :attr:`offsets` always ends with the total number of coordinates,
+    so that the coordinates of part *i* are ``coords[offsets[i]:offsets[i + 1]]``.
+
+    :raises ValueError: If the shape type is not supported or if a coordinate or part offset is invalid.
+    """
+
+    __slots__ = 'shape_type', 'coords', 'offsets', 'has_z'
+
+    def __init__(self, shape_type, coords, offsets=None, has_z=None):
+        self.shape_type = _SHAPETYPES.get(str(shape_type).lower())
+        _vld.pass_if(self.shape_type, ValueError, 'Unsupported shape type {!r}'.format(shape_type))
+
+        num_coords = len(coords)
+        if has_z is None:
+            has_z = num_coords > 0 and len(coords[0]) > 2
+        self.has_z = bool(has_z)
+        self.coords = _make_coords(coords, 3 if has_z else 2)
+
+        if self.shape_type in (_const.SHP_POINT, _const.SHP_MULTIPOINT):
+            offsets = None
+        self.offsets = _get_offsets(offsets, num_coords)
+
+        if self.shape_type == _const.SHP_POINT:
+            _vld.pass_if(num_coords <= 1, ValueError, 'Point shape cannot have more than 1 coordinate')
+
+    @classmethod
+    def _create(cls, shape_type, coords, offsets, has_z):
+        """ Creates a new Shape from an already validated shape type and coordinate buffer. """
+        shape = cls.__new__(cls)
+        shape.shape_type = shape_type
+        shape.coords = coords
+        shape.offsets = _get_offsets(offsets, len(coords))
+        shape.has_z = has_z
+        return shape
+
+    def __len__(self):
+        return self.num_vertices
+
+    def __repr__(self):
+        return '{}({!r}, parts={}, vertices={}, has_z={})'.format(self.__class__.__name__, self.shape_type,
+                                                                  self.num_parts, self.num_vertices, self.has_z)
+
+    @property
+    def num_vertices(self):
+        """
+        Returns the total number of vertices (coordinates) in the shape.
+
+        :rtype: int
+        """
+        return len(self.coords)
+
+    @property
+    def num_parts(self):
+        """
+        Returns the number of parts (paths or rings) in the shape.
+
+        :rtype: int
+        """
+        return len(self.offsets) - 1
+
+    @property
+    def is_empty(self):
+        """
+        Returns ``True`` if the shape does not have any coordinates.
+
+        :rtype: bool
+        """
+        return self.num_vertices == 0
+
+    def get_part(self, index):
+        """
+        Returns the coordinates of the part at the given *index*.
+
+        :param index:   The part index.
+        :type index:    int
+        :rtype:         list, numpy.ndarray
+        """
+        if index < 0:
+            index += self.num_parts
+        _vld.pass_if(0 <= index < self.num_parts, IndexError, 'Part index out of range')
+        return self.coords[self.offsets[index]:self.offsets[index + 1]]
+
+    def iter_parts(self):
+        """
+        Returns a generator of the coordinates of each part.
+
+        :rtype: generator
+        """
+        for i in xrange(self.num_parts):
+            yield self.coords[self.offsets[i]:self.offsets[i + 1]]
+
+    @property
+    def first_point(self):
+        """
+        Returns the first coordinate tuple of the shape or ``None`` if the shape is empty.
+
+        :rtype: tuple
+        """
+        return _get_tuple(self.coords[0]) if self.num_vertices else None
+
+    @property
+    def last_point(self):
+        """
+        Returns the last coordinate tuple of the shape or ``None`` if the shape is empty.
+
+        :rtype: tuple
+        """
+        return _get_tuple(self.coords[-1]) if self.num_vertices else None
+
+    @property
+    def envelope(self):
+        """
+        Returns the 2D envelope (XMin, YMin, XMax, YMax) of the shape or ``None`` if the shape is empty.
+
+        :rtype: tuple
+        """
+        if not self.num_vertices:
+            return None
+        if _np and isinstance(self.coords, _np.ndarray):
+            xy = self.coords[:, :2]
+            return tuple(xy.min(axis=0).tolist() + xy.max(axis=0).tolist())
+        xs = [c[0] for c in self.coords]
+        ys = [c[1] for c in self.coords]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    @property
+    def length(self):
+        """
+        Returns the 2D length of the shape (i.e. the perimeter for polygons, 0 for points and multipoints).
+        Curves are not taken into account: the length is calculated using straight segments between the vertices.
+
+        :rtype: float
+        """
+        if self.shape_type in (_const.SHP_POINT, _const.SHP_MULTIPOINT) or self.num_vertices < 2:
+            return 0.0
+        if _np and isinstance(self.coords, _np.ndarray):
+            segments = _np.diff(self.coords[:, :2], axis=0)
+            lengths = _np.hypot(segments[:, 0], segments[:, 1])
+            # Exclude the "segments" between the last vertex of a part and the first vertex of the next part
+            # (an empty part at the start or the end of the shape does not have such a segment)
+            lengths[[i - 1 for i in self.offsets[1:-1] if 0 < i < self.num_vertices]] = 0.0
+            return float(lengths.sum())
+        total = 0.0
+        for part in self.iter_parts():
+            total += sum(_hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(part, part[1:]))
+        return total
+
+
+def _get_offsets(offsets, num_coords):
+    """
+    Returns a list of the part *offsets* that always ends with *num_coords*.
+
+    :raises ValueError: If the offsets do not start at 0 or are not ascending up to *num_coords*.
+    """
+    if not num_coords:
+        return [0]
+    offsets = list(offsets or [0])
+    if offsets[-1] != num_coords:
+        offsets.append(num_coords)
+    _vld.pass_if(offsets[0] == 0 and all(a <= b for a, b in zip(offsets, offsets[1:])), ValueError,
+                 'Part offsets should start at 0 and be ascending up to the number of coordinates')
+    return offsets
+
+
+def _check_nulls(array, coords):
+    """
+    Raises a ValueError if the NumPy *array* contains NaN values that were converted from ``None`` in *coords*.
+    NumPy silently converts ``None`` to NaN, whereas ``float(None)`` raises an error.
+    """
+    if _np.isnan(array).any() and any(v is None for c in coords for v in c):
+        raise ValueError('Coordinates should not contain NULL values')
+
+
+def _get_tuple(coord):
+    """ Returns a coordinate (from a NumPy array or list) as a tuple of floats. """
+    return tuple(coord.tolist() if _np and isinstance(coord, _np.ndarray) else coord)
+
+
+def _make_coords(coords, dim):
+    """
+    Returns a coordinate buffer with *dim* values per coordinate: a NumPy float array if NumPy is available or a
+    list of float tuples otherwise. Missing Z values are set to 0.
+    """
+    if _np and isinstance(coords, _np.ndarray):
+        _vld.pass_if(coords.ndim == 2 or not coords.size, ValueError, 'Coordinate array should have 2 dimensions')
+        array = coords.reshape(-1, coords.shape[-1] if coords.ndim == 2 else dim).astype(_np.float64)
+        if coords.dtype == object:
+            _check_nulls(array, coords)
+        coords = array
+        if coords.shape[1] < dim:
+            coords = _np.hstack((coords, _np.zeros((len(coords), dim - coords.shape[1]))))
+        return coords[:, :dim]
+    try:
+        coords = [tuple(float(v) for v in c[:dim]) + (0.0, ) * (dim - len(c)) for c in coords]
+    except (TypeError, ValueError):
+        raise ValueError('Coordinates should be sequences of at least 2 numbers')
+    _vld.pass_if(all(len(c) == dim for c in coords), ValueError, 'Coordinates should have at least 2 values')
+    if _np:
+        return _np.array(coords, dtype=_np.float64).reshape(-1, dim)
+    return coords
+
+
+def _close_rings(shape):
+    """ Returns a list of coordinate lists for each part. Polygon rings are closed if required. """
+    if _np and isinstance(shape.coords, _np.ndarray):
+        parts = [map(tuple, part.tolist()) for part in shape.iter_parts()]
+    else:
+        parts = [[tuple(c) for c in part] for part in shape.iter_parts()]
+    if shape.shape_type == _const.SHP_POLYGON:
+        for ring in parts:
+            if ring and ring[0] != ring[-1]:
+                ring.append(ring[0])
+    return parts
+
+
+def _get_ringarea(ring):
+    """ Returns the signed (2D) area of a ring: positive if the ring is counter-clockwise, negative if clockwise. """
+    return sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(ring, ring[1:])) / 2.0
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# EsriJSON
+
+def _get_jsoncoord(vertex, dim):
+    """
+    Returns the first *dim* values of an EsriJSON vertex.
+    For curve segments (e.g. ``{"c": [[x, y], [cx, cy]]}``), the end point of the segment is returned.
+    """
+    if isinstance(vertex, dict):
+        vertex = next(vertex.itervalues())[0]
+    return vertex[:dim]
+
+
+def from_esrijson(esri_json):
+    """
+    Decodes an EsriJSON string or dictionary into a :class:`Shape`.
+    For curved segments, only the end points are read (the curves are not densified). M values are ignored.
+
+    :param esri_json:   An EsriJSON string or dictionary (e.g. as returned by the ``SHAPE@JSON`` cursor field).
+    :type esri_json:    str, unicode, dict
+    :rtype:             Shape
+    :raises ValueError: If the EsriJSON could not be parsed.
+    """
+    if isinstance(esri_json, basestring):
+        try:
+            esri_json = _json.loads(esri_json)
+        except ValueError:
+            raise ValueError('Failed to parse EsriJSON')
+    _vld.pass_if(isinstance(esri_json, dict), ValueError, 'EsriJSON should be a string or dictionary')
+
+    has_z = bool(esri_json.get('hasZ'))
+    dim = 3 if has_z else 2
+    shape_type = parts = None
+    for key, value in esri_json.iteritems():
+        if key in _JSON_PARTS:
+            shape_type, parts = _JSON_PARTS[key], value
+            break
+    if parts is None:
+        if _JSON_POINTS in esri_json:
+            shape_type, parts = _const.SHP_MULTIPOINT, [esri_json[_JSON_POINTS]]
+        elif 'x' in esri_json:
+            # An empty point has an x value of None (or "NaN")
+            x = esri_json['x']
+            shape_type = _const.SHP_POINT
+            parts = [[(x, esri_json.get('y'), esri_json.get('z') or 0.0)]] if _vld.is_number(x) else []
+        else:
+            raise ValueError('EsriJSON does not contain any known geometry type')
+
+    coords = []
+    offsets = [0]
+    try:
+        for part in parts:
+            coords.extend(_get_jsoncoord(v, dim) for v in part)
+            offsets.append(len(coords))
+    except (TypeError, IndexError, StopIteration):
+        raise ValueError('Failed to parse EsriJSON coordinates')
+    if shape_type == _const.SHP_MULTIPOINT:
+        offsets = [0, len(coords)] if coords else [0]
+
+    if _np:
+        try:
+            array = _np.array(coords, dtype=_np.float64).reshape(-1, dim)
+        except (TypeError, ValueError):
+            raise ValueError('Failed to parse EsriJSON coordinates')
+        _check_nulls(array, coords)
+        return Shape._create(shape_type, array, offsets, has_z)
+    return Shape(shape_type, coords, offsets, has_z)
+
+
+def to_esrijson(shape, as_text=False):
+    """
+    Encodes a :class:`Shape` as EsriJSON. Polygon rings that are not closed will be closed automatically.
+
+    :param shape:       The shape to encode.
+    :param as_text:     If ``True``, a JSON string is returned instead of a dictionary.
+    :type shape:        Shape
+    :type as_text:      bool
+    :rtype:             dict, str
+    """
+    parts = _close_rings(shape)
+    esri_json = {}
+    if shape.shape_type == _const.SHP_POINT:
+        esri_json.update(zip('xyz', parts[0][0]) if parts else (('x', None), ('y', None)))
+    elif shape.shape_type == _const.SHP_MULTIPOINT:
+        esri_json[_JSON_POINTS] = [list(c) for c in parts[0]] if parts else []
+    else:
+        parts = [[list(c) for c in part] for part in parts]
+        esri_json[_JSON_RINGS if shape.shape_type == _const.SHP_POLYGON else _JSON_PATHS] = parts
+    if shape.has_z:
+        esri_json['hasZ'] = True
+    return _json.dumps(esri_json) if as_text else esri_json
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# WKB
+
+class _WKBReader(object):
+    """ Reads the coordinates of a geometry from a WKB buffer, keeping track of the current position. """
+
+    def __init__(self, data):
+        self._data = data
+        self._pos = 0
+        self._chunks = []
+        self.num_coords = 0
+        self.offsets = [0]
+        self.has_z = None
+
+    def _unpack(self, fmt, size):
+        values = _struct.unpack_from(fmt, self._data, self._pos)
+        self._pos += size
+        return values
+
+    def _read_header(self):
+        """ Reads the byte order and geometry type and returns a tuple of (byte order, type, dimensions, has Z). """
+        byte_order = '<' if self._unpack('B', 1)[0] else '>'
+        wkb_type = self._unpack(byte_order + 'I', 4)[0]
+        if wkb_type & (_EWKB_Z | _EWKB_M | _EWKB_SRID):
+            # Extended WKB (PostGIS)
+            has_z, has_m = bool(wkb_type & _EWKB_Z), bool(wkb_type & _EWKB_M)
+            if wkb_type & _EWKB_SRID:
+                self._pos += 4
+            wkb_type &= 0xFFFF
+        else:
+            # ISO WKB: 1000+ = Z, 2000+ = M, 3000+ = ZM
+            dim_flag, wkb_type = divmod(wkb_type, 1000)
+            has_z, has_m = dim_flag in (1, 3), dim_flag in (2, 3)
+        if self.has_z is None:
+            # The dimensions of the outer geometry determine the dimensions of the shape
+            self.has_z = has_z
+        return byte_order, wkb_type, 2 + has_z + has_m, has_z
+
+    def _read_points(self, byte_order, count, dim, has_z):
+        """ Reads *count* points with *dim* values each and adds their X, Y (and Z) values to the coordinates. """
+        num_values = count * dim
+        if _np:
+            values = _np.frombuffer(self._data, byte_order + 'f8', num_values, self._pos).reshape(-1, dim)
+            if not self.has_z:
+                values = values[:, :2]
+            elif has_z:
+                values = values[:, :3]
+            else:
+                values = _np.hstack((values[:, :2], _np.zeros((count, 1))))
+            self._chunks.append(values)
+        else:
+            values = _struct.unpack_from('{}{}d'.format(byte_order, num_values), self._data, self._pos)
+            for i in xrange(0, num_values, dim):
+                if not self.has_z:
+                    self._chunks.append(values[i:i + 2])
+                elif has_z:
+                    self._chunks.append(values[i:i + 3])
+                else:
+                    self._chunks.append(values[i:i + 2] + (0.0, ))
+        self._pos += num_values * 8
+        self.num_coords += count
+
+    def read(self):
+        """ Reads the (next) geometry from the buffer and returns its shape type. """
+        byte_order, wkb_type, dim, has_z = self._read_header()
+        _vld.pass_if(wkb_type in _WKB_SHAPETYPES, ValueError, 'Unsupported WKB geometry type {}'.format(wkb_type))
+        if wkb_type == _WKB_POINT:
+            x, y = _struct.unpack_from(byte_order + 'dd', self._data, self._pos)
+            if x == x and y == y:
+                self._read_points(byte_order, 1, dim, has_z)
+            else:
+                # An empty point has NaN coordinates
+                self._pos += dim * 8
+        elif wkb_type == _WKB_LINESTRING:
+            self._read_points(byte_order, self._unpack(byte_order + 'I', 4)[0], dim, has_z)
+            self.offsets.append(self.num_coords)
+        elif wkb_type == _WKB_POLYGON:
+            for _ in xrange(self._unpack(byte_order + 'I', 4)[0]):
+                self._read_points(byte_order, self._unpack(byte_order + 'I', 4)[0], dim, has_z)
+                self.offsets.append(self.num_coords)
+        else:
+            # Multi-geometry: read all sub-geometries
+            for _ in xrange(self._unpack(byte_order + 'I', 4)[0]):
+                self.read()
+        return _WKB_SHAPETYPES[wkb_type]
+
+    def get_coords(self):
+        """ Returns all coordinates that have been read (a NumPy array or a list of tuples). """
+        if not _np:
+            return self._chunks
+        if not self._chunks:
+            return _np.empty((0, 3 if self.has_z else 2))
+        return _np.concatenate(self._chunks)
+
+
+def from_wkb(wkb):
+    """
+    Decodes (OGC, ISO or extended PostGIS) WKB into a :class:`Shape`. M values are ignored.
+
+    LineStrings and MultiLineStrings become a Polyline shape, Polygons and MultiPolygons a Polygon shape
+    (where each ring is a part) and MultiPoints a Multipoint shape.
+
+    :param wkb:         The WKB data (e.g. as returned by the ``SHAPE@WKB`` cursor field).
+    :type wkb:          bytearray, str, buffer
+    :rtype:             Shape
+    :raises ValueError: If the WKB could not be parsed.
+    """
+    reader = _WKBReader(wkb)
+    try:
+        shape_type = reader.read()
+    except (_struct.error, TypeError) as e:
+        raise ValueError('Failed to parse WKB: {}'.format(e))
+    coords = reader.get_coords()
+    offsets = reader.offsets
+    if shape_type in (_const.SHP_POINT, _const.SHP_MULTIPOINT):
+        offsets = [0, reader.num_coords] if reader.num_coords else [0]
+    if _np:
+        return Shape._create(shape_type, coords, offsets, bool(reader.has_z))
+    return Shape(shape_type, coords, offsets, bool(reader.has_z))
+
+
+def _pack_points(points, dim):
+    return _struct.pack('<I{}d'.format(len(points) * dim), len(points), *(v for p in points for v in p[:dim]))
+
+
+def to_wkb(shape):
+    """
+    Encodes a :class:`Shape` as little-endian ISO WKB (Z aware shapes use the 1000+ geometry types).
+
+    Polylines with a single part become a LineString and a MultiLineString otherwise.
+    Polygons become a Polygon or MultiPolygon: each clockwise ring (an exterior ring in Esri geometries)
+    starts a new polygon, and counter-clockwise rings are added as interior rings to the preceding polygon.
+    Polygon rings that are not closed will be closed automatically.
+
+    :param shape:   The shape to encode.
+    :type shape:    Shape
+    :rtype:         str
+    """
+    dim = 3 if shape.has_z else 2
+    z_flag = 1000 if shape.has_z else 0
+    parts = _close_rings(shape)
+
+    def header(wkb_type):
+        return _struct.pack('<BI', 1, wkb_type + z_flag)
+
+    if shape.shape_type == _const.SHP_POINT:
+        point = parts[0][0] if parts and parts[0] else (float('nan'), ) * dim
+        return header(_WKB_POINT) + _struct.pack('<{}d'.format(dim), *point[:dim])
+
+    if shape.shape_type == _const.SHP_MULTIPOINT:
+        points = parts[0] if parts else []
+        return header(_WKB_MULTIPOINT) + _struct.pack('<I', len(points)) + \
+            b''.join(header(_WKB_POINT) + _struct.pack('<{}d'.format(dim), *p[:dim]) for p in points)
+
+    if shape.shape_type == _const.SHP_POLYLINE:
+        if len(parts) == 1:
+            return header(_WKB_LINESTRING) + _pack_points(parts[0], dim)
+        return header(_WKB_MULTILINESTRING) + _struct.pack('<I', len(parts)) + \
+            b''.join(header(_WKB_LINESTRING) + _pack_points(p, dim) for p in parts)
+
+    # Group the polygon rings: clockwise rings are exterior rings, counter-clockwise rings are interior rings
+    polygons = []
+    for ring in parts:
+        if not polygons or _get_ringarea(ring) < 0:
+            polygons.append([ring])
+        else:
+            polygons[-1].append(ring)
+
+    def pack_polygon(rings):
+        return header(_WKB_POLYGON) + _struct.pack('<I', len(rings)) + b''.join(_pack_points(r, dim) for r in rings)
+
+    if len(polygons) == 1:
+        return pack_polygon(polygons[0])
+    return header(_WKB_MULTIPOLYGON) + _struct.pack('<I', len(polygons)) + b''.join(pack_polygon(p) for p in polygons)
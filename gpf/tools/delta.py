@@ -0,0 +1,433 @@
+# coding: utf-8
+#
+# Copyright 2019 Geocom Informatik AG / VertiGIS
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module that detects the changes (inserts, updates and deletes) between two versions of a table.
+
+Instead of holding both tables in memory, only a 64-bit hash of the row values is kept for each key of the
+base (old) table. The other (new) table is then read in a single streaming pass.
+
+Example:
+
+    >>> for change, key, values in iter_changes('C:/Temp/old.gdb/pipes', 'C:/Temp/new.gdb/pipes',
+    >>>                                         'ID', ['MATERIAL', 'LENGTH']):
+    >>>     print(change, key, values)
+    ('update', 1234, (u'PE', 12.3))
+    ('insert', 1240, (u'PVC', 1.5))
+    ('delete', 1001, None)
+
+The :class:`FingerprintIndex` stores these row hashes in a file, so that a script can process only the rows that
+changed since its previous run.
+
+If NumPy is available and all keys are integers, the keys and row hashes are stored in 2 sorted 64-bit
+integer arrays (16 bytes per row) instead of a ``dict``.
+"""
+
+import cPickle as _pickle
+import hashlib as _hashlib
+import os as _os
+import struct as _struct
+import tempfile as _tf
+from itertools import izip as _izip
+
+import gpf.common.textutils as _tu
+import gpf.common.validate as _vld
+import gpf.cursors as _cursors
+
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+#: The change type of a row that only exists in the new table.
+INSERT = 'insert'
+#: The change type of a row of which the values have changed.
+UPDATE = 'update'
+#: The change type of a row that only exists in the base (old) table.
+DELETE = 'delete'
+
+# Row hashes are stored as signed 64-bit integers, so that they remain a (compact) int in 64-bit Python
+_HASH = _struct.Struct('<q')
+
+# Identifies a fingerprint index file (the first object in the file)
+_INDEX_MAGIC = 'GPFFPI1'
+
+# Range of the keys that can be stored in a 64-bit integer array
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+
+def _normalize(value):
+    """ Returns a normalized value, so that equal values have the same representation (e.g. str and unicode). """
+    if isinstance(value, basestring):
+        return _tu.to_unicode(value)
+    if isinstance(value, bytearray):
+        return str(value)
+    if isinstance(value, (int, long)) and not isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def get_hash(values):
+    """
+    Returns a 64-bit hash (``int``) for a sequence of row values, which is the same in every process (and platform).
+    Text values are hashed as ``unicode`` and ``long`` values as ``int``, so that e.g. ``'a'`` and ``u'a'``
+    result in the same hash.
+
+    :param values:  A sequence of (basic) row values (e.g. a row tuple as returned by a cursor).
+    :type values:   tuple, list
+    :rtype:         int
+
+    .. note::   The hash is based on the ``repr()`` of the values. This means that geometries should be read as
+                a text or binary representation (e.g. ``SHAPE@WKB``) instead of as a geometry object.
+    """
+    text = repr(tuple(_normalize(v) for v in values))
+    return _HASH.unpack(_hashlib.md5(text).digest()[:_HASH.size])[0]
+
+
+def _is_int64(key):
+    """ Returns ``True`` if *key* is an integer that fits in a 64-bit integer array. """
+    return isinstance(key, (int, long)) and not isinstance(key, bool) and _INT64_MIN <= key <= _INT64_MAX
+
+
+class _SortedHashes(object):
+    """
+    Compact, read-only mapping of integer keys and row hashes, which are stored in 2 sorted NumPy int64 arrays.
+    If a key occurs more than once, the last row hash is kept (like in a ``dict``).
+    """
+
+    def __init__(self, keys, hashes):
+        keys = _np.array(keys, dtype=_np.int64)
+        hashes = _np.array(hashes, dtype=_np.int64)
+        order = keys.argsort(kind='mergesort')
+        keys, hashes = keys[order], hashes[order]
+        last = _np.append(keys[1:] != keys[:-1], True) if len(keys) else _np.empty(0, dtype=bool)
+        self.keys, self.hashes = keys[last], hashes[last]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __iter__(self):
+        return iter(self.keys.tolist())
+
+    def __contains__(self, key):
+        return self.find(key) >= 0
+
+    def find(self, key):
+        """ Returns the position of *key* in the sorted keys or -1 if the key was not found. """
+        if not _is_int64(key):
+            return -1
+        i = int(self.keys.searchsorted(key))
+        return i if i < len(self.keys) and self.keys[i] == key else -1
+
+    def get(self, key, default=None):
+        i = self.find(key)
+        return default if i < 0 else int(self.hashes[i])
+
+
+def _make_hashes(items):
+    """
+    Returns a compact :class:`_SortedHashes` for an iterable of (key, hash) tuples if NumPy is available and all keys
+    are integers, or a ``dict`` otherwise.
+    """
+    if not _np:
+        return dict(items)
+    items = iter(items)
+    keys = []
+    hashes = []
+    for key, row_hash in items:
+        if not _is_int64(key):
+            result = dict(_izip(keys, hashes))
+            result[key] = row_hash
+            result.update(items)
+            return result
+        keys.append(key)
+        hashes.append(row_hash)
+    return _SortedHashes(keys, hashes)
+
+
+def iter_hashes(table_path, key_field, value_fields, where_clause=None):
+    """
+    Returns a generator of (key, hash) tuples for all rows in a table or feature class, where the hash is
+    calculated using :func:`get_hash` on the values of the *value_fields*. Rows with a NULL key are skipped.
+
+    :param table_path:      The full path to the table or feature class.
+    :param key_field:       The name of the (unique) key field.
+    :param value_fields:    The field name(s) of which the values should be hashed.
+    :param where_clause:    An optional where clause to filter the table.
+    :type table_path:       str, unicode
+    :type key_field:        str, unicode
+    :type value_fields:     str, unicode, list, tuple
+    :type where_clause:     str, unicode, gpf.tools.queries.Where
+    :rtype:                 generator
+    """
+    for key, values in _iter_rows(table_path, key_field, value_fields, where_clause):
+        yield key, get_hash(values)
+
+
+def get_hashes(table_path, key_field, value_fields, where_clause=None):
+    """
+    Returns a ``dict`` with a hash (see :func:`get_hash`) of the *value_fields* for each key in a table or
+    feature class. This ``dict`` can be used as the *base* for :func:`iter_changes`.
+    See :func:`iter_hashes` for a description of the parameters.
+
+    :rtype:                 dict
+    :raises RuntimeError:   When the table could not be read.
+    """
+    return _read_hashes(dict, table_path, key_field, value_fields, where_clause)
+
+
+def _read_hashes(factory, table_path, key_field, value_fields, where_clause=None):
+    """ Returns the result of *factory* for the (key, hash) tuples of all rows (see :func:`iter_hashes`). """
+    try:
+        return factory(iter_hashes(table_path, key_field, value_fields, where_clause))
+    except RuntimeError as e:
+        raise RuntimeError('Failed to calculate row hashes for {}: {}'.format(_tu.to_repr(table_path), e))
+
+
+def _iter_rows(table_path, key_field, value_fields, where_clause=None):
+    """ Returns a generator of (key, values) tuples for all rows that do not have a NULL key. """
+    if isinstance(value_fields, basestring):
+        value_fields = (value_fields, )
+    _vld.pass_if(value_fields, ValueError, 'At least 1 value field is required')
+    with _cursors.SearchCursor(table_path, [key_field] + list(value_fields), where_clause) as rows:
+        for batch in rows.fetch_batches():
+            for row in batch:
+                if row[0] is not None:
+                    yield row[0], row[1:]
+    del rows
+
+
+def iter_changes(base, table_path, key_field, value_fields, where_clause=None, new_hashes=None):
+    """
+    Compares a table or feature class with a *base* version by key and returns a generator of
+    (change type, key, values) tuples for each row that was inserted, updated or deleted.
+
+    The change type is :data:`INSERT`, :data:`UPDATE` or :data:`DELETE`. For inserts and updates, the values
+    are the current values of the *value_fields* (a ``tuple``) in *table_path*. For deletes, the values are ``None``.
+    The inserts and updates are returned while *table_path* is read, followed by the deletes.
+
+    Only the 64-bit row hashes for the *base* are kept in memory: the rows of *table_path* itself are
+    not stored. If *base* is a ``dict`` of row hashes (e.g. as returned by :func:`get_hashes` on an earlier run),
+    the base table does not need to be read at all.
+
+    :param base:            The path to the base (old) table or a ``dict`` of keys and row hashes.
+                            If it's a table, it should have the same *key_field* and *value_fields*.
+    :param table_path:      The full path to the new table or feature class.
+    :param key_field:       The name of the (unique) key field.
+    :param value_fields:    The field name(s) that should be compared.
+    :param where_clause:    An optional where clause to filter both tables.
+    :param new_hashes:      An optional ``dict`` that receives the row hash for each key in *table_path*,
+                            which can be used as the *base* for the next run.
+    :type base:             str, unicode, dict
+    :type table_path:       str, unicode
+    :type key_field:        str, unicode
+    :type value_fields:     str, unicode, list, tuple
+    :type where_clause:     str, unicode, gpf.tools.queries.Where
+    :type new_hashes:       dict
+    :rtype:                 generator
+    """
+    if isinstance(base, _SortedHashes):
+        hashes = base
+    elif isinstance(base, dict):
+        # Copy the base hashes, since the matched keys are removed
+        hashes = base.copy()
+    else:
+        hashes = _read_hashes(_make_hashes, base, key_field, value_fields, where_clause)
+
+    if isinstance(hashes, _SortedHashes):
+        # The arrays are read-only: flag the matched keys instead of removing them
+        matched = bytearray(len(hashes))
+
+        def pop(key, default):
+            i = hashes.find(key)
+            if i < 0 or matched[i]:
+                return default
+            matched[i] = 1
+            return int(hashes.hashes[i])
+    else:
+        matched = None
+        pop = hashes.pop
+
+    for key, values in _iter_rows(table_path, key_field, value_fields, where_clause):
+        old_hash = pop(key, None)
+        if old_hash is None and new_hashes is None:
+            yield INSERT, key, values
+            continue
+        row_hash = get_hash(values)
+        if new_hashes is not None:
+            new_hashes[key] = row_hash
+        if old_hash is None:
+            yield INSERT, key, values
+        elif old_hash != row_hash:
+            yield UPDATE, key, values
+
+    if matched is None:
+        deleted = iter(hashes)
+    else:
+        deleted = (key for key, m in _izip(hashes, matched) if not m)
+    for key in deleted:
+        yield DELETE, key, None
+
+
+class FingerprintIndex(object):
+    """
+    FingerprintIndex(path)
+
+    Persistent index of a 64-bit row hash (fingerprint, see :func:`get_hash`) for each key in a table or
+    feature class. Scripts that run regularly can use this index to process only the rows that were inserted or
+    updated since their previous run, instead of processing all rows every time.
+    If the index file exists, it is loaded immediately. Otherwise, the index is empty and all rows are reported as
+    inserted on the first run.
+
+    Example:
+
+        >>> index = FingerprintIndex('C:/Temp/pipes_qa.fpi')
+        >>> for change, key, values in index.iter_changes('C:/Temp/test.gdb/pipes', 'ID', ['MATERIAL', 'LENGTH']):
+        >>>     if change != DELETE:
+        >>>         run_qa_checks(key, values)
+        >>> index.save()
+
+    **Params:**
+
+    -   **path** (str, unicode):
+
+        The path to the index file.
+
+    :raises ValueError: If the file exists, but is not a valid fingerprint index file.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._fields = None
+        self._hashes = {}
+        if _os.path.isfile(path):
+            self._load()
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __iter__(self):
+        return iter(self._hashes)
+
+    def __contains__(self, key):
+        return key in self._hashes
+
+    def _load(self):
+        """ Reads the fields and row hashes (a ``dict`` or a tuple of key and hash arrays) from the index file. """
+        try:
+            with open(self._path, 'rb') as f:
+                magic, fields = _pickle.load(f)
+                hashes = _pickle.load(f) if magic == _INDEX_MAGIC else None
+            if isinstance(hashes, tuple):
+                hashes = _SortedHashes(*hashes)
+            elif isinstance(hashes, dict):
+                hashes = _make_hashes(hashes.iteritems())
+            else:
+                hashes = None
+        except Exception:
+            hashes = None
+        _vld.raise_if(hashes is None, ValueError,
+                      '{} is not a valid fingerprint index file'.format(_tu.to_repr(self._path)))
+        self._fields = fields
+        self._hashes = hashes
+
+    @staticmethod
+    def _get_fields(key_field, value_fields):
+        """ Returns a tuple of the (upper case) key field and a tuple of (upper case) value fields. """
+        if isinstance(value_fields, basestring):
+            value_fields = (value_fields, )
+        return key_field.upper(), tuple(f.upper() for f in value_fields)
+
+    @property
+    def path(self):
+        """
+        Returns the path to the index file.
+
+        :rtype: str, unicode
+        """
+        return self._path
+
+    def get(self, key, default=None):
+        """
+        Returns the row hash for the given *key* or *default* if the key was not found.
+
+        :param key:     The key value.
+        :param default: The value to return if the key was not found.
+        :rtype:         int
+        """
+        return self._hashes.get(key, default)
+
+    def build(self, table_path, key_field, value_fields, where_clause=None):
+        """
+        (Re)builds the index for all rows in a table or feature class, without reporting any changes.
+        Call :func:`save` to write the index to the file.
+        See :func:`iter_hashes` for a description of the parameters.
+
+        :raises RuntimeError:   When the table could not be read.
+        """
+        hashes = _read_hashes(_make_hashes, table_path, key_field, value_fields, where_clause)
+        self._fields = self._get_fields(key_field, value_fields)
+        self._hashes = hashes
+
+    def iter_changes(self, table_path, key_field, value_fields, where_clause=None, update=True):
+        """
+        Compares a table or feature class with the indexed row hashes and returns a generator of
+        (change type, key, values) tuples for each row that was inserted, updated or deleted since the index was
+        built or updated. See :func:`iter_changes` (module function) for a description of the tuples and parameters.
+
+        If *update* is ``True`` (default), the index is updated with the current row hashes once all rows have been
+        read. Call :func:`save` afterwards to write the updated index to the file.
+
+        :param update:      If ``True`` (default), the index is updated when the generator has been exhausted.
+        :type update:       bool
+        :rtype:             generator
+        :raises ValueError: If the index was built with another key field or other value fields.
+        """
+        fields = self._get_fields(key_field, value_fields)
+        if self._hashes and fields != self._fields:
+            raise ValueError('Fingerprint index was built for key field {!r} and value fields {!r}'.format(
+                    *self._fields))
+        new_hashes = {} if update else None
+        for change in iter_changes(self._hashes, table_path, key_field, value_fields, where_clause, new_hashes):
+            yield change
+
+        if update:
+            self._fields = fields
+            self._hashes = _make_hashes(new_hashes.iteritems())
+
+    def save(self):
+        """
+        Writes the index to the index file. An existing file will be overwritten.
+        The file is written to a temporary file first, so that an incomplete index file is never read.
+        """
+        out_dir = _os.path.dirname(_os.path.abspath(self._path))
+        tmp_path = None
+        try:
+            with _tf.NamedTemporaryFile(dir=out_dir, delete=False) as f:
+                tmp_path = f.name
+                _pickle.dump((_INDEX_MAGIC, self._fields), f, _pickle.HIGHEST_PROTOCOL)
+                hashes = self._hashes
+                if isinstance(hashes, _SortedHashes):
+                    hashes = hashes.keys, hashes.hashes
+                _pickle.dump(hashes, f, _pickle.HIGHEST_PROTOCOL)
+            if _os.path.exists(self._path):
+                _os.remove(self._path)
+            _os.rename(tmp_path, self._path)
+        except Exception:
+            if tmp_path and _os.path.exists(tmp_path):
+                _os.remove(tmp_path)
+            raise
@@ -104,8 +104,9 @@ def list_missing(table, expected_fields):
             if desc is None:
                 # Only describe the input table (= time-consuming) if @ has been used in a field name and only once
                 try:
-                    # Use arcpy's built-in Describe function, to avoid cyclic imports (in metadata module)
-                    desc = _arcpy.Describe(table)
+                    # Import the metadata module here to avoid cyclic imports and use its (cached) Describe function
+                    from gpf.tools import metadata as _meta
+                    desc = _meta.describe(table)
                 except (RuntimeError, OSError, AttributeError, ValueError, TypeError):
                     desc = object()
             if (field == _const.FIELD_OID and not getattr(desc, _const.DESC_FIELD_OID, None)) or \
@@ -171,6 +172,11 @@ def add_field(dataset, name, template_field=None, alias=None):
         field_is_required = template_field.required
         field_domain = template_field.domain
 
-    return _arcpy.AddField_management(dataset, name, field_type,
-                                      field_precision, field_scale, field_length, field_alias,
-                                      field_is_nullable, field_is_required, field_domain)
+    result = _arcpy.AddField_management(dataset, name, field_type,
+                                        field_precision, field_scale, field_length, field_alias,
+                                        field_is_nullable, field_is_required, field_domain)
+
+    # The schema has changed, so the cached metadata of the dataset is outdated
+    from gpf.tools import metadata as _meta
+    _meta.invalidate(dataset)
+    return result
@@ -18,9 +18,11 @@
 The *geometry* module contains functions that help working with Esri geometries.
 """
 
+import gpf.common.const as _const
 import gpf.common.iterutils as _iter
 import gpf.common.textutils as _tu
 import gpf.common.validate as _vld
+import gpf.tools.codec as _codec
 from gpf import arcpy as _arcpy
 
 
@@ -291,4 +293,108 @@ def get_vertices(geometry):
             for v in get_vertices(g):
                 yield v
     else:
-        yield tuple(v for v in get_xyz(geometry) if v)
+        yield tuple(v for v in get_xyz(geometry) if v is not None)
+
+
+def get_coords(geometry):
+    """
+    Returns all vertex coordinates of a geometry in one call, as a tuple of (*coords*, *offsets*).
+
+    *coords* contains all coordinates (of all parts) one after the other. If NumPy is available, *coords* is a
+    float array of shape (n, 2) or (n, 3) (for Z aware geometries). Otherwise, it is a list of coordinate tuples.
+    *offsets* is a list that holds the start index of each part (ring or path) in *coords*, followed by the total
+    number of coordinates, so that the coordinates of part *i* are ``coords[offsets[i]:offsets[i + 1]]``.
+
+    The coordinates are read from the EsriJSON representation of the geometry, which is much faster than iterating
+    over the geometry parts and points (e.g. using :func:`get_vertices`) for geometries with many vertices.
+    For curved segments, only the end points are returned (the curves are not densified). M values are ignored.
+
+    Example:
+
+        >>> coords, offsets = get_coords({'paths': [[[0, 0], [1, 1]], [[2, 2], [3, 3], [4, 4]]]})
+        >>> coords.tolist()
+        [[0.0, 0.0], [1.0, 1.0], [2.0, 2.0], [3.0, 3.0], [4.0, 4.0]]
+        >>> offsets
+        [0, 2, 5]
+
+    :param geometry:    An Esri Geometry instance or an EsriJSON string or dictionary.
+    :rtype:             tuple
+    :raises ValueError: If the geometry could not be parsed.
+
+    .. seealso::        :func:`gpf.tools.codec.from_esrijson` and :func:`gpf.tools.codec.from_wkb`, which return a
+                        :class:`gpf.tools.codec.Shape` that can also calculate the envelope or length.
+    """
+    shape = _codec.from_esrijson(getattr(geometry, 'JSON', geometry))
+    return shape.coords, shape.offsets
+
+
+def _get_jsonsr(spatial_reference):
+    """ Returns an EsriJSON spatial reference dictionary for a WKID or an ArcPy ``SpatialReference``. """
+    if isinstance(spatial_reference, (int, long)):
+        return {'wkid': spatial_reference}
+    wkid = getattr(spatial_reference, 'factoryCode', None)
+    if wkid:
+        return {'wkid': wkid}
+    try:
+        # The string contains the WKT, followed by the XY, Z and M domains and tolerances (separated by a ";")
+        return {'wkt': spatial_reference.exportToString().split(';')[0]}
+    except AttributeError:
+        raise ValueError('Spatial reference should be a WKID or SpatialReference instance')
+
+
+def get_esrijson(coords, offsets=None, shape_type=_const.SHP_POLYLINE, spatial_reference=None, has_z=None):
+    """
+    Returns an EsriJSON dictionary for a geometry of the given *shape_type* that is built from a coordinate buffer.
+    This is the reverse of :func:`get_coords`: the *coords* and *offsets* it returns can be passed in directly.
+
+    Polygon rings that are not closed will be closed automatically (like :func:`ShapeBuilder.as_polygon` does).
+
+    :param coords:              A NumPy array of shape (n, 2) or (n, 3) or a list of X, Y(, Z) coordinate tuples.
+    :param offsets:             The start index of each part in *coords*, optionally followed by the total number of
+                                coordinates (see :func:`get_coords`). If omitted, the geometry has a single part.
+                                Offsets are ignored for Point and Multipoint geometries.
+    :param shape_type:          The output geometry type: "Point", "Multipoint", "Polyline" (default) or "Polygon".
+    :param spatial_reference:   An optional WKID or ArcPy ``SpatialReference``.
+    :param has_z:               If ``True``, the geometry is Z aware. By default, this is derived from the number of
+                                values in the first coordinate.
+    :type offsets:              list, tuple
+    :type shape_type:           str
+    :type spatial_reference:    int, arcpy.SpatialReference
+    :type has_z:                bool
+    :rtype:                     dict
+    :raises ValueError:         If the *shape_type* is not supported or if a coordinate is invalid.
+    """
+    esri_json = _codec.to_esrijson(_codec.Shape(shape_type, coords, offsets, has_z))
+    if spatial_reference is not None:
+        esri_json['spatialReference'] = _get_jsonsr(spatial_reference)
+    return esri_json
+
+
+def build_geometry(coords, offsets=None, shape_type=_const.SHP_POLYLINE, spatial_reference=None, has_z=None):
+    """
+    Creates an Esri geometry from a coordinate buffer in a single ArcPy call.
+
+    Unlike the :class:`ShapeBuilder`, this function does not create an ArcPy ``Point`` for each coordinate:
+    the coordinates are converted into EsriJSON (see :func:`get_esrijson`), which is turned into a geometry
+    by :func:`arcpy.AsShape`. This is much faster for geometries with many vertices or when many geometries
+    need to be created.
+
+    Example:
+
+        >>> # create a Polyline with 2 parts
+        >>> build_geometry([(0, 0), (1, 1), (5, 5), (6, 5)], [0, 2], 'Polyline', 2056)
+        <Polyline object at 0x6a9bb70[0x6fe2540]>
+
+    :param coords:              A NumPy array of shape (n, 2) or (n, 3) or a list of X, Y(, Z) coordinate tuples.
+    :param offsets:             The start index of each part in *coords* (see :func:`get_esrijson`).
+    :param shape_type:          The output geometry type: "Point", "Multipoint", "Polyline" (default) or "Polygon".
+    :param spatial_reference:   An optional WKID or ArcPy ``SpatialReference``.
+    :param has_z:               If ``True``, the geometry is Z aware. By default, this is derived from the coordinates.
+    :rtype:                     arcpy.Geometry
+    :raises GeometryError:      If the geometry could not be created.
+    """
+    try:
+        esri_json = get_esrijson(coords, offsets, shape_type, spatial_reference, has_z)
+        return _arcpy.AsShape(esri_json, True)
+    except Exception as e:
+        raise GeometryError(e)
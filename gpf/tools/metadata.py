@@ -16,16 +16,121 @@
 
 """
 The metadata module contains functions and classes that help describe data.
+
+Because ArcPy's :func:`arcpy.Describe` can be slow (especially on SDE databases), the results for catalog paths
+(e.g. feature classes or tables in a geodatabase, shapefiles) are cached per process. Layers and table views are
+never cached, because their selection, definition query and row count can change at any time.
+The cache holds at most :data:`CACHE_SIZE` items, which expire after :data:`CACHE_TTL` seconds.
+If the schema of a dataset has been changed (e.g. a field was added), call :func:`invalidate` to clear its
+cached metadata.
 """
 
+import os as _os
+from collections import OrderedDict as _OrderedDict
+from threading import Lock as _Lock
+from timeit import default_timer as _timer
 from warnings import warn as _warn
 
 import gpf.common.const as _const
 import gpf.common.textutils as _tu
+import gpf.common.validate as _vld
 import gpf.cursors as _cursors
+import gpf.paths as _paths
 import gpf.tools.fieldutils as _fu
+import gpf.tools.queries as _q
 from gpf import arcpy as _arcpy
 
+#: The maximum number of Describe results that are kept in the cache (least recently used items are removed first).
+CACHE_SIZE = 256
+
+#: The number of seconds after which a cached Describe result expires.
+CACHE_TTL = 300
+
+# Layer files are not cached (like layers and table views), because their definition query may change
+_LAYER_EXTENSIONS = ('.lyr', '.lyrx')
+
+_cache = _OrderedDict()
+_cache_lock = _Lock()
+
+
+def _get_cachekey(element):
+    """
+    Returns the cache key (normalized path) for a Describe *element* or ``None`` if it cannot be cached.
+    Only geodatabase paths and existing files (e.g. shapefiles) are cached: not layers, table views or in-memory data.
+    """
+    if not isinstance(element, basestring) or not element:
+        return None
+    key = _paths.normalize(element)
+    if key.startswith(_paths.IN_MEMORY_WORKSPACE) or key.endswith(_LAYER_EXTENSIONS):
+        return None
+    try:
+        if _paths.is_gdbpath(element) or _os.path.isfile(element):
+            return key
+    except Exception:
+        pass
+    return None
+
+
+def _describe(element, refresh=False):
+    """
+    Returns the ArcPy Describe object for *element*.
+    If *element* is a path, the object is retrieved from the cache (unless *refresh* is ``True``) and cached.
+    """
+    key = _get_cachekey(element) if CACHE_SIZE > 0 else None
+    if key is None:
+        return _arcpy.Describe(element)
+
+    if not refresh:
+        with _cache_lock:
+            expires, obj = _cache.pop(key, (0, None))
+            if expires > _timer():
+                # Reinsert the item, so that it becomes the most recently used item
+                _cache[key] = expires, obj
+                return obj
+
+    obj = _arcpy.Describe(element)
+
+    with _cache_lock:
+        _cache[key] = _timer() + CACHE_TTL, obj
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(False)
+    return obj
+
+
+def invalidate(path=None):
+    """
+    Removes the cached metadata for the given *path* and all elements below it (e.g. all feature classes in a
+    feature dataset or workspace). If *path* is omitted, the whole cache is cleared.
+
+    This should be called when the schema of a dataset has changed within the same process
+    (e.g. after fields have been added or removed), so that the next :class:`Describe` returns up-to-date results.
+
+    :param path:    The path of the element (or workspace) for which to clear the cached metadata.
+    :type path:     str, unicode
+    """
+    with _cache_lock:
+        if path is None:
+            _cache.clear()
+            return
+        key = _paths.normalize(path)
+        prefix = key.rstrip('\\/') + _os.sep
+        for k in [k for k in _cache if k == key or k.startswith(prefix)]:
+            del _cache[k]
+
+
+def describe(element, cached=True):
+    """
+    Returns the ArcPy Describe object for *element*, like :func:`arcpy.Describe` does.
+    If *element* is a catalog path, the object is retrieved from the cache, if possible.
+    Unlike the :class:`Describe` class, this function does not catch any errors.
+
+    :param element: An object, name, or path of an element for which to retrieve its metadata.
+    :param cached:  If ``True`` (default), the metadata for a catalog path is retrieved from the cache, if possible.
+                    Set this to ``False`` to force a new :func:`arcpy.Describe` call (the result is still cached).
+    :type cached:   bool
+    """
+    return _describe(element, not cached)
+
 
 class DescribeWarning(RuntimeWarning):
     """ The warning type that is shown when ArcPy's :func:`arcpy.Describe` failed. """
@@ -50,6 +155,12 @@ class Describe(object):
 
         An object, name, or path of an element for which to retrieve its metadata.
 
+    -   **cached** (bool):
+
+        If ``True`` (default), the metadata for a catalog path is retrieved from the cache, if possible.
+        Set this to ``False`` to force a new :func:`arcpy.Describe` call (the result is still cached).
+        Layers and table views are never cached.
+
     .. note::   Only a limited amount of properties has been exposed in this class.
                 For a complete list of all possible properties, please have a look `here`_.
                 For these unlisted properties, the same rule applies: if it doesn't exist,
@@ -72,10 +183,10 @@ class Describe(object):
 
     __slots__ = '_obj'
 
-    def __init__(self, element):
+    def __init__(self, element, cached=True):
         self._obj = None
         try:
-            self._obj = _arcpy.Describe(element)
+            self._obj = _describe(element, not cached)
         except Exception as e:
             _warn(str(e), DescribeWarning)
 
@@ -113,31 +224,248 @@ class Describe(object):
         :param where_clause:    An optional where clause to base the row count on.
         :type where_clause:     str, unicode, gpf.tools.queries.Where
         :rtype:                 int
+
+        .. seealso::            :func:`count_many` for more information on how rows are counted if a where clause
+                                has been specified.
         """
-        field = None
         if where_clause:
-            if isinstance(where_clause, basestring):
-                field = _tu.unquote(where_clause.split()[0])
-            elif hasattr(where_clause, 'fields'):
-                field = where_clause.fields[0]
-            else:
-                raise ValueError('where_clause must be a string or Where instance')
+            return self.count_many([where_clause])[0]
 
         try:
-            if field:
-                # Iterate over the dataset rows, using the (first) field from the where_clause
-                with _cursors.SearchCursor(self.catalogPath, field, where_clause=where_clause) as rows:
-                    num_rows = sum(1 for _ in rows)
-                del rows
-            else:
-                # Use the ArcPy GetCount() tool for the row count
-                num_rows = int(_arcpy.GetCount_management(self.catalogPath).getOutput(0))
+            # Use the ArcPy GetCount() tool for the row count
+            num_rows = int(_arcpy.GetCount_management(self.catalogPath).getOutput(0))
         except Exception as e:
             _warn(str(e), DescribeWarning)
             num_rows = 0
 
         return num_rows
 
+    def count_many(self, where_clauses):
+        """
+        Returns a list with the number of rows for each where clause in *where_clauses* (in the same order).
+
+        For non-versioned tables in a remote (SDE) geodatabase, all rows are counted in the database itself,
+        using a single ``SELECT SUM(CASE WHEN ... THEN 1 ELSE 0 END), ...`` query for all where clauses.
+        For all other data sources (or if the SQL query failed), the table is read once by a cursor that only reads
+        the fields in the where clauses (and only returns the rows that match any of them),
+        while each where clause is evaluated for each row using :func:`gpf.tools.queries.compile_clause`.
+        The where clauses that cannot be evaluated that way (e.g. because they contain SQL functions)
+        are counted using a separate cursor that only reads the ObjectID field
+        (or the first field of the where clause, if there is no ObjectID field).
+
+        If the rows cannot be counted, a warning is shown and 0 is returned for that where clause.
+
+        :param where_clauses:   A list of where clauses (strings or :class:`gpf.tools.queries.Where` instances).
+        :type where_clauses:    list, tuple
+        :rtype:                 list
+        :raises ValueError:     If one of the where clauses is not a string or ``Where`` instance.
+        """
+        clauses = [self._get_whereclause(w) for w in where_clauses]
+        if not clauses:
+            return []
+
+        sql_target = self._get_sqltarget()
+        if sql_target:
+            try:
+                return self._count_sql(sql_target, clauses)
+            except Exception as e:
+                _warn('Failed to count rows using SQL: {}'.format(e), DescribeWarning)
+
+        counts = [None] * len(clauses)
+        if len(clauses) > 1:
+            self._count_single(clauses, counts)
+
+        for i, (clause, where_clause) in enumerate(zip(clauses, where_clauses)):
+            if counts[i] is not None:
+                continue
+            try:
+                counts[i] = self._count_cursor(clause, where_clause)
+            except Exception as e:
+                _warn(str(e), DescribeWarning)
+                counts[i] = 0
+        return counts
+
+    def _count_single(self, clauses, counts):
+        """
+        Counts the rows for all where clauses that can be evaluated in Python in a single cursor pass
+        and stores the results in *counts* (in place). The counts of the other where clauses remain ``None``.
+        """
+        fields = []
+        predicates = {}
+        for i, clause in enumerate(clauses):
+            try:
+                # Compile on a copy, so that a failed clause does not add its fields
+                clause_fields, predicates[i] = _q.compile_clause(clause, list(fields))
+            except ValueError:
+                continue
+            fields = clause_fields
+        if len(predicates) < 2:
+            # Nothing to gain over a separate cursor for each where clause
+            return
+
+        where_clause = None
+        if all(clauses[i] for i in predicates):
+            where_clause = u' OR '.join(u'({})'.format(clauses[i]) for i in predicates)
+        if not fields:
+            if not self.OIDFieldName:
+                return
+            fields.append(_const.FIELD_OID)
+
+        results = dict((i, 0) for i in predicates)
+        try:
+            with _cursors.SearchCursor(self.catalogPath, fields, where_clause=where_clause) as rows:
+                for batch in rows.fetch_batches():
+                    for i, predicate in predicates.iteritems():
+                        results[i] += sum(1 for row in batch if predicate(row) is True)
+            del rows
+        except Exception as e:
+            _warn('Failed to count rows in a single pass: {}'.format(e), DescribeWarning)
+            return
+
+        for i, count in results.iteritems():
+            counts[i] = count
+
+    def _get_whereclause(self, where_clause):
+        """ Returns the (delimited) where clause text for a string or ``Where`` instance. """
+        _vld.raise_if(not isinstance(where_clause, basestring) and not hasattr(where_clause, 'fields'),
+                      ValueError, 'where_clause must be a string or Where instance')
+        kwargs = {}
+        _q.add_where(kwargs, where_clause, self.catalogPath)
+        return kwargs.get(_q.WHERE_KWARG) or _const.CHAR_EMPTY
+
+    def _get_sqltarget(self):
+        """
+        Returns a tuple of (workspace path, table name) if the rows can be counted using SQL or ``None`` otherwise.
+        Versioned tables are excluded, because the edits in the delta tables would not be taken into account.
+        """
+        if not self.catalogPath or self.isVersioned:
+            return None
+        try:
+            workspace = _paths.get_workspace(self.catalogPath, True)
+        except (TypeError, ValueError):
+            return None
+        if not workspace.is_remote or not self.name:
+            return None
+        return str(workspace), self.name
+
+    @staticmethod
+    def _count_sql(sql_target, clauses):
+        """ Counts the rows for all where clauses in a single SQL query and returns a list of counts. """
+        workspace, table = sql_target
+        columns = u', '.join(u'SUM(CASE WHEN {} THEN 1 ELSE 0 END)'.format(c) if c else u'COUNT(*)' for c in clauses)
+        result = _arcpy.ArcSDESQLExecute(workspace).execute(u'SELECT {} FROM {}'.format(columns, table))
+        if not isinstance(result, list):
+            # A single value is returned as-is
+            result = [[result]]
+        # SUM() returns NULL if the table is empty
+        return [int(v or 0) for v in result[0]]
+
+    def _count_cursor(self, clause, where_clause):
+        """ Counts the rows for a single where clause using a cursor that reads as little data as possible. """
+        if self.OIDFieldName:
+            field = _const.FIELD_OID
+        elif isinstance(where_clause, basestring):
+            field = _tu.unquote(where_clause.split()[0])
+        else:
+            field = where_clause.fields[0]
+        with _cursors.SearchCursor(self.catalogPath, field, where_clause=clause or None) as rows:
+            num_rows = sum(len(batch) for batch in rows.fetch_batches())
+        del rows
+        return num_rows
+
+    def get_oid_range(self):
+        """
+        Returns a tuple of the (lowest, highest) ObjectID for a table or feature class.
+
+        If the current ``Describe`` object does not have an ObjectID field or does not have any rows,
+        ``(None, None)`` will be returned.
+
+        :rtype: tuple
+
+        .. note::   For data sources that support an ORDER BY clause (i.e. File, Personal and SDE geodatabases),
+                    only 2 rows need to be read. For all other data sources (e.g. shapefiles and dBASE tables, which
+                    silently ignore an ORDER BY clause), all ObjectIDs are read.
+        """
+        oid_field = self.OIDFieldName
+        if not oid_field:
+            return None, None
+
+        if self._supports_orderby():
+            bounds = self._get_orderedbounds(oid_field)
+            if bounds:
+                return bounds
+
+        # Read all ObjectIDs (e.g. when ORDER BY is not supported)
+        lower = upper = None
+        try:
+            with _cursors.SearchCursor(self.catalogPath, _const.FIELD_OID) as rows:
+                for batch in rows.fetch_batches():
+                    oids = [oid for oid, in batch]
+                    lower = min(oids) if lower is None else min(lower, min(oids))
+                    upper = max(oids) if upper is None else max(upper, max(oids))
+            del rows
+        except Exception as e:
+            _warn(str(e), DescribeWarning)
+        return lower, upper
+
+    def _supports_orderby(self):
+        """ Returns ``True`` if the data source is stored in a geodatabase that supports an ORDER BY clause. """
+        path = self.catalogPath
+        if not isinstance(path, basestring) or path.lower().startswith(_paths.IN_MEMORY_WORKSPACE):
+            return False
+        try:
+            return _paths.is_gdbpath(path)
+        except Exception:
+            return False
+
+    def _get_orderedbounds(self, oid_field):
+        """ Returns the (lowest, highest) ObjectID using ORDER BY queries or ``None`` if this failed. """
+        try:
+            bounds = []
+            for order in ('ASC', 'DESC'):
+                sql_clause = (None, 'ORDER BY {} {}'.format(oid_field, order))
+                with _cursors.SearchCursor(self.catalogPath, _const.FIELD_OID, sql_clause=sql_clause) as rows:
+                    for row in rows:
+                        bounds.append(row[0])
+                        break
+                del rows
+            if len(bounds) == 2:
+                return min(bounds), max(bounds)
+        except Exception as e:
+            _warn(str(e), DescribeWarning)
+        return None
+
+    def get_partitions(self, num_parts, where_clause=None):
+        """
+        Returns a list of where clauses (``unicode``) that split the table or feature class into (at most)
+        *num_parts* disjoint ObjectID ranges (see :func:`gpf.tools.queries.partition`), in ObjectID order.
+        If a *where_clause* is specified, it is combined (AND) with each ObjectID range.
+
+        If the current ``Describe`` object does not have an ObjectID field or does not have any rows,
+        an empty list will be returned.
+
+        :param num_parts:       The (maximum) number of ObjectID ranges.
+        :param where_clause:    An optional where clause to filter the rows.
+        :type num_parts:        int
+        :type where_clause:     str, unicode, gpf.tools.queries.Where
+        :rtype:                 list
+        """
+        lower, upper = self.get_oid_range()
+        if lower is None:
+            return []
+
+        table_path = self.catalogPath
+        user_kwargs = {}
+        _q.add_where(user_kwargs, where_clause, table_path)
+        user_clause = user_kwargs.get(_q.WHERE_KWARG)
+
+        parts = []
+        for part in _q.partition(self.OIDFieldName, lower, upper, num_parts):
+            part.delimit_fields(table_path)
+            parts.append(u'({}) {} {}'.format(user_clause, _const.TEXT_AND.upper(), part) if user_clause
+                         else unicode(part))
+        return parts
+
     @property
     def dataType(self):
         """
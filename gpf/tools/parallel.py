@@ -0,0 +1,178 @@
+# coding: utf-8
+#
+# Copyright 2019 Geocom Informatik AG / VertiGIS
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module that spreads CPU-bound row updates over multiple processes.
+
+Example:
+
+    >>> def calc_status(values):
+    >>>     length, status = values
+    >>>     return length, 'short' if length < 10 else 'long'
+    >>>
+    >>> update_parallel('C:/Temp/test.gdb/pipes', ['LENGTH', 'STATUS'], calc_status, processes=8)
+    5234233
+"""
+
+import multiprocessing as _mp
+from itertools import izip as _izip
+
+import gpf.common.const as _const
+import gpf.common.textutils as _tu
+import gpf.common.validate as _vld
+import gpf.cursors as _cursors
+import gpf.tools.metadata as _meta
+
+#: The number of ObjectID ranges (partitions) per process.
+#: This is also used for the parallel population of a lookup (see :mod:`gpf.lookups`).
+PARTS_PER_PROCESS = 4
+
+
+def _compute_part(args):
+    """
+    Reads all rows for a single where clause and calls the row function on the values of each row.
+    Returns a list of (ObjectID, values) tuples for the rows of which the values have changed.
+    """
+    table_path, field_names, where_clause, row_func = args
+    updates = []
+    with _cursors.SearchCursor(table_path, [_const.FIELD_OID] + field_names, where_clause) as rows:
+        for batch in rows.fetch_batches():
+            for row in batch:
+                values = tuple(row[1:])
+                result = row_func(values)
+                if result is None:
+                    continue
+                result = tuple(result)
+                if result != values:
+                    updates.append((row[0], result))
+    del rows
+    return updates
+
+
+def _write_part(table_path, field_names, where_clause, updates, editor):
+    """
+    Writes the updated values for a single where clause (ObjectID range) back to the table.
+    Returns the number of updated rows.
+    """
+    if not updates:
+        return 0
+    num_updated = 0
+    updates = dict(updates)
+    with _cursors.UpdateCursor(table_path, [_const.FIELD_OID] + field_names, where_clause, editor=editor) as rows:
+        for row in rows:
+            values = updates.get(row[0])
+            if values is not None:
+                rows.updateRow((row[0], ) + values)
+                num_updated += 1
+    del rows
+    return num_updated
+
+
+def _update_serial(table_path, field_names, row_func, where_clause, chunk_size):
+    """ Updates all rows in the current process, using a single UpdateCursor. Returns the number of updated rows. """
+    num_updated = 0
+    with _cursors.Editor(table_path, chunk_size=chunk_size) as editor:
+        with _cursors.UpdateCursor(table_path, field_names, where_clause, editor=editor) as rows:
+            for row in rows:
+                values = tuple(row)
+                result = row_func(values)
+                if result is None:
+                    continue
+                result = tuple(result)
+                if result != values:
+                    rows.updateRow(result)
+                    num_updated += 1
+        del rows
+    return num_updated
+
+
+def update_parallel(table_path, field_names, row_func, where_clause=None, processes=None,
+                    chunk_size=_cursors.BATCH_SIZE):
+    """
+    Updates the *field_names* of all rows in a table or feature class using *row_func*, which is called in
+    multiple worker processes. This is useful for CPU-bound calculations on large tables, where a single
+    :class:`gpf.cursors.UpdateCursor` would only use a single CPU core.
+
+    The table is split into disjoint ObjectID ranges (see :func:`gpf.tools.queries.partition`), which are read
+    and processed by the worker processes. The main process writes the changed values back to the table,
+    one ObjectID range at a time (in ObjectID order), while the workers process the next ranges.
+    The edits are made in a single edit session, in edit operations of (at most) *chunk_size* edits each
+    (see :class:`gpf.cursors.Editor`). If anything fails, the edit session is stopped without saving.
+
+    The *row_func* receives a ``tuple`` with the current values of *field_names* for a single row and should
+    return a ``tuple`` or ``list`` with the new values (in the same order), or ``None`` if the row should not change.
+    Rows for which the returned values equal the current values are not updated.
+
+    :param table_path:      The full path to the table or feature class (e.g. in a File Geodatabase).
+    :param field_names:     The field names that are passed to *row_func* and updated.
+    :param row_func:        The function that calculates the new values for a row.
+    :param where_clause:    An optional where clause to filter the rows that should be updated.
+    :param processes:       The number of worker processes. Defaults to the number of CPU cores.
+                            If this is 1 (or if the table has no ObjectID field), all rows are updated serially,
+                            using a single UpdateCursor.
+    :param chunk_size:      The maximum number of edits in a single edit operation.
+                            Defaults to :data:`gpf.cursors.BATCH_SIZE`.
+    :type table_path:       str, unicode
+    :type field_names:      str, unicode, list, tuple
+    :type row_func:         function
+    :type where_clause:     str, unicode, gpf.tools.queries.Where
+    :type processes:        int
+    :type chunk_size:       int
+    :return:                The number of updated rows.
+    :rtype:                 int
+    :raises ValueError:     If *row_func* is not callable or if *processes* or *chunk_size* is not a positive integer.
+    :raises RuntimeError:   When the table could not be updated.
+
+    .. note::   The *row_func* (and its return values) must be picklable. This means that it must be
+                defined at module level (e.g. not a lambda function).
+                For remote (SDE) workspaces, the changed values are written back in the same way: a staging table
+                and a single SQL join-back are not used, because they would bypass versioning and editor tracking.
+    """
+    _vld.pass_if(callable(row_func), ValueError, 'row_func should be callable')
+    processes = processes or _mp.cpu_count()
+    _vld.pass_if(processes > 0 and chunk_size > 0, ValueError, 'processes and chunk_size should be positive integers')
+    if isinstance(field_names, basestring):
+        field_names = [field_names]
+    field_names = list(field_names)
+
+    try:
+        parts = []
+        if processes > 1:
+            parts = _meta.Describe(table_path).get_partitions(processes * PARTS_PER_PROCESS, where_clause)
+        if len(parts) < 2:
+            # Process all rows serially (no partitions or a single partition)
+            return _update_serial(table_path, field_names, row_func, where_clause, chunk_size)
+
+        jobs = [(table_path, field_names, part, row_func) for part in parts]
+
+        # Start the worker processes before the edit session is started
+        num_updated = 0
+        pool = _mp.Pool(min(processes, len(jobs)))
+        try:
+            with _cursors.Editor(table_path, chunk_size=chunk_size) as editor:
+                # Results are returned in ObjectID order, so that the ranges are written back in order
+                for part, updates in _izip(parts, pool.imap(_compute_part, jobs)):
+                    num_updated += _write_part(table_path, field_names, part, updates, editor)
+            pool.close()
+        except Exception:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+        return num_updated
+
+    except Exception as e:
+        raise RuntimeError('Failed to update {}: {}'.format(_tu.to_repr(table_path), e))
@@ -18,6 +18,9 @@
 Module that facilitates working with basic SQL expressions and where clauses in ArcGIS.
 """
 
+import operator as _op
+import re as _re
+from decimal import Decimal as _Decimal
 from functools import wraps as _wraps
 
 import gpf.common.guids as _guids
@@ -30,6 +33,12 @@ from gpf import arcpy as _arcpy
 
 WHERE_KWARG = 'where_clause'
 
+#: The maximum number of values in a single IN list (e.g. Oracle does not allow more than 1000 values).
+MAX_IN_SIZE = 1000
+
+# Cache of delimited field names per data source: {datasource: {field: delimited_field}}
+_delimiters = {}
+
 
 def _return_new(func):
     """ Decorator function to execute instance method *func* on a new copy of the original instance. """
@@ -42,6 +51,50 @@ def _return_new(func):
     return wrapped
 
 
+def _get_delimited(datasource, field):
+    """
+    Returns the delimited *field* name for the given *datasource* (path string).
+    Because the delimiters only depend on the data source, the result is cached,
+    so that :func:`arcpy.AddFieldDelimiters` is called only once for each data source and field.
+    """
+    cache = _delimiters.get(datasource)
+    if cache is None:
+        cache = _delimiters.setdefault(datasource, {})
+    delimited = cache.get(field)
+    if delimited is None:
+        delimited = cache[field] = _arcpy.AddFieldDelimiters(datasource, field)
+    return delimited
+
+
+class _Node(object):
+    """
+    Immutable query node that holds a tuple of query parts and a reference to the preceding node.
+    Since nodes are never modified, multiple ``Where`` instances can safely share the same preceding nodes.
+    The flattened parts are cached on a node as soon as they have been requested.
+    """
+
+    __slots__ = ('prev', 'parts', '_flat')
+
+    def __init__(self, prev, parts):
+        self.prev = prev
+        self.parts = tuple(parts)
+        self._flat = None
+
+    def flatten(self):
+        """ Returns a tuple of all query parts up to (and including) this node. """
+        if self._flat is None:
+            chunks = []
+            node = self
+            while node is not None and node._flat is None:
+                chunks.append(node.parts)
+                node = node.prev
+            flat = list(node._flat) if node else []
+            for chunk in reversed(chunks):
+                flat.extend(chunk)
+            self._flat = tuple(flat)
+        return self._flat
+
+
 # noinspection PyPep8Naming
 class Where(object):
     """
@@ -49,6 +102,7 @@ class Where(object):
 
     Basic query helper class to build basic SQL expressions for ArcPy tools where clauses.
     Because all methods return a new instance, the user can "daisy chain" multiple statements.
+    The new instances share the (immutable) parts of the original query, so chaining does not copy the whole query.
 
     When used in combination with the :py:mod:`gpf.cursors` module, the Where clause can be passed-in directly.
     In other cases (e.g. *arcpy* tools), the resulting SQL expression is obtained using :func:`str`, :func:`unicode`
@@ -108,7 +162,7 @@ class Where(object):
 
     def __init__(self, field_or_clause, encoding=_const.ENC_UTF8):
         self._enc = encoding
-        self._parts = []
+        self._head = None
         self._isdirty = False
         self._add_new(field_or_clause)
 
@@ -151,16 +205,26 @@ class Where(object):
             return repr(self) == repr(other)
         return False
 
+    @property
+    def _parts(self):
+        """ Returns a tuple of all (part, is_field) tuples in the current query. """
+        return self._head.flatten() if self._head else ()
+
+    def _append(self, *parts):
+        """ Appends one or more (part, is_field) tuples to the current query, without modifying any shared nodes. """
+        self._head = _Node(self._head, parts)
+
     def _add_any(self, value, is_field=False, is_conjunction=False):
         """ Generic method to add a new part (field name, operator, or value) to the current query. """
         if (is_field or is_conjunction) == self._isdirty:
             raise SyntaxError('Adding {} would create an invalid query'.format(_tu.to_repr(value, self._enc)))
-        self._parts.append((value, is_field))
+        self._append((value, is_field))
 
     def _add_expression(self, *values):
         """ Adds an expression (consisting of multiple parts) to the current query. """
-        for v in values:
-            self._add_any(v)
+        if not self._isdirty:
+            raise SyntaxError('Adding {} would create an invalid query'.format(_tu.to_repr(values[0], self._enc)))
+        self._append(*((v, False) for v in values))
         self._isdirty = False
 
     def _add_field(self, field):
@@ -174,8 +238,11 @@ class Where(object):
 
         :type clause:   Where
         """
-        # Copy all parts
-        self._parts.extend(clause._parts)
+        if self._head is None:
+            # Share the nodes of the input query (these are never modified)
+            self._head = clause._head
+        elif clause._head is not None:
+            self._append(*clause._parts)
 
         # Copy the encoding
         self._enc = clause._enc
@@ -463,19 +530,20 @@ class Where(object):
     def delimit_fields(self, datasource):
         """
         Updates the fields in the query by wrapping them in the appropriate delimiters for the current data source.
+        The delimited field names are cached for each data source. Other ``Where`` instances that share
+        (parts of) this query are not affected.
 
         :param datasource:  The path to the data source (e.g. SDE connection, feature class, etc.)
                             or a :class:`gpf.paths.Workspace` instance.
 
         .. seealso::        https://desktop.arcgis.com/en/arcmap/latest/analyze/arcpy-functions/addfielddelimiters.htm
         """
-        for i, (part, is_field) in enumerate(self._parts):
-            if not is_field:
-                continue
-            # Call arcpy function on "clean" version of the field name (to prevent adding duplicate delimiters)
-            part = _arcpy.AddFieldDelimiters(
-                    _tu.to_str(datasource) if isinstance(datasource, _Ws) else datasource, part.strip('[]"'))
-            self._parts[i] = (part, is_field)
+        if isinstance(datasource, _Ws):
+            datasource = _tu.to_str(datasource)
+        # Delimit the "clean" version of the field name (to prevent adding duplicate delimiters)
+        parts = [(_get_delimited(datasource, part.strip('[]"')), True) if is_field else (part, False)
+                 for part, is_field in self._parts]
+        self._head = _Node(None, parts)
 
     @property
     def fields(self):
@@ -518,8 +586,7 @@ def combine(where_clause):
     _vld.pass_if(where_clause.is_ready, ValueError, 'Cannot wrap incomplete query in parenthesis')
 
     wrapper = Where(where_clause)
-    wrapper._parts.insert(0, (u'(', False))
-    wrapper._parts.append((u')', False))
+    wrapper._head = _Node(None, ((u'(', False), ) + where_clause._parts + ((u')', False), ))
     return wrapper
 
 
@@ -547,3 +614,351 @@ def add_where(keyword_args, where_clause, datasource=None):
         keyword_args[WHERE_KWARG] = where_clause
     else:
         raise ValueError('{!r} must be a string or {} instance'.format(WHERE_KWARG, Where.__name__))
+
+
+def partition(field, lower, upper, num_parts):
+    """
+    Splits the integer range [*lower*, *upper*] of *field* into (at most) *num_parts* contiguous, non-overlapping
+    parts of (nearly) equal size and returns a list of :class:`Where` BETWEEN clauses for each part.
+    This is typically used to split a table into ObjectID ranges that can be processed separately (e.g. in parallel).
+
+    Example:
+
+        >>> partition('OBJECTID', 1, 10, 3)
+        [OBJECTID BETWEEN 1 AND 4, OBJECTID BETWEEN 5 AND 7, OBJECTID BETWEEN 8 AND 10]
+
+    :param field:       The name of the (integer) field to partition, e.g. the ObjectID field.
+    :param lower:       The lowest value (inclusive) of the range.
+    :param upper:       The highest value (inclusive) of the range.
+    :param num_parts:   The number of parts to generate. If the range is smaller than *num_parts*,
+                        less parts will be returned.
+    :type field:        str, unicode
+    :type lower:        int
+    :type upper:        int
+    :type num_parts:    int
+    :rtype:             list
+    :raises ValueError: If *num_parts* is smaller than 1 or if *upper* is smaller than *lower*.
+    """
+    _vld.pass_if(num_parts >= 1, ValueError, 'partition() requires at least 1 part')
+    _vld.pass_if(upper >= lower, ValueError, 'partition() upper value must be greater than or equal to lower value')
+
+    size = upper - lower + 1
+    num_parts = min(num_parts, size)
+    step, rest = divmod(size, num_parts)
+    parts = []
+    start = lower
+    for i in xrange(num_parts):
+        stop = start + step + (1 if i < rest else 0) - 1
+        parts.append(Where(field).Between(start, stop))
+        start = stop + 1
+    return parts
+
+
+def split_in(field, values, chunk_size=MAX_IN_SIZE):
+    """
+    Splits a (large) list of *values* for an IN query on *field* into multiple :class:`Where` IN clauses,
+    that each contain (at most) *chunk_size* values. The values are sorted and duplicates are removed first,
+    so that each value occurs in only one clause.
+    This is typically used when the number of values exceeds the maximum that the database supports in an IN list
+    (see :data:`MAX_IN_SIZE`). The rows that match any of the values can then be read clause by clause,
+    e.g. using :func:`gpf.cursors.search_in`.
+
+    Example:
+
+        >>> split_in('A', [5, 1, 3, 2, 1, 4], 2)
+        [A IN (1, 2), A IN (3, 4), A IN (5)]
+
+    :param field:       The name of the field to query.
+    :param values:      An iterable of values (with similar data types) to query.
+    :param chunk_size:  The maximum number of values in each IN clause. Defaults to :data:`MAX_IN_SIZE`.
+    :type field:        str, unicode
+    :type values:       list, tuple, set, generator
+    :type chunk_size:   int
+    :rtype:             list
+    :raises ValueError: If *chunk_size* is smaller than 1.
+    """
+    _vld.pass_if(chunk_size >= 1, ValueError, 'split_in() chunk_size must be a positive integer')
+    values = sorted(frozenset(values))
+    return [Where(field).In(values[i:i + chunk_size]) for i in xrange(0, len(values), chunk_size)]
+
+
+# Tokens of a (simple) SQL where clause: string literal, number, delimited field, operator, punctuation or word
+_SQL_TOKENS = _re.compile(r"""\s*(?:('(?:[^']|'')*')|(\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)|("[^"]+"|\[[^\]]+\])|"""
+                          r"""(<>|!=|<=|>=|=|<|>)|([(),-])|([A-Za-z_][\w.]*))""")
+_SQL_KEYWORDS = frozenset(('AND', 'OR', 'NOT', 'IN', 'BETWEEN', 'LIKE', 'ESCAPE', 'IS', 'NULL'))
+_SQL_OPERATORS = {
+    '=': _op.eq, '<>': _op.ne, '!=': _op.ne, '<': _op.lt, '<=': _op.le, '>': _op.gt, '>=': _op.ge
+}
+_NUMBER_TYPES = (int, long, float, _Decimal)
+
+
+def _tokenize(where_clause):
+    """ Returns a list of (kind, value) tuples for the given where clause text. """
+    tokens = []
+    pos = 0
+    text = where_clause.rstrip()
+    while pos < len(text):
+        match = _SQL_TOKENS.match(text, pos)
+        _vld.pass_if(match, ValueError, 'Unsupported SQL syntax at position {}: {!r}'.format(pos, text[pos:]))
+        string, number, field, operator, punct, word = match.groups()
+        if string:
+            tokens.append(('literal', string[1:-1].replace("''", "'")))
+        elif number:
+            tokens.append(('literal', float(number) if any(c in number for c in '.eE') else int(number)))
+        elif field:
+            tokens.append(('field', field[1:-1]))
+        elif operator:
+            tokens.append(('op', operator))
+        elif punct:
+            tokens.append((punct, punct))
+        elif word.upper() in _SQL_KEYWORDS:
+            tokens.append((word.upper(), word))
+        else:
+            tokens.append(('field', word))
+        pos = match.end()
+    return tokens
+
+
+def _check_types(a, b):
+    """ Raises a ValueError if values *a* and *b* (not ``None``) cannot be compared like the database would. """
+    if isinstance(a, _NUMBER_TYPES) and isinstance(b, _NUMBER_TYPES):
+        return
+    _vld.pass_if(isinstance(a, basestring) and isinstance(b, basestring) or type(a) is type(b),
+                 ValueError, 'Cannot compare {} with {}'.format(type(a).__name__, type(b).__name__))
+
+
+def _and(left, right):
+    """ Returns the (3-valued) SQL AND of 2 predicates. """
+    def evaluate(row):
+        a = left(row)
+        if a is False:
+            return False
+        b = right(row)
+        if b is False:
+            return False
+        return None if a is None or b is None else True
+    return evaluate
+
+
+def _or(left, right):
+    """ Returns the (3-valued) SQL OR of 2 predicates. """
+    def evaluate(row):
+        a = left(row)
+        if a is True:
+            return True
+        b = right(row)
+        if b is True:
+            return True
+        return None if a is None or b is None else False
+    return evaluate
+
+
+def _not(predicate):
+    """ Returns the (3-valued) SQL NOT of a predicate. """
+    def evaluate(row):
+        value = predicate(row)
+        return value if value is None else not value
+    return evaluate
+
+
+class _ClauseParser(object):
+    """ Recursive descent parser that turns a simple SQL where clause into a Python predicate. """
+
+    def __init__(self, where_clause, fields):
+        self._tokens = _tokenize(where_clause)
+        self._pos = 0
+        self._fields = fields
+
+    def _peek(self):
+        return self._tokens[self._pos][0] if self._pos < len(self._tokens) else None
+
+    def _next(self, *kinds):
+        kind = self._peek()
+        _vld.pass_if(kind and (not kinds or kind in kinds), ValueError,
+                     'Unsupported SQL syntax: expected {} but found {}'.format(' or '.join(kinds) or 'a token', kind))
+        self._pos += 1
+        return self._tokens[self._pos - 1][1]
+
+    def _accept(self, kind):
+        if self._peek() == kind:
+            self._pos += 1
+            return True
+        return False
+
+    def parse(self):
+        predicate = self._or()
+        _vld.pass_if(self._peek() is None, ValueError, 'Unsupported SQL syntax: unexpected {}'.format(self._peek()))
+        return predicate
+
+    def _or(self):
+        predicate = self._and()
+        while self._accept('OR'):
+            predicate = _or(predicate, self._and())
+        return predicate
+
+    def _and(self):
+        predicate = self._not()
+        while self._accept('AND'):
+            predicate = _and(predicate, self._not())
+        return predicate
+
+    def _not(self):
+        if self._accept('NOT'):
+            return _not(self._not())
+        if self._accept('('):
+            predicate = self._or()
+            self._next(')')
+            return predicate
+        return self._condition()
+
+    def _literal(self):
+        """ Returns a literal value (or NULL). """
+        if self._accept('NULL'):
+            return None
+        if self._accept('-'):
+            value = self._next('literal')
+            _vld.pass_if(isinstance(value, _NUMBER_TYPES), ValueError, 'Unsupported SQL syntax: -{!r}'.format(value))
+            return -value
+        return self._next('literal')
+
+    def _operand(self):
+        """ Returns a function that gets the value of a field or literal for a row. """
+        if self._peek() != 'field':
+            value = self._literal()
+            return lambda row: value
+        name = self._next('field')
+        upper_names = [f.upper() for f in self._fields]
+        if name.upper() in upper_names:
+            index = upper_names.index(name.upper())
+        else:
+            index = len(self._fields)
+            self._fields.append(name)
+        return lambda row: row[index]
+
+    def _condition(self):
+        """ Parses a comparison, [NOT] IN, [NOT] BETWEEN, [NOT] LIKE or IS [NOT] NULL condition. """
+        operand = self._operand()
+
+        if self._accept('IS'):
+            negate = self._accept('NOT')
+            self._next('NULL')
+            return lambda row: (operand(row) is None) is not negate
+
+        if self._peek() == 'op':
+            compare = _SQL_OPERATORS[self._next('op')]
+            other = self._operand()
+
+            def evaluate(row):
+                a, b = operand(row), other(row)
+                if a is None or b is None:
+                    return None
+                _check_types(a, b)
+                return compare(a, b)
+            return evaluate
+
+        negate = self._accept('NOT')
+        if self._accept('IN'):
+            self._next('(')
+            values = [self._literal()]
+            while self._accept(','):
+                values.append(self._literal())
+            self._next(')')
+            has_null = None in values
+            values = [v for v in values if v is not None]
+
+            def evaluate(row):
+                a = operand(row)
+                if a is None:
+                    return None
+                for v in values:
+                    _check_types(a, v)
+                    if a == v:
+                        return True
+                return None if has_null else False
+        elif self._accept('BETWEEN'):
+            lower = self._operand()
+            self._next('AND')
+            upper = self._operand()
+            evaluate = _and(self._comparison(_op.ge, operand, lower), self._comparison(_op.le, operand, upper))
+        else:
+            self._next('LIKE')
+            pattern = self._next('literal')
+            escape = self._next('literal') if self._accept('ESCAPE') else None
+            regex = _like_regex(pattern, escape)
+
+            def evaluate(row):
+                a = operand(row)
+                if a is None:
+                    return None
+                _check_types(a, pattern)
+                return regex.match(a) is not None
+        return _not(evaluate) if negate else evaluate
+
+    @staticmethod
+    def _comparison(compare, left, right):
+        def evaluate(row):
+            a, b = left(row), right(row)
+            if a is None or b is None:
+                return None
+            _check_types(a, b)
+            return compare(a, b)
+        return evaluate
+
+
+def _like_regex(pattern, escape=None):
+    """ Returns a compiled regular expression for a SQL LIKE *pattern* with an optional *escape* character. """
+    _vld.pass_if(isinstance(pattern, basestring) and (escape is None or len(escape) == 1),
+                 ValueError, 'Unsupported LIKE pattern or escape character')
+    parts = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            parts.append(_re.escape(char))
+            escaped = False
+        elif char == escape:
+            escaped = True
+        elif char == '%':
+            parts.append('.*')
+        elif char == '_':
+            parts.append('.')
+        else:
+            parts.append(_re.escape(char))
+    return _re.compile(''.join(parts) + r'\Z', _re.DOTALL | _re.UNICODE)
+
+
+def compile_clause(where_clause, fields=None):
+    """
+    Compiles a simple SQL *where_clause* into a Python predicate, so that it can be evaluated for rows
+    that were read by a cursor. This makes it possible to test multiple where clauses on a single pass over a table.
+
+    The following SQL is supported: comparisons (``=``, ``<>``, ``!=``, ``<``, ``<=``, ``>``, ``>=``),
+    ``[NOT] IN``, ``[NOT] BETWEEN``, ``[NOT] LIKE`` (with an optional ``ESCAPE``), ``IS [NOT] NULL``,
+    ``AND``, ``OR``, ``NOT`` and parentheses. Operands can be (delimited) field names, numbers, strings or ``NULL``.
+    Like in SQL, a comparison with a NULL value is unknown (``None``). String comparisons are case-sensitive.
+
+    Example:
+
+        >>> fields, predicate = compile_clause("A > 1 AND B LIKE 'x%'")
+        >>> fields
+        ['A', 'B']
+        >>> predicate((2, 'xyz')), predicate((0, 'xyz')), predicate((None, 'xyz'))
+        (True, False, None)
+
+    :param where_clause:    The where clause text (an empty clause matches all rows).
+    :param fields:          An optional list of field names that the predicate should read its values from.
+                            Fields of the where clause that are not in this list yet are appended to it (in place),
+                            so that multiple clauses can share the same rows.
+    :type where_clause:     str, unicode, Where
+    :type fields:           list
+    :returns:               A tuple of (field names, predicate), where the predicate returns ``True``, ``False``
+                            or ``None`` (unknown) for a row tuple with the values of these fields.
+    :rtype:                 tuple
+    :raises ValueError:     If the where clause contains unsupported SQL syntax.
+                            When the predicate is called, a ValueError is raised if values of different
+                            data types are compared (e.g. a date field with a string).
+    """
+    fields = [] if fields is None else fields
+    text = str(where_clause) if isinstance(where_clause, Where) else where_clause
+    if not text.strip():
+        return fields, lambda row: True
+    return fields, _ClauseParser(text, fields).parse()
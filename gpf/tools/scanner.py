@@ -0,0 +1,202 @@
+# coding: utf-8
+#
+# Copyright 2019 Geocom Informatik AG / VertiGIS
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module that reads multiple tables or feature classes in a workspace concurrently.
+
+Example:
+
+    >>> def count_nulls(table_path, rows):
+    >>>     return sum(1 for row in rows if row[1] is None)
+    >>>
+    >>> scanner = WorkspaceScanner('C:/Temp/test.gdb')
+    >>> for result in scanner.scan(count_nulls, ['OID@', 'STATUS']):
+    >>>     print(result)
+    ScanResult(table='C:\\Temp\\test.gdb\\pipes', seconds=1.234, result=5)
+    ScanResult(table='C:\\Temp\\test.gdb\\valves', seconds=0.321, result=0)
+"""
+
+import multiprocessing as _mp
+import os as _os
+from multiprocessing.pool import ThreadPool as _ThreadPool
+from timeit import default_timer as _timer
+
+import gpf.common.const as _const
+import gpf.common.textutils as _tu
+import gpf.common.validate as _vld
+import gpf.cursors as _cursors
+import gpf.paths as _paths
+import gpf.tools.queries as _q
+from gpf import arcpy as _arcpy
+
+#: The data types of the tables that are scanned if no tables were specified.
+SCAN_DATATYPES = ('FeatureClass', 'Table')
+
+
+class ScanResult(object):
+    """
+    The result of a scan on a single table, as returned by :func:`WorkspaceScanner.scan`.
+
+    :ivar table:    The full path to the scanned table.
+    :ivar result:   The value returned by the scan function (``None`` if the scan failed).
+    :ivar error:    The error message if the scan failed (``None`` otherwise).
+    :ivar seconds:  The number of seconds that the scan took (including opening the cursor).
+    """
+
+    def __init__(self, table, result=None, error=None, seconds=0.0):
+        self.table = table
+        self.result = result
+        self.error = error
+        self.seconds = seconds
+
+    def __nonzero__(self):
+        return self.error is None
+
+    def __repr__(self):
+        value = 'error={}'.format(_tu.to_repr(self.error)) if self.error else 'result={!r}'.format(self.result)
+        return '{}(table={}, seconds={:.3f}, {})'.format(self.__class__.__name__, _tu.to_repr(self.table),
+                                                         self.seconds, value)
+
+
+def _scan_table(args):
+    """ Reads a single table using the scan function and returns a :class:`ScanResult`. """
+    table_path, func, field_names, where_clause = args
+    start = _timer()
+    try:
+        with _cursors.SearchCursor(table_path, field_names, where_clause=where_clause) as rows:
+            result = func(table_path, rows)
+        del rows
+    except Exception as e:
+        return ScanResult(table_path, error=_tu.to_unicode(e), seconds=_timer() - start)
+    return ScanResult(table_path, result, seconds=_timer() - start)
+
+
+class WorkspaceScanner(object):
+    """
+    WorkspaceScanner(workspace, {max_workers}, {use_processes})
+
+    Scans (reads) multiple tables or feature classes in a workspace concurrently.
+    For remote (SDE) workspaces, the tables are read in a thread pool, because most of the time is spent waiting for
+    the database. For local workspaces (e.g. File Geodatabases), the tables are read in a process pool, so that the
+    work is spread over multiple CPU cores.
+
+    **Params:**
+
+    -   **workspace** (str, unicode, :class:`gpf.paths.Workspace`):
+
+        The workspace (or a path within the workspace) to scan.
+
+    -   **max_workers** (int):
+
+        The maximum number of tables that are read at the same time. Defaults to the number of CPU cores.
+
+    -   **use_processes** (bool):
+
+        If ``True``, a process pool is used and if ``False``, a thread pool is used.
+        By default (``None``), this depends on the workspace type (see above).
+    """
+
+    def __init__(self, workspace, max_workers=None, use_processes=None):
+        if not isinstance(workspace, _paths.Workspace):
+            workspace = _paths.get_workspace(workspace, True)
+        self._ws = workspace
+        self._workers = max_workers or _mp.cpu_count()
+        _vld.pass_if(self._workers > 0, ValueError, 'max_workers should be a positive integer')
+        self._processes = (not workspace.is_remote) if use_processes is None else use_processes
+
+    @property
+    def workspace(self):
+        """
+        Returns the workspace that is scanned.
+
+        :rtype: gpf.paths.Workspace
+        """
+        return self._ws
+
+    def list_tables(self, datatypes=SCAN_DATATYPES):
+        """
+        Returns a list of full paths to all tables in the workspace (including the ones in feature datasets).
+
+        :param datatypes:   The data types to list (defaults to feature classes and tables).
+        :type datatypes:    tuple, list
+        :rtype:             list
+        """
+        tables = []
+        for root, _, names in _arcpy.da.Walk(str(self._ws), datatype=list(datatypes)):
+            tables.extend(_paths.concat(root, name) for name in names)
+        return tables
+
+    def iscan(self, func, field_names=_const.CHAR_ASTERISK, tables=None, where_clause=None):
+        """
+        Scans the tables concurrently and returns a generator of :class:`ScanResult` objects, in order of completion.
+
+        For each table, a :class:`gpf.cursors.SearchCursor` is opened and passed to *func*, together with
+        the full table path (i.e. ``func(table_path, cursor)``). The value returned by *func* is stored in
+        :attr:`ScanResult.result`. If the scan of a table fails, the error is stored in :attr:`ScanResult.error`
+        and the other tables are still scanned.
+
+        :param func:            The function that reads the cursor rows and returns a result.
+        :param field_names:     The field names to read (by default all fields). These should exist in all tables.
+        :param tables:          A list of table names or paths to scan. If omitted, all tables are scanned.
+                                Table names that are not a full path are assumed to be in the workspace.
+        :param where_clause:    An optional where clause that is used for all tables.
+        :type func:             function
+        :type field_names:      str, unicode, list, tuple
+        :type tables:           list, tuple
+        :type where_clause:     str, unicode, gpf.tools.queries.Where
+        :rtype:                 generator
+
+        .. note::   When a process pool is used, *func* (and its return value) must be picklable.
+                    This means that it must be defined at module level (e.g. not a lambda function).
+        """
+        _vld.pass_if(callable(func), ValueError, 'scan function should be callable')
+        if tables is None:
+            tables = self.list_tables()
+        # Resolve the where clause (text) once for the whole workspace, instead of for each table separately
+        kwargs = {}
+        _q.add_where(kwargs, where_clause, str(self._ws))
+        where_clause = kwargs.get(_q.WHERE_KWARG)
+        jobs = [(t if _os.path.isabs(t) else self._ws.make_path(t), func, field_names, where_clause) for t in tables]
+        if not jobs:
+            return
+
+        num_workers = min(self._workers, len(jobs))
+        pool = (_mp.Pool if self._processes else _ThreadPool)(num_workers)
+        try:
+            for result in pool.imap_unordered(_scan_table, jobs):
+                yield result
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def scan(self, func, field_names=_const.CHAR_ASTERISK, tables=None, where_clause=None, callback=None):
+        """
+        Scans the tables concurrently and returns a list of :class:`ScanResult` objects, in order of completion.
+        See :func:`iscan` for a description of the other parameters.
+
+        :param callback:    An optional function that is called (in the main thread) with each :class:`ScanResult`
+                            as soon as the scan of a table has finished.
+        :type callback:     function
+        :rtype:             list
+        """
+        _vld.raise_if(callback and not callable(callback), ValueError, 'callback should be callable')
+        results = []
+        for result in self.iscan(func, field_names, tables, where_clause):
+            if callback:
+                callback(result)
+            results.append(result)
+        return results
@@ -0,0 +1,383 @@
+# coding: utf-8
+#
+# Copyright 2019 Geocom Informatik AG / VertiGIS
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module that calculates multiple statistics (aggregates) for multiple fields of a table in a single pass.
+
+Example:
+
+    >>> stats = calculate('C:/Temp/test.gdb/pipes', {'LENGTH': (MIN, MAX, MEAN), 'MATERIAL': (DISTINCT, HISTOGRAM)},
+    >>>                   group_by='STATUS')
+    >>> stats['active']['LENGTH'][MAX]
+    123.456
+    >>> stats['active']['MATERIAL'][HISTOGRAM]
+    {u'PE': 3525, u'PVC': 1532, None: 21}
+
+Note that the :data:`DISTINCT` and :data:`HISTOGRAM` aggregates store each distinct value (per group),
+so that they require memory in proportion to the number of distinct values. They should only be used for
+fields with a low cardinality (e.g. codes or categories), or for numeric fields in combination with *bins*:
+
+    >>> stats = calculate('C:/Temp/test.gdb/pipes', {'LENGTH': HISTOGRAM}, bins={'LENGTH': 10})
+    >>> stats['LENGTH'][HISTOGRAM]
+    {0.0: 1325, 10.0: 2741, 20.0: 988, 30.0: 24}
+"""
+
+from bisect import bisect_right as _bisect
+from collections import Counter as _Counter
+from collections import OrderedDict as _OrderedDict
+
+import gpf.common.textutils as _tu
+import gpf.common.validate as _vld
+import gpf.cursors as _cursors
+
+#: The number of non-NULL values (like SQL ``COUNT(field)``).
+COUNT = 'count'
+#: The lowest non-NULL value.
+MIN = 'min'
+#: The highest non-NULL value.
+MAX = 'max'
+#: The sum of all numeric values (``None`` if the field contains non-numeric values).
+SUM = 'sum'
+#: The average of all numeric values (``None`` if the field contains non-numeric values).
+MEAN = 'mean'
+#: The number of distinct non-NULL values (not constant-memory: only use it for low-cardinality fields).
+DISTINCT = 'distinct'
+#: A ``dict`` of all distinct values (including NULL) and their frequency (not constant-memory, unless binned).
+HISTOGRAM = 'histogram'
+
+#: All supported aggregates.
+AGGREGATES = (COUNT, MIN, MAX, SUM, MEAN, DISTINCT, HISTOGRAM)
+
+#: The aggregates that are calculated if none were specified for a field.
+DEFAULT_AGGREGATES = (COUNT, MIN, MAX, SUM, MEAN)
+
+_NUMERIC_TYPES = (int, long, float)
+
+
+class FieldStatistics(object):
+    """
+    FieldStatistics({distinct}, {histogram}, {bins})
+
+    Accumulates the statistics of a single field (in a single group), one value at a time.
+    The count, minimum, maximum and sum are always calculated and only require constant memory.
+    The distinct count and histogram are only calculated when requested, since they need to store each distinct value.
+    For numeric values, the histogram can count the values per bin instead, which limits the number of stored values.
+
+    **Params:**
+
+    -   **distinct** (bool):
+
+        If ``True`` (default = ``False``), the distinct values are collected.
+
+    -   **histogram** (bool):
+
+        If ``True`` (default = ``False``), the frequency of each distinct value is collected.
+
+    -   **bins** (int, float, list, tuple):
+
+        An optional bin width (positive number) or a list of (ascending) bin edges for the histogram.
+        If set, the histogram keys are the lower bounds of the bins instead of the values themselves.
+        For a bin width *w*, value *v* is counted in bin ``floor(v / w) * w``.
+        For bin edges, a value is counted in the bin of the highest edge that is less than or equal to the value
+        (or ``float('-inf')`` if the value is lower than the first edge).
+        Only numeric values can be binned.
+
+    :raises ValueError: If *bins* is not a positive number or a list of ascending numbers.
+    """
+
+    __slots__ = ('count', 'min', 'max', 'sum', '_values', '_frequencies', '_bins')
+
+    def __init__(self, distinct=False, histogram=False, bins=None):
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.sum = 0
+        self._bins = _get_bins(bins)
+        self._values = set() if distinct and not (histogram and self._bins is None) else None
+        self._frequencies = _Counter() if histogram else None
+
+    def add(self, value):
+        """
+        Adds a value to the statistics.
+
+        :param value:   The value to add. NULL values (``None``) are only taken into account for the histogram.
+        :raises ValueError: If the histogram is binned and *value* is not numeric.
+        """
+        if self._frequencies is not None:
+            self._frequencies[self._get_bin(value)] += 1
+        if value is None:
+            return
+        if self._values is not None:
+            self._values.add(value)
+        if self.count:
+            if value < self.min:
+                self.min = value
+            elif value > self.max:
+                self.max = value
+        else:
+            self.min = self.max = value
+        self.count += 1
+        if self.sum is not None:
+            if isinstance(value, _NUMERIC_TYPES) and not isinstance(value, bool):
+                self.sum += value
+            else:
+                self.sum = None
+
+    @property
+    def mean(self):
+        """
+        Returns the average of all values or ``None`` if there are no (numeric) values.
+
+        :rtype: float
+        """
+        if not self.count or self.sum is None:
+            return None
+        return float(self.sum) / self.count
+
+    def _get_bin(self, value):
+        """ Returns the histogram key for *value*: the value itself or the lower bound of its bin. """
+        if self._bins is None or value is None:
+            return value
+        _vld.pass_if(isinstance(value, _NUMERIC_TYPES) and not isinstance(value, bool), ValueError,
+                     'Only numeric values can be binned, got {!r}'.format(value))
+        if isinstance(self._bins, tuple):
+            i = _bisect(self._bins, value)
+            return self._bins[i - 1] if i else float('-inf')
+        return (value // self._bins) * self._bins
+
+    @property
+    def distinct(self):
+        """
+        Returns the number of distinct non-NULL values or ``None`` if distinct values were not collected.
+
+        :rtype: int
+        """
+        if self._values is not None:
+            return len(self._values)
+        if self._frequencies is not None:
+            return len(self._frequencies) - (1 if None in self._frequencies else 0)
+        return None
+
+    @property
+    def histogram(self):
+        """
+        Returns a ``dict`` of all values and their frequency or ``None`` if the frequencies were not collected.
+
+        :rtype: dict
+        """
+        if self._frequencies is None:
+            return None
+        return dict(self._frequencies)
+
+    def get(self, aggregate):
+        """
+        Returns the value for the given *aggregate* (e.g. :data:`COUNT`).
+
+        :param aggregate:   The name of the aggregate.
+        :type aggregate:    str
+        :raises ValueError: If *aggregate* is not supported.
+        """
+        _vld.pass_if(aggregate in AGGREGATES, ValueError, 'Unsupported aggregate {!r}'.format(aggregate))
+        if aggregate == SUM and not self.count:
+            return None
+        return getattr(self, aggregate)
+
+
+def _get_bins(bins):
+    """ Validates the *bins* for a histogram and returns a bin width, a tuple of bin edges or ``None``. """
+    if bins is None:
+        return None
+    if isinstance(bins, _NUMERIC_TYPES) and not isinstance(bins, bool):
+        _vld.pass_if(bins > 0, ValueError, 'The bin width must be a positive number')
+        return bins
+    _vld.pass_if(isinstance(bins, (list, tuple)) and bins, ValueError,
+                 'bins must be a bin width or a list of bin edges')
+    edges = tuple(bins)
+    _vld.pass_if(all(isinstance(e, _NUMERIC_TYPES) for e in edges) and
+                 all(a < b for a, b in zip(edges, edges[1:])), ValueError, 'The bin edges must be ascending numbers')
+    return edges
+
+
+class Statistics(object):
+    """
+    Statistics(fields, {group_by}, {bins})
+
+    Calculates multiple aggregates for multiple fields (optionally grouped by one or more fields) in a single pass
+    over the rows that are added to it.
+    The :func:`calculate` function uses this class to calculate statistics for a table or feature class,
+    but it can also be used directly to calculate statistics for rows from another source.
+
+    **Params:**
+
+    -   **fields** (list, tuple, dict):
+
+        A list of field names for which to calculate the :data:`DEFAULT_AGGREGATES`, or a ``dict`` with field names
+        as keys and a single aggregate name or a list of aggregate names (see :data:`AGGREGATES`) as values.
+        The fields of a ``dict`` are sorted by name (case-insensitive), unless it is an ``OrderedDict``.
+
+    -   **group_by** (str, unicode, list, tuple):
+
+        An optional field name or list of field names by which the statistics should be grouped.
+
+    -   **bins** (dict):
+
+        An optional ``dict`` with field names as keys and a bin width or a list of bin edges as values,
+        to calculate a binned :data:`HISTOGRAM` for these (numeric) fields. See :class:`FieldStatistics`.
+
+    :raises ValueError:     If *fields* is empty, if an unsupported aggregate was specified or if *bins* contains
+                            invalid bins or fields without statistics.
+    """
+
+    def __init__(self, fields, group_by=None, bins=None):
+        _vld.pass_if(fields, ValueError, 'At least 1 field is required to calculate statistics')
+        if isinstance(fields, _OrderedDict):
+            fields = fields.iteritems()
+        elif isinstance(fields, dict):
+            # Sort the field names, so that the order of the fields is always the same
+            fields = sorted(fields.iteritems(), key=lambda item: item[0].upper())
+        else:
+            fields = ((f, DEFAULT_AGGREGATES) for f in fields)
+
+        self._aggregates = []
+        for field, aggregates in fields:
+            if isinstance(aggregates, basestring):
+                aggregates = (aggregates, )
+            aggregates = tuple(aggregates or DEFAULT_AGGREGATES)
+            for a in aggregates:
+                _vld.pass_if(a in AGGREGATES, ValueError, 'Unsupported aggregate {!r} for field {!r}'.format(a, field))
+            self._aggregates.append((field, aggregates))
+
+        if isinstance(group_by, basestring):
+            self._groupfields = [group_by]
+        else:
+            self._groupfields = list(group_by or ())
+
+        # Build a list of unique (case-insensitive) field names for the cursor
+        self._fields = []
+        positions = {}
+        for field in self._groupfields + [f for f, _ in self._aggregates]:
+            if field.upper() not in positions:
+                positions[field.upper()] = len(self._fields)
+                self._fields.append(field)
+        self._groupindex = [positions[f.upper()] for f in self._groupfields]
+        self._valueindex = [positions[f.upper()] for f, _ in self._aggregates]
+
+        bins = dict((f.upper(), b) for f, b in (bins or {}).iteritems())
+        _vld.pass_if(frozenset(bins).issubset(f.upper() for f, _ in self._aggregates), ValueError,
+                     'bins can only be specified for fields with statistics')
+        self._options = [(DISTINCT in a, HISTOGRAM in a, _get_bins(bins.get(f.upper()))) for f, a in self._aggregates]
+        self._groups = {}
+
+    def __len__(self):
+        return len(self._groups)
+
+    @property
+    def fields(self):
+        """
+        Returns the list of (unique) field names for which the values should be passed to :func:`add` (in that order).
+
+        :rtype: list
+        """
+        return self._fields[:]
+
+    def _new_group(self):
+        """ Returns a new list of :class:`FieldStatistics` for a group. """
+        return [FieldStatistics(*options) for options in self._options]
+
+    def _get_groupkey(self, row):
+        """ Returns the group key for a row: ``None``, a single value or a tuple of values. """
+        if not self._groupindex:
+            return None
+        if len(self._groupindex) == 1:
+            return row[self._groupindex[0]]
+        return tuple(row[i] for i in self._groupindex)
+
+    def add(self, row):
+        """
+        Adds a single row to the statistics.
+
+        :param row: A tuple or list of values for the :attr:`fields` (in that order).
+        """
+        key = self._get_groupkey(row)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = self._new_group()
+        for stats, i in zip(group, self._valueindex):
+            stats.add(row[i])
+
+    def update(self, rows):
+        """
+        Adds all rows in an iterable to the statistics.
+
+        :param rows:    An iterable of tuples or lists of values for the :attr:`fields` (in that order).
+        """
+        for row in rows:
+            self.add(row)
+
+    def _get_result(self, group):
+        return {field: {a: stats.get(a) for a in aggregates}
+                for (field, aggregates), stats in zip(self._aggregates, group)}
+
+    def result(self):
+        """
+        Returns the calculated statistics.
+
+        If no *group_by* fields were specified, a ``dict`` is returned with the field names as keys and a
+        ``dict`` of aggregate names and values as values, e.g. ``{'LENGTH': {'min': 0.5, 'max': 12.3}}``.
+        If no rows were added, all aggregates are ``None`` (or 0 for the count).
+
+        If *group_by* fields were specified, a ``dict`` is returned with the group keys as keys and the
+        ``dict`` described above as values. If there is only 1 *group_by* field, the group key is the field value.
+        For multiple *group_by* fields, the group key is a ``tuple`` of field values.
+
+        :rtype: dict
+        """
+        if not self._groupindex:
+            return self._get_result(self._groups.get(None) or self._new_group())
+        return {key: self._get_result(group) for key, group in self._groups.iteritems()}
+
+
+def calculate(table_path, fields, group_by=None, where_clause=None, bins=None, **kwargs):
+    """
+    Calculates multiple aggregates for multiple fields of a table or feature class (optionally grouped by one
+    or more fields), reading the table only once. See :class:`Statistics` for more information about
+    the *fields*, *group_by* and *bins* parameters and the structure of the result.
+
+    :param table_path:      The full path to the table or feature class.
+    :param fields:          A list of field names or a ``dict`` of field names and aggregates.
+    :param group_by:        An optional field name or list of field names to group by.
+    :param where_clause:    An optional where clause to filter the table.
+    :param bins:            An optional ``dict`` of field names and histogram bins (a bin width or bin edges).
+    :keyword batch_size:    The number of rows that are read from the cursor at once
+                            (defaults to :data:`gpf.cursors.BATCH_SIZE`).
+    :type table_path:       str, unicode
+    :type fields:           list, tuple, dict
+    :type group_by:         str, unicode, list, tuple
+    :type where_clause:     str, unicode, gpf.tools.queries.Where
+    :type bins:             dict
+    :rtype:                 dict
+    :raises RuntimeError:   When the table could not be read.
+    """
+    stats = Statistics(fields, group_by, bins)
+    batch_size = kwargs.get('batch_size', _cursors.BATCH_SIZE)
+    try:
+        with _cursors.SearchCursor(table_path, stats.fields, where_clause=where_clause) as rows:
+            for batch in rows.fetch_batches(batch_size):
+                stats.update(batch)
+        del rows
+    except RuntimeError as e:
+        raise RuntimeError('Failed to calculate statistics for {}: {}'.format(_tu.to_repr(table_path), e))
+    return stats.result()
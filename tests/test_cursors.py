@@ -0,0 +1,462 @@
+# coding: utf-8
+#
+# Copyright 2019 Geocom Informatik AG / VertiGIS
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import imp
+import os
+
+import mock
+import pytest
+
+from gpf import cursors
+from gpf.paths import Workspace
+
+
+class FakeDAEditor(object):
+    """ Replacement for the arcpy.da.Editor, which records all method calls. """
+
+    def __init__(self, workspace):
+        self.calls = []
+        self.isEditing = False
+
+    def startEditing(self, with_undo=False, multiuser_mode=True):
+        self.isEditing = True
+        self.calls.append('startEditing')
+
+    def stopEditing(self, save_changes=True):
+        self.isEditing = False
+        self.calls.append('stopEditing')
+
+    def startOperation(self):
+        self.calls.append('startOperation')
+
+    def stopOperation(self):
+        self.calls.append('stopOperation')
+
+    def abortOperation(self):
+        self.calls.append('abortOperation')
+
+    def undoOperation(self):
+        self.calls.append('undoOperation')
+
+
+class FakeDAInsertCursor(object):
+    """ Replacement for the arcpy.da.InsertCursor, which records the inserted row objects. """
+
+    def __init__(self, datatable, field_names):
+        self._fields = list(field_names)
+        self.inserted = []
+
+    @property
+    def fields(self):
+        return self._fields
+
+    def insertRow(self, row):
+        self.inserted.append((row, tuple(row)))
+        return len(self.inserted)
+
+
+class FakeDASearchCursor(object):
+    """ Replacement for the arcpy.da.SearchCursor, which returns the rows of the ``rows`` class attribute. """
+
+    rows = []
+
+    def __init__(self, datatable, field_names, **kwargs):
+        self._fields = list(field_names)
+        self._rows = iter(self.rows)
+
+    @property
+    def fields(self):
+        return self._fields
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        return self._rows.next()
+
+    def reset(self):
+        self._rows = iter(self.rows)
+
+
+@pytest.fixture
+def da_cursors(monkeypatch):
+    """
+    Returns a copy of the :mod:`gpf.cursors` module, of which the cursors and the Editor extend the fake ArcPy
+    classes above (instead of the mocked ArcPy classes).
+    """
+    monkeypatch.setattr(cursors._arcpy.da, 'Editor', FakeDAEditor)
+    monkeypatch.setattr(cursors._arcpy.da, 'InsertCursor', FakeDAInsertCursor)
+    monkeypatch.setattr(cursors._arcpy.da, 'SearchCursor', type('FakeDASearchCursor', (FakeDASearchCursor, ), {}))
+    return imp.load_source('_gpf_cursors_test', os.path.splitext(cursors.__file__)[0] + '.py')
+
+
+def test_make_column(monkeypatch):
+    np = pytest.importorskip('numpy')
+    column = cursors._make_column((1.5, 2.5))
+    assert isinstance(column, np.ndarray) and column.dtype == np.float64
+    assert cursors._make_column((1, None)).dtype == object
+
+    monkeypatch.setattr(cursors, '_np', None)
+    column = cursors._make_column((1.5, 2.5))
+    assert (column.typecode, column.tolist()) == ('d', [1.5, 2.5])
+    column = cursors._make_column((1, 2L))
+    assert (column.typecode, column.tolist()) == ('l', [1, 2])
+    assert cursors._make_column((1, None)) == (1, None)
+    assert cursors._make_column((1, 2.5)) == (1, 2.5)
+    assert cursors._make_column((True, False)) == (True, False)
+    assert cursors._make_column((2 ** 80, )) == (2 ** 80, )
+    assert cursors._make_column(()).tolist() == []
+
+
+def test_fetch_batches(da_cursors, monkeypatch):
+    da_cursors._arcpy.da.SearchCursor.rows = [(i, 'v{}'.format(i)) for i in xrange(5)]
+    with da_cursors.SearchCursor('test', ['ID', 'VALUE']) as rows:
+        assert list(rows.fetch_batches(2)) == [[(0, 'v0'), (1, 'v1')], [(2, 'v2'), (3, 'v3')], [(4, 'v4')]]
+        assert list(rows.fetch_batches(2)) == []
+        rows.reset()
+        assert rows.next().getValue('value') == 'v0'
+        assert list(rows.fetch_batches()) == [[(1, 'v1'), (2, 'v2'), (3, 'v3'), (4, 'v4')]]
+        with pytest.raises(ValueError):
+            next(rows.fetch_batches(0))
+
+    monkeypatch.setattr(da_cursors, '_np', None)
+    with da_cursors.SearchCursor('test', ['ID', 'VALUE']) as rows:
+        blocks = list(rows.as_columns(3))
+    assert [(ids.tolist(), values) for ids, values in blocks] == [([0, 1, 2], ('v0', 'v1', 'v2')), ([3, 4], ('v3', 'v4'))]
+
+
+def test_bulk_insert(da_cursors):
+    editor = mock.Mock()
+    cursor = da_cursors.InsertCursor('test', ['A', 'B'])
+    rows = [{'a': 1, 'b': 'x'}, (2, 'y'), {'B': 'z', 'C': 0}, [4, None], {'a': 5}]
+    stats = cursor.bulk_insert(iter(rows), chunk_size=2, editor=editor)
+    assert (stats.rows, stats.chunks) == (5, 3)
+    assert stats.seconds >= 0 and stats.rows_per_second >= 0
+    assert repr(stats).startswith('InsertStats(rows=5, chunks=3, seconds=')
+    assert editor.commit.call_args_list == [mock.call(2), mock.call(2), mock.call(1)]
+    assert [values for _, values in cursor.inserted] == [(1, 'x'), (2, 'y'), (None, 'z'), (4, None), (5, None)]
+
+    # Dict rows are copied into a single buffer, whereas tuple and list rows are inserted as-is
+    inserted = [row for row, _ in cursor.inserted]
+    assert inserted[0] is inserted[2] is inserted[4]
+    assert inserted[1] is rows[1] and inserted[3] is rows[3]
+
+    # Without an editor (or chunk size), no commits take place
+    editor.reset_mock()
+    stats = cursor.bulk_insert([(6, 'a'), (7, 'b')], chunk_size=1)
+    assert (stats.rows, stats.chunks) == (2, 0)
+    stats = cursor.bulk_insert([(8, 'c')], chunk_size=0, editor=editor)
+    assert (stats.rows, stats.chunks) == (1, 0)
+    assert not editor.commit.called
+    assert len(cursor.inserted) == 8
+    assert cursor.bulk_insert([]).rows == 0
+
+    # The cursor editor ticks for each single row insert, but bulk inserts are committed in chunks
+    tracker = mock.Mock()
+    cursor = da_cursors.InsertCursor('test', ['A', 'B'], editor=tracker)
+    cursor.insertRow((1, 'x'))
+    assert tracker.tick.call_count == 1
+    stats = cursor.bulk_insert([(2, 'y')] * 3, chunk_size=2)
+    assert (stats.rows, stats.chunks) == (3, 2)
+    assert tracker.commit.call_args_list == [mock.call(2), mock.call(1)]
+    assert tracker.tick.call_count == 1
+
+
+def test_editor_commit(da_cursors):
+    editor = da_cursors.Editor(Workspace('in_memory'))
+    editor.commit()
+    assert editor.calls == []
+    with editor:
+        editor.commit()
+    assert editor.calls == ['startEditing', 'startOperation', 'stopOperation', 'startOperation',
+                            'stopOperation', 'stopEditing']
+
+
+def test_editor_chunks(da_cursors, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(da_cursors, '_timer', lambda: clock[0])
+    commits = []
+    editor = da_cursors.Editor(Workspace('in_memory'), chunk_size=3, on_commit=commits.append)
+    editor.commit()
+    assert commits == [] and editor.calls == []
+
+    with editor:
+        editor.tick()
+        editor.tick()
+        assert commits == []
+        editor.tick()
+        assert commits == [3]
+        editor.tick(5)
+        assert commits == [3, 5]
+        editor.tick()
+        editor.commit(2)
+        assert commits == [3, 5, 3]
+    assert editor.calls == ['startEditing', 'startOperation'] + ['stopOperation', 'startOperation'] * 3 + \
+        ['stopOperation', 'stopEditing']
+
+    # Commit when the operation has been open for (at least) 10 seconds
+    del commits[:]
+    editor = da_cursors.Editor(Workspace('in_memory'), interval=10, on_commit=commits.append)
+    with editor:
+        editor.tick()
+        clock[0] = 9.0
+        editor.tick()
+        assert commits == []
+        clock[0] = 10.0
+        editor.tick()
+        assert commits == [3]
+        clock[0] = 19.0
+        editor.tick(100)
+        assert commits == [3]
+
+    # Rollback on failure
+    editor = da_cursors.Editor(Workspace('in_memory'), chunk_size=1)
+    with pytest.raises(RuntimeError):
+        with editor:
+            editor.tick()
+            raise RuntimeError('failed')
+    assert editor.calls[-4:] == ['stopOperation', 'startOperation', 'abortOperation', 'stopEditing']
+
+    with pytest.raises(ValueError):
+        da_cursors.Editor(Workspace('in_memory'), chunk_size=-1)
+    with pytest.raises(ValueError):
+        da_cursors.Editor(Workspace('in_memory'), on_commit='bad')
+    with pytest.raises(ValueError):
+        da_cursors.Editor(Workspace('in_memory'), chunksize=100)
+
+
+def test_iter_in(monkeypatch):
+    class FakeCursor(object):
+        closed = []
+
+        def __init__(self, datatable, field_names, where_clause, **kwargs):
+            self.where_clause = where_clause
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            self.closed.append((self.where_clause, exc_type))
+
+    monkeypatch.setattr(cursors, '_get_inclauses', lambda table, field, values, where, size: ['c1', 'c2', 'c3'])
+
+    assert [c.where_clause for c in cursors.iter_in(FakeCursor, 'test', ['A'], 'A', [])] == ['c1', 'c2', 'c3']
+    assert FakeCursor.closed == [('c1', None), ('c2', None), ('c3', None)]
+
+    # Stopping early saves the edits, an exception thrown into the generator rolls them back
+    del FakeCursor.closed[:]
+    chunks = cursors.iter_in(FakeCursor, 'test', ['A'], 'A', [])
+    next(chunks)
+    chunks.close()
+    chunks = cursors.iter_in(FakeCursor, 'test', ['A'], 'A', [])
+    next(chunks)
+    with pytest.raises(RuntimeError):
+        chunks.throw(RuntimeError('failed'))
+    assert FakeCursor.closed == [('c1', None), ('c1', RuntimeError)]
+
+
+def test_profiler():
+    class FakeLogger(object):
+        def __init__(self):
+            self.messages = []
+
+        def info(self, message):
+            self.messages.append(message)
+
+    reports = []
+    profiler = cursors._Profiler(reports.append, 'UpdateCursor', 'test', 'A = 1')
+    profiler.opened()
+    profiler.add(0.5, 0.25)
+    profiler.add(0.5, rows=0, edits=2)
+    profiler.operations += 1
+    profiler.report()
+    profiler.report()
+    assert len(reports) == 1
+    stats = reports[0]
+    assert (stats['name'], stats['table'], stats['where_clause']) == ('UpdateCursor', u'test', 'A = 1')
+    assert (stats['rows'], stats['edits'], stats['operations']) == (1, 2, 1)
+    assert (stats['arcpy_seconds'], stats['wrapper_seconds']) == (1.0, 0.25)
+    assert stats['total_seconds'] >= stats['open_seconds'] >= 0
+
+    profiler.reset()
+    profiler.report()
+    assert len(reports) == 2 and reports[1]['rows'] == 0
+
+    logger = FakeLogger()
+    profiler = cursors._Profiler(logger, 'SearchCursor', 'test')
+    profiler.add(1.0, rows=10)
+    profiler.report()
+    assert len(logger.messages) == 1
+    assert logger.messages[0].startswith(u'SearchCursor on test: rows=10, rows_per_second=')
+    assert u'arcpy_seconds=1.000' in logger.messages[0] and u'edits' not in logger.messages[0]
+
+    with pytest.raises(ValueError):
+        cursors._Profiler('bad', 'SearchCursor', 'test')
+    assert cursors._get_profiler({}, 'SearchCursor', 'test') is None
+    kwargs = {'profile': reports.append, 'where_clause': 'A = 1'}
+    assert cursors._get_profiler(kwargs, 'SearchCursor', 'test').where_clause == 'A = 1'
+    assert 'profile' not in kwargs
+
+
+class FakeArcPyCursor(object):
+    """ Minimal ArcPy cursor, which fails after *fail_after* rows (if set). """
+
+    def __init__(self, num_rows, fail_after=None):
+        self._rows = iter(xrange(num_rows))
+        self._fail_after = fail_after
+        self.num_read = 0
+
+    def next(self):
+        if self.num_read == self._fail_after:
+            raise RuntimeError('cannot read row')
+        self.num_read += 1
+        return self._rows.next(),
+
+
+def test_prefetcher():
+    cursor = FakeArcPyCursor(2500)
+    fetcher = cursors._Prefetcher(cursor, FakeArcPyCursor.next, 100)
+    assert fetcher._thread is None
+    assert list(fetcher) == [(i, ) for i in xrange(2500)]
+    assert not fetcher._thread.is_alive()
+    assert list(fetcher) == []
+    cursor = FakeArcPyCursor(0)
+    assert list(cursors._Prefetcher(cursor, FakeArcPyCursor.next, 10)) == []
+
+
+def test_prefetcher_error():
+    cursor = FakeArcPyCursor(100, 15)
+    fetcher = cursors._Prefetcher(cursor, FakeArcPyCursor.next, 10)
+    assert [fetcher.next() for _ in xrange(15)] == [(i, ) for i in xrange(15)]
+    with pytest.raises(RuntimeError):
+        fetcher.next()
+    with pytest.raises(StopIteration):
+        fetcher.next()
+
+
+def test_prefetcher_close():
+    cursor = FakeArcPyCursor(100000)
+    fetcher = cursors._Prefetcher(cursor, FakeArcPyCursor.next, 10)
+    fetcher.close()
+    assert fetcher._thread is None and list(fetcher) == []
+
+    fetcher = cursors._Prefetcher(cursor, FakeArcPyCursor.next, 10)
+    assert fetcher.next() == (0, )
+    thread = fetcher._thread
+    fetcher.close()
+    assert not thread.is_alive()
+    assert list(fetcher) == []
+    assert cursor.num_read < 100
+
+    # An abandoned iterator stops the background thread as well
+    fetcher = cursors._Prefetcher(cursor, FakeArcPyCursor.next, 10)
+    fetcher.next()
+    thread = fetcher._thread
+    del fetcher
+    gc.collect()
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+
+def test_searchcursor_prefetch(da_cursors):
+    da_cursors._arcpy.da.SearchCursor.rows = [(i, 'v{}'.format(i)) for i in xrange(2500)]
+    with da_cursors.SearchCursor('test', ['ID', 'VALUE'], prefetch=100) as rows:
+        assert [row.getValue('ID') for row in rows] == range(2500)
+    with da_cursors.SearchCursor('test', ['ID', 'VALUE'], prefetch=100) as rows:
+        assert rows.next().getValue('VALUE') == 'v0'
+        assert [r for batch in rows.fetch_batches(1000) for r in batch] == da_cursors._arcpy.da.SearchCursor.rows[1:]
+    with pytest.raises(ValueError):
+        da_cursors.SearchCursor('test', ['ID', 'VALUE'], prefetch=-1)
+
+
+def test_searchcursor_prefetch_exit(da_cursors):
+    da_cursors._arcpy.da.SearchCursor.rows = [(i, ) for i in xrange(100000)]
+    with da_cursors.SearchCursor('test', ['ID'], prefetch=10) as rows:
+        assert rows.next().getValue('ID') == 0
+        fetcher = rows._fetcher
+    # Leaving the with block early stops the background thread and releases the rows that were read ahead
+    assert rows._fetcher is None
+    assert not fetcher._thread.is_alive()
+    assert fetcher._queue.empty()
+    assert list(rows._rows)
+
+
+def test_searchcursor_prefetch_error(da_cursors):
+    class FailingRows(object):
+        def __iter__(self):
+            for i in xrange(25):
+                yield i,
+            raise RuntimeError('cannot read row')
+
+    da_cursors._arcpy.da.SearchCursor.rows = FailingRows()
+    with da_cursors.SearchCursor('test', ['ID'], prefetch=10) as rows:
+        assert [rows.next().getValue('ID') for _ in xrange(25)] == range(25)
+        with pytest.raises(RuntimeError):
+            rows.next()
+        with pytest.raises(StopIteration):
+            rows.next()
+
+
+def test_get_identifier():
+    assert cursors._get_identifier('SHAPE@XY') == 'SHAPE_XY'
+    assert cursors._get_identifier('OID@') == 'OID_'
+    assert cursors._get_identifier(u'Name') == 'Name'
+    assert cursors._get_identifier('1st') == 'F_1st'
+    assert cursors._get_identifier('@') == 'F_'
+    assert cursors._get_identifier('class') == 'class_'
+
+
+def test_get_rowtype(monkeypatch):
+    monkeypatch.setattr(cursors, '_rowtypes', cursors._OrderedDict())
+    monkeypatch.setattr(cursors, '_ROWTYPES_SIZE', 2)
+    row_type = cursors.get_rowtype(['OID@', 'SHAPE@XY', 'Name'])
+    assert row_type._fields == ('OID_', 'SHAPE_XY', 'Name')
+    row = row_type(1, (2.0, 3.0), 'Test')
+    assert row.SHAPE_XY == (2.0, 3.0) and row[2] == 'Test'
+    assert cursors.get_rowtype(('OID@', 'SHAPE@XY', 'Name')) is row_type
+
+    # Duplicate identifiers are replaced by their position
+    assert cursors.get_rowtype(['SHAPE@XY', 'SHAPE_XY', 'class'])._fields == ('SHAPE_XY', '_1', 'class_')
+
+    # The least recently used type is removed from the cache
+    cursors.get_rowtype(['A'])
+    assert len(cursors._rowtypes) == 2
+    assert cursors.get_rowtype(['OID@', 'SHAPE@XY', 'Name']) is not row_type
+
+
+def test_get_accessor():
+    field_map = cursors._map_fields(['OID@', 'Name', 'SHAPE@XY'])
+    assert cursors._get_accessor(field_map, ['name'])((1, 'a', (0, 0))) == 'a'
+    assert cursors._get_accessor(field_map, ['SHAPE@XY', 'oid@'])((1, 'a', (0, 0))) == ((0, 0), 1)
+    with pytest.raises(ValueError):
+        cursors._get_accessor(field_map, ['bad'])
+    with pytest.raises(ValueError):
+        cursors._get_accessor(field_map, [])
+
+
+def test_row():
+    field_map = cursors._map_fields(['OID@', 'Name'])
+    row = cursors._Row(field_map)((1, 'a'))
+    assert row.getValue('name') == 'a' and row.getValue('bad', None) is None
+    assert row.asDict() == {'OID@': 1, 'NAME': 'a'}
+    with pytest.raises(ValueError):
+        row.getValue('bad')
+
+    # All rows share the field map of the cursor (including the cached field positions)
+    mutable_row = cursors._MutableRow(field_map)
+    mutable_row.setValue('Name', 'b')
+    assert mutable_row._fieldmap is field_map and field_map.positions == {'name': 1, 'bad': None, 'Name': 1}
+    assert mutable_row[1] == 'b' and mutable_row.isNull('OID@')
+    assert cursors._Row({'B': 1, 'A': 0})(('a', 'b')).asDict() == {'A': 'a', 'B': 'b'}
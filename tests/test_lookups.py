@@ -14,7 +14,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from gpf.lookups import get_nodekey
+import functools
+import os
+import tempfile
+
+import mock
+import pytest
+
+import gpf.lookups as lookups
+from gpf.lookups import get_nodekey, get_nodekeys, get_nodekey_neighbors, find_nodekey, NodeIndex, \
+    RowLookup, MappedLookup, join_keys, JOIN_PUSHDOWN, JOIN_SCAN
 
 
 def test_coord_key():
@@ -22,3 +31,309 @@ def test_coord_key():
     assert get_nodekey(*coord) == (42451, 232454)
     assert get_nodekey(53546343.334242254, 23542233.354352246) == (535463433342L, 235422333543L)
     assert get_nodekey(1, 2, 3) == (10000, 20000, 30000)
+
+
+# The fake cursor returns batches of 2 rows: the NAME column is NULL in the whole first batch
+ROWS = [(3, None, 1.0, (1.0, 2.0)), (1, None, 2.0, (0.0, 0.0)), (None, u'x', 0.0, (0.0, 0.0)),
+        (2, u'bb', 3.0, (1.5, 1.5)), (3, u'c', 4.0, (2.0, 2.0)), (5, u'dddd', 5.0, (3.0, 3.0))]
+
+
+class FakeField(object):
+
+    def __init__(self, name, field_type, nullable=True):
+        self.name = name
+        self.type = field_type
+        self.isNullable = nullable
+
+
+class FakeDescribe(object):
+    fields = [FakeField('ID', 'Integer'), FakeField('NAME', 'String'), FakeField('LENGTH', 'Double', False)]
+
+    def __init__(self, element):
+        pass
+
+    def get_fields(self, names_only=True, uppercase=False):
+        return [f.name if names_only else f for f in self.fields]
+
+
+class FakeCursor(object):
+
+    def __init__(self, table_path, field_names, where_clause=None):
+        self.rows = [] if table_path == 'empty' else [row[:len(field_names)] for row in ROWS]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def fetch_batches(self, size=2):
+        for i in xrange(0, len(self.rows), size):
+            yield self.rows[i:i + size]
+
+
+def test_compact_lookup(monkeypatch):
+    pytest.importorskip('numpy')
+    monkeypatch.setattr(lookups._meta, 'Describe', FakeDescribe)
+    monkeypatch.setattr(lookups._cursors, 'SearchCursor', FakeCursor)
+    value_fields = ['NAME', 'LENGTH', 'SHAPE@XY']
+
+    lookup = lookups.CompactLookup('test', 'ID', value_fields)
+    assert len(lookup) == 4
+    assert lookup.get(1) == (None, 2.0, (0.0, 0.0))
+    assert lookup[3] == (u'c', 4.0, (2.0, 2.0))
+    assert lookup.get_value(2, 'name') == u'bb'
+    assert lookup.get_value(2, 'bad', 0) == 0
+    assert lookup.get(4) is None and lookup.get('x', 0) == 0
+    assert 5 in lookup and 4 not in lookup
+    with pytest.raises(KeyError):
+        lookup.__getitem__(4)
+    assert list(lookup) == [1, 2, 3, 5]
+    assert list(lookup) == lookup.keys() == [1, 2, 3, 5]
+
+    lookup = lookups.CompactLookup('test', 'ID', value_fields, duplicate_keys=True)
+    assert len(lookup) == 4
+    assert lookup.get(3) == [(None, 1.0, (1.0, 2.0)), (u'c', 4.0, (2.0, 2.0))]
+    assert lookup.get_value(3, 'LENGTH') == 1.0
+    assert lookups.CompactLookup('test', 'ID', 'NAME').get(5) == u'dddd'
+
+    lookup = lookups.CompactLookup('empty', 'ID', value_fields)
+    assert len(lookup) == 0 and list(lookup) == [] and lookup.get(1) is None
+    with pytest.raises(ValueError):
+        lookups.CompactLookup('test', 'SHAPE@XY', 'NAME')
+    with pytest.raises(RuntimeError):
+        lookups.CompactLookup('test', 'ID', 'BAD')
+
+
+def test_compact_lookup_numpy(monkeypatch):
+    monkeypatch.setattr(lookups, '_np', None)
+    with pytest.raises(ImportError):
+        lookups.CompactLookup('test', 'ID', 'NAME')
+
+
+def test_nodeindex_within():
+    keys = [get_nodekey(x, y) for x, y in ((0, 0), (0.5, 0.5), (3, 4), (-2, -2), (10, 10))]
+    index = NodeIndex(keys, 1)
+    assert len(index) == 5
+    assert index.within((0, 0), 1) == [(0, 0), (5000, 5000)]
+    assert index.within((0, 0), 5) == [(0, 0), (5000, 5000), (-20000, -20000), (30000, 40000)]
+    assert index.within((20, 20), 5) == []
+    with pytest.raises(ValueError):
+        index.within(1, 1)
+
+    # A huge search radius only visits the cells within the grid bounds
+    class CountingDict(dict):
+        calls = 0
+
+        def get(self, key, default=None):
+            CountingDict.calls += 1
+            return super(CountingDict, self).get(key, default)
+
+    index._cells = CountingDict(index._cells)
+    assert index.within((0, 0), 1e9) == [(0, 0), (5000, 5000), (-20000, -20000), (30000, 40000), (100000, 100000)]
+    assert CountingDict.calls == 13 * 13
+    assert NodeIndex([]).within((0, 0), 1e9) == []
+    with pytest.raises(ValueError):
+        NodeIndex(keys, 0)
+
+
+def test_nodeindex_nearest():
+    keys = [get_nodekey(x, y, z) for x, y, z in ((0, 0, 0), (0, 0, 5), (3, 4, 0), (-2, -2, 1))]
+    index = NodeIndex(keys)
+    assert index.nearest((0, 0, 0)) == [(0, 0, 0)]
+    assert index.nearest((2.9, 3.9, 0), 2) == [(30000, 40000, 0), (0, 0, 0)]
+    assert index.nearest((100, 100, 0), 10) == [(30000, 40000, 0), (0, 0, 0), (0, 0, 50000), (-20000, -20000, 10000)]
+    assert index.nearest((1e7, 1e7, 0)) == [(30000, 40000, 0)]
+    with mock.patch.object(NodeIndex, '_iter_ring', autospec=True, side_effect=NodeIndex._iter_ring) as iter_ring:
+        assert index.nearest((-1e6, 4, 0)) == [(-20000, -20000, 10000)]
+        assert iter_ring.call_count < 10
+    assert NodeIndex([]).nearest((0, 0)) == []
+    with pytest.raises(ValueError):
+        index.nearest((0, 0))
+    with pytest.raises(ValueError):
+        index.nearest((0, 0, 0), 0)
+
+
+def test_coord_keys():
+    assert get_nodekeys([(4.2452, 23.24541), (1, 2, 3)]) == [(42451, 232454), (10000, 20000, 30000)]
+    np = pytest.importorskip('numpy')
+    keys = get_nodekeys(np.array([(4.2452, 23.24541), (-1., 2.)]))
+    assert keys.tolist() == [[42451, 232454], [-10000, 20000]]
+    with pytest.raises(ValueError):
+        get_nodekeys(np.array([1., 2.]))
+
+
+def test_nodekey_neighbors():
+    assert get_nodekey_neighbors((0, 0), 4) == [(-1, 0), (0, -1), (0, 1), (1, 0)]
+    assert len(get_nodekey_neighbors((0, 0))) == 8
+    assert len(get_nodekey_neighbors((0, 0, 0), 6)) == 6
+    assert len(get_nodekey_neighbors((0, 0, 0))) == 26
+    assert get_nodekey_neighbors((0, 0), 0) == []
+    with pytest.raises(ValueError):
+        get_nodekey_neighbors((0, 0), 26)
+
+
+def test_find_nodekey():
+    nodes = {get_nodekey(1.0, 2.0), get_nodekey(5.0, 5.0)}
+    assert find_nodekey(nodes, (1.0, 2.0)) == (10000, 20000)
+    assert find_nodekey(nodes, (0.99999999, 2.0)) == (10000, 20000)
+    assert find_nodekey(nodes, (0.99999999, 1.99999999), 4) is None
+    assert find_nodekey(nodes, (0.99999999, 1.99999999)) == (10000, 20000)
+    assert find_nodekey(nodes, (0.99999999, 2.0), 0) is None
+    assert find_nodekey(nodes, (3.0, 3.0)) is None
+
+
+def test_mapped_lookup():
+    lookup = RowLookup.__new__(RowLookup)
+    lookup.update({u'a': (1, u'x'), 2: (2, None), (10000, 20000): (3, u'z')})
+    lookup._fieldmap = {'field1': 0, 'field2': 1}
+    path = os.path.join(tempfile.mkdtemp(), 'test.map')
+    lookup.export(path)
+    with MappedLookup(path) as mapped:
+        assert len(mapped) == 3
+        assert mapped.get('a') == (1, u'x')
+        assert mapped.get(2L) == (2, None)
+        assert mapped[(10000, 20000)] == (3, u'z')
+        assert mapped.get('b', 0) == 0
+        assert mapped.get_value('a', 'Field2') == u'x'
+        assert mapped.get_value('a', 'Field3', -1) == -1
+        assert sorted(mapped.keys()) == sorted(lookup.keys())
+        with pytest.raises(KeyError):
+            mapped.__getitem__('b')
+    with pytest.raises(ValueError):
+        MappedLookup(__file__)
+
+
+def test_join_keys(monkeypatch):
+    rows = [(i, 'v{}'.format(i)) for i in xrange(1000)]
+    calls = []
+
+    class FakeDescribe(object):
+        def __init__(self, element):
+            pass
+
+        @staticmethod
+        def num_rows():
+            return len(rows)
+
+    class FakeCursor(object):
+        def __init__(self, table_path, fields, where_clause=None):
+            calls.append(JOIN_SCAN)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+        @staticmethod
+        def fetch_batches():
+            yield rows
+
+    def fake_search_in(table_path, fields, key_field, keys, where_clause=None, max_workers=1):
+        calls.append(JOIN_PUSHDOWN)
+        return (r for r in rows if r[0] in keys)
+
+    monkeypatch.setattr(lookups._meta, 'Describe', FakeDescribe)
+    monkeypatch.setattr(lookups._cursors, 'SearchCursor', FakeCursor)
+    monkeypatch.setattr(lookups._cursors, 'search_in', fake_search_in)
+    assert sorted(join_keys([3, 1, None, 3], 'test', 'ID', 'VALUE')) == [(1, 'v1'), (3, 'v3')]
+    assert sorted(join_keys(xrange(995, 2000), 'test', 'ID', ['VALUE'])) == rows[995:]
+    assert calls == [JOIN_PUSHDOWN, JOIN_SCAN]
+    assert list(join_keys([5], 'test', 'ID', 'VALUE', strategy=JOIN_SCAN)) == [(5, 'v5')]
+    assert list(join_keys([], 'test', 'ID', 'VALUE')) == []
+    with pytest.raises(ValueError):
+        list(join_keys([1], 'test', 'ID', 'VALUE', strategy='bad'))
+
+
+def test_lookup_cache(monkeypatch):
+    class FakeWorkspace(object):
+        last_modified = 100.0
+
+    class FakeDescribe(object):
+        catalogPath = 'test'
+
+        def __init__(self, element):
+            pass
+
+        @staticmethod
+        def num_rows():
+            return 2
+
+        @staticmethod
+        def get_oid_range():
+            return 1, 2
+
+        @staticmethod
+        def get_fields(names_only=True, uppercase=False):
+            return ['ID', 'VALUE']
+
+    class FakeCursor(object):
+        rows = [(1, 'a'), (2, 'b')]
+        opened = []
+
+        def __init__(self, table_path, field_names, where_clause=None):
+            self.opened.append(table_path)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            pass
+
+        def __iter__(self):
+            return iter(self.rows)
+
+    monkeypatch.setattr(lookups._meta, 'Describe', FakeDescribe)
+    monkeypatch.setattr(lookups._cursors, 'SearchCursor', FakeCursor)
+    monkeypatch.setattr(lookups._paths, 'get_workspace', lambda path, root=False: FakeWorkspace())
+    cache_dir = tempfile.mkdtemp()
+
+    # Save and load a cached lookup
+    assert lookups.ValueLookup('test', 'ID', 'VALUE', cache_dir=cache_dir) == {1: 'a', 2: 'b'}
+    assert len(os.listdir(cache_dir)) == 1
+    FakeCursor.rows = [(1, 'x'), (2, 'y')]
+    assert lookups.ValueLookup('test', 'ID', 'VALUE', cache_dir=cache_dir) == {1: 'a', 2: 'b'}
+    assert len(FakeCursor.opened) == 1
+
+    # The table has changed (stale cache)
+    FakeWorkspace.last_modified = 200.0
+    assert lookups.ValueLookup('test', 'ID', 'VALUE', cache_dir=cache_dir) == {1: 'x', 2: 'y'}
+    assert len(FakeCursor.opened) == 2
+    assert lookups.ValueLookup('test', 'ID', 'VALUE', cache_dir=cache_dir) == {1: 'x', 2: 'y'}
+    assert len(FakeCursor.opened) == 2
+
+    # The last modification time is unknown (e.g. SDE): the cache is never used
+    FakeWorkspace.last_modified = None
+    FakeCursor.rows = [(1, 'z'), (2, 'y')]
+    with pytest.warns(UserWarning):
+        assert lookups.ValueLookup('test', 'ID', 'VALUE', cache_dir=cache_dir) == {1: 'z', 2: 'y'}
+    assert len(FakeCursor.opened) == 3
+    assert len(os.listdir(cache_dir)) == 1
+    for name in os.listdir(cache_dir):
+        os.remove(os.path.join(cache_dir, name))
+    os.rmdir(cache_dir)
+
+
+def test_lookup_cachekey():
+    def make_func(source):
+        namespace = {}
+        exec source in namespace
+        return namespace['row_func']
+
+    func_a = make_func('def row_func(lookup, row, **kwargs):\n    return row[0] * 2\n')
+    func_b = make_func('def row_func(lookup, row, **kwargs):\n    return row[0] * 3\n')
+    assert lookups._get_funckey(func_a) == lookups._get_funckey(make_func(
+        'def row_func(lookup, row, **kwargs):\n    return row[0] * 2\n'))
+    assert lookups._get_funckey(func_a) != lookups._get_funckey(func_b)
+    assert lookups._get_funckey(lookups.Lookup._process_row)[:2] == ('gpf.lookups', '_process_row')
+    assert lookups._get_funckey(functools.partial(func_a, None)) is None
+    assert lookups._get_funckey(len) is None
+    assert lookups._get_funckey(lambda lookup, row, **kwargs: func_a(lookup, row)) is None
+
+    lookup = dict.__new__(lookups.Lookup)
+    args = ('C:/Temp', 'test', ('ID', 'VALUE'), None)
+    path_a = lookup._get_cachepath(*args, row_func=func_a)
+    assert path_a == lookup._get_cachepath(*args, row_func=func_a, processes=4)
+    assert path_a != lookup._get_cachepath(*args, row_func=func_b)
+    assert lookup._get_cachepath(*args, row_func=functools.partial(func_a)) is None
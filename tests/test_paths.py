@@ -186,3 +186,12 @@ def test_workspace_mem():
     assert paths.Workspace.get_parent(str(ws), True) == 'in_memory'
     assert ws.get_root(str(ws)) == 'in_memory'
     assert ws.is_gdb is True
+
+
+def test_workspace_modified():
+    dir_path = os.path.dirname(__file__)
+    ws = paths.Workspace(os.path.join(dir_path, 'test.gdb', 'table'))
+    assert ws.last_modified is None
+    ws = paths.Workspace(os.path.join(dir_path, 'test_paths.py'))
+    assert ws.last_modified >= os.path.getmtime(__file__)
+    assert paths.Workspace('in_memory').last_modified is None
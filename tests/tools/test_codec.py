@@ -0,0 +1,131 @@
+# coding: utf-8
+#
+# Copyright 2019 Geocom Informatik AG / VertiGIS
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import struct
+from math import hypot
+
+import pytest
+
+from gpf.tools import codec
+
+
+def _coords(shape):
+    return [tuple(c) for c in shape.coords]
+
+
+def test_shape():
+    shape = codec.Shape('polyline', [(0, 0), (3, 4), (10, 10), (10, 12, 5)], [0, 2])
+    assert (shape.shape_type, shape.num_parts, shape.num_vertices, shape.has_z) == ('Polyline', 2, 4, False)
+    assert shape.offsets == [0, 2, 4]
+    assert shape.length == 7.0
+    assert shape.envelope == (0, 0, 10, 12)
+    assert (shape.first_point, shape.last_point) == ((0, 0), (10, 12))
+    assert [tuple(c) for c in shape.get_part(-1)] == [(10, 10), (10, 12)]
+    shape = codec.Shape('Multipoint', [(0, 0, 1), (3, 4)])
+    assert (shape.num_parts, shape.length, shape.has_z) == (1, 0, True)
+    assert _coords(shape) == [(0, 0, 1), (3, 4, 0)]
+    shape = codec.Shape('Point', [])
+    assert shape.is_empty and shape.envelope is None and shape.num_parts == 0
+    with pytest.raises(ValueError):
+        codec.Shape('Multipatch', [])
+    with pytest.raises(ValueError):
+        codec.Shape('Point', [(0, 0), (1, 1)])
+    with pytest.raises(ValueError):
+        codec.Shape('Polyline', [(0, 'a')])
+
+
+def test_esrijson():
+    shape = codec.from_esrijson('{"hasZ": true, "hasM": true, "rings": [[[0, 0, 1, 9], {"c": [[0, 4, 2, 9], [1, 1]]},'
+                                '[4, 4, 3, 9], [0, 0, 1, 9]]]}')
+    assert (shape.shape_type, shape.has_z, shape.offsets) == ('Polygon', True, [0, 4])
+    assert _coords(shape) == [(0, 0, 1), (0, 4, 2), (4, 4, 3), (0, 0, 1)]
+    assert codec.from_esrijson({'x': 'NaN', 'y': 'NaN'}).is_empty
+    assert codec.to_esrijson(codec.from_esrijson({'x': 1, 'y': 2})) == {'x': 1, 'y': 2}
+    assert codec.to_esrijson(codec.Shape('Polygon', [(0, 0), (0, 1), (1, 1)])) == {
+        'rings': [[[0, 0], [0, 1], [1, 1], [0, 0]]]
+    }
+    assert codec.to_esrijson(codec.Shape('Multipoint', [(1, 2, 3)]), True) == '{"points": [[1.0, 2.0, 3.0]], "hasZ": true}'
+    with pytest.raises(ValueError):
+        codec.from_esrijson('{"spatialReference": {"wkid": 2056}}')
+    with pytest.raises(ValueError):
+        codec.from_esrijson('<xml/>')
+
+
+def test_wkb():
+    # Big-endian 2D LineString, as written by other software
+    wkb = struct.pack('>BII4d', 0, 2, 2, 0, 0, 3, 4)
+    shape = codec.from_wkb(wkb)
+    assert (shape.shape_type, shape.offsets, shape.length) == ('Polyline', [0, 2], 5.0)
+    # Polygon with a hole (exterior ring is clockwise in Esri geometries) and a second polygon
+    rings = [[(0, 0), (0, 10), (10, 10), (10, 0), (0, 0)], [(2, 2), (4, 2), (4, 4), (2, 2)],
+             [(20, 20), (20, 30), (30, 30), (20, 20)]]
+    polygon = codec.Shape('Polygon', [c for r in rings for c in r], [0, 5, 9])
+    wkb = codec.to_wkb(polygon)
+    assert struct.unpack_from('<BII', wkb) == (1, 6, 2)
+    shape = codec.from_wkb(wkb)
+    assert shape.offsets == [0, 5, 9, 13]
+    assert _coords(shape) == _coords(polygon)
+    # ISO WKB with Z and M values
+    wkb = codec.to_wkb(codec.Shape('Multipoint', [(1, 2, 3), (4, 5, 6)]))
+    assert struct.unpack_from('<BI', wkb) == (1, 1004)
+    assert _coords(codec.from_wkb(wkb)) == [(1, 2, 3), (4, 5, 6)]
+    wkb = struct.pack('<BI4d', 1, 3001, 1, 2, 3, 4)
+    assert _coords(codec.from_wkb(wkb)) == [(1, 2, 3)]
+    wkb = struct.pack('<BI3d', 1, 2001, 1, 2, 3)
+    assert _coords(codec.from_wkb(wkb)) == [(1, 2)]
+    assert codec.from_wkb(codec.to_wkb(codec.Shape('Point', []))).is_empty
+    with pytest.raises(ValueError):
+        codec.from_wkb(b'\x01\x02')
+    with pytest.raises(ValueError):
+        codec.from_wkb(struct.pack('<BI', 1, 7))
+
+
+def test_empty_part():
+    for offsets in ([0, 0, 3], [0, 3, 3]):
+        shape = codec.Shape('Polyline', [(0, 0), (3, 4), (3, 8)], offsets)
+        assert (shape.num_parts, shape.length) == (2, 9.0)
+    shape = codec.Shape('Polyline', [(0, 0), (3, 4), (3, 8), (10, 10)], [0, 2, 2, 4])
+    assert (shape.num_parts, shape.length) == (3, 5.0 + hypot(7, 2))
+    polygon = codec.Shape('Polygon', [(0, 0), (0, 1), (1, 1)], [0, 0, 3])
+    assert codec.to_esrijson(polygon)['rings'] == [[], [[0, 0], [0, 1], [1, 1], [0, 0]]]
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        codec.from_esrijson({'x': 1, 'y': None})
+    with pytest.raises(ValueError):
+        codec.from_esrijson({'paths': [[[0, 0], [1, None]]]})
+    with pytest.raises(ValueError):
+        codec.Shape('Polyline', [(0, 0), (1, 1)], [0, 5])
+    with pytest.raises(ValueError):
+        codec.Shape('Polyline', [(0, 0), (1, 1), (2, 2)], [1, 2])
+    assert codec.Shape('Polyline', [], [0, 5]).offsets == [0]
+    assert codec.from_esrijson({'paths': [[]]}).offsets == [0]
+    if codec._np:
+        with pytest.raises(ValueError):
+            codec.Shape('Polyline', codec._np.array([(0, None), (1, 1)], dtype=object))
+
+
+def test_no_numpy(monkeypatch):
+    monkeypatch.setattr(codec, '_np', None)
+    shape = codec.from_esrijson({'paths': [[[0, 0], [3, 4]], [[10, 10], [10, 12]]]})
+    assert shape.coords == [(0, 0), (3, 4), (10, 10), (10, 12)]
+    assert (shape.offsets, shape.length, shape.envelope) == ([0, 2, 4], 7.0, (0, 0, 10, 12))
+    assert codec.from_wkb(codec.to_wkb(shape)).coords == shape.coords
+    with pytest.raises(ValueError):
+        codec.from_esrijson({'x': 1, 'y': None})
+    with pytest.raises(ValueError):
+        codec.Shape('Polyline', [(0, 0), (1, 1)], [0, 5])
@@ -0,0 +1,121 @@
+# coding: utf-8
+#
+# Copyright 2019 Geocom Informatik AG / VertiGIS
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+
+import pytest
+
+from gpf.tools import delta
+
+TABLES = {
+    'old': [(1, u'PE', 1.5), (2, u'PVC', 2.0), (3, u'PE', 3.0), (None, u'PE', 0.0)],
+    'new': [(1, 'PE', 1.5), (2, u'PVC', 2.5), (4, u'PE', 4.0)]
+}
+
+
+class FakeCursor(object):
+
+    def __init__(self, table_path, field_names, where_clause=None):
+        self.rows = TABLES[table_path]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def fetch_batches(self, size=2):
+        # Use small batches, so that the rows of a table are spread over multiple batches
+        for i in xrange(0, len(self.rows), size):
+            yield self.rows[i:i + size]
+
+
+def test_hash():
+    assert delta.get_hash(('a', 1L, None)) == delta.get_hash([u'a', 1, None])
+    assert delta.get_hash((bytearray('ab'), )) == delta.get_hash((bytearray(b'ab'), ))
+    assert delta.get_hash((1, 2)) != delta.get_hash((2, 1))
+    assert isinstance(delta.get_hash((1.5, )), int)
+
+
+def test_changes(monkeypatch):
+    monkeypatch.setattr(delta._cursors, 'SearchCursor', FakeCursor)
+    expected = [(delta.UPDATE, 2, (u'PVC', 2.5)), (delta.INSERT, 4, (u'PE', 4.0)), (delta.DELETE, 3, None)]
+    assert list(delta.iter_changes('old', 'new', 'ID', ['MATERIAL', 'LENGTH'])) == expected
+    hashes = delta.get_hashes('old', 'ID', ['MATERIAL', 'LENGTH'])
+    assert sorted(hashes) == [1, 2, 3]
+    assert list(delta.iter_changes(hashes, 'new', 'ID', ['MATERIAL', 'LENGTH'])) == expected
+    assert len(hashes) == 3
+    assert list(delta.iter_changes('new', 'new', 'ID', ['MATERIAL', 'LENGTH'])) == []
+    with pytest.raises(ValueError):
+        list(delta.iter_changes({}, 'new', 'ID', []))
+
+
+def test_fingerprint_index(monkeypatch):
+    monkeypatch.setattr(delta._cursors, 'SearchCursor', FakeCursor)
+    fields = ['MATERIAL', 'LENGTH']
+    path = os.path.join(tempfile.mkdtemp(), 'test.fpi')
+    index = delta.FingerprintIndex(path)
+    assert len(index) == 0
+    assert [c for c, _, _ in index.iter_changes('old', 'ID', fields)] == [delta.INSERT] * 3
+    index.save()
+
+    index = delta.FingerprintIndex(path)
+    assert sorted(index) == [1, 2, 3]
+    assert index.get(2) == delta.get_hash((u'PVC', 2.0))
+    changes = [(delta.UPDATE, 2, (u'PVC', 2.5)), (delta.INSERT, 4, (u'PE', 4.0)), (delta.DELETE, 3, None)]
+    assert list(index.iter_changes('new', 'ID', fields, update=False)) == changes
+    assert 3 in index
+    assert list(index.iter_changes('new', 'id', ['material', 'length'])) == changes
+    assert sorted(index) == [1, 2, 4]
+    assert list(index.iter_changes('new', 'ID', fields)) == []
+    with pytest.raises(ValueError):
+        list(index.iter_changes('new', 'ID', ['MATERIAL']))
+
+    with open(path, 'wb') as f:
+        f.write('invalid')
+    with pytest.raises(ValueError):
+        delta.FingerprintIndex(path)
+    os.remove(path)
+
+
+def test_compact_hashes(monkeypatch):
+    monkeypatch.setattr(delta._cursors, 'SearchCursor', FakeCursor)
+    fields = ['MATERIAL', 'LENGTH']
+    changes = [(delta.UPDATE, 2, (u'PVC', 2.5)), (delta.INSERT, 4, (u'PE', 4.0)), (delta.DELETE, 3, None)]
+    path = os.path.join(tempfile.mkdtemp(), 'test.fpi')
+    index = delta.FingerprintIndex(path)
+    index.build('old', 'ID', fields)
+    if delta._np:
+        assert isinstance(index._hashes, delta._SortedHashes)
+        assert index._hashes.keys.dtype == index._hashes.hashes.dtype == delta._np.int64
+    assert (sorted(index), 4 in index, index.get(4, 0)) == ([1, 2, 3], False, 0)
+    index.save()
+    assert list(delta.FingerprintIndex(path).iter_changes('new', 'ID', fields)) == changes
+
+    hashes = delta._make_hashes([(2, 10), (1, 20), (2, 30)])
+    assert (sorted(hashes), hashes.get(2), hashes.get(u'2')) == ([1, 2], 30, None)
+
+    # Text keys (or keys that do not fit in 64 bits) are kept in a dict
+    hashes = delta._make_hashes([(1, 10), (2 ** 70, 20), (u'a', 30), (1, 40)])
+    assert hashes == {1: 40, 2 ** 70: 20, u'a': 30}
+
+    monkeypatch.setattr(delta, '_np', None)
+    index = delta.FingerprintIndex(path + '.tmp')
+    index.build('old', 'ID', fields)
+    assert isinstance(index._hashes, dict)
+    assert list(index.iter_changes('new', 'ID', fields)) == changes
+    os.remove(path)
@@ -34,3 +34,37 @@ def test_getxyz():
     assert get_xyz(1.05, 2.1, 5.6, 3.24) == (1.05, 2.1, 5.6)
     assert get_xyz({'x': 1, 'y': 2}) == (1, 2, None)
     assert get_xyz({'X': 1, 'Y': 2, 'z': 3}) == (1, 2, 3)
+
+
+def test_getcoords():
+    coords, offsets = get_coords('{"paths": [[[0, 0], [1, 1]], [[2, 0], [3, 3], [4, 4]]]}')
+    assert offsets == [0, 2, 5]
+    assert [tuple(c) for c in coords] == [(0, 0), (1, 1), (2, 0), (3, 3), (4, 4)]
+    coords, offsets = get_coords({'hasZ': True, 'hasM': True, 'rings': [[[0, 0, 1, 9], {'c': [[1, 1, 2, 9], [0, 1]]}]]})
+    assert [tuple(c) for c in coords] == [(0, 0, 1), (1, 1, 2)]
+    assert get_coords({'points': [[5, 6]]})[1] == [0, 1]
+    assert [tuple(c) for c in get_coords({'x': 0, 'y': 0})[0]] == [(0, 0)]
+    assert get_coords({'x': 'NaN', 'y': 'NaN'})[1] == [0]
+    with pytest.raises(ValueError):
+        get_coords({'y': 5})
+    with pytest.raises(ValueError):
+        get_coords('not json')
+
+
+def test_getesrijson():
+    coords = [(0, 0), (1, 1), (2, 0), (3, 3), (4, 4)]
+    assert get_esrijson(coords, [0, 2, 5]) == {'paths': [[[0, 0], [1, 1]], [[2, 0], [3, 3], [4, 4]]]}
+    assert get_esrijson(coords[:3], shape_type='Polygon', spatial_reference=2056) == {
+        'rings': [[[0, 0], [1, 1], [2, 0], [0, 0]]], 'spatialReference': {'wkid': 2056}
+    }
+    assert get_esrijson([(1, 2, 3)], shape_type='Point') == {'x': 1, 'y': 2, 'z': 3, 'hasZ': True}
+    assert get_esrijson([(1, 2, 3), (4, 5)], shape_type='Multipoint') == {'points': [[1, 2, 3], [4, 5, 0]],
+                                                                            'hasZ': True}
+    assert get_esrijson(*get_coords({'paths': [[[0, 0], [1, 1]], [[2, 0], [3, 3]]]})) == \
+        {'paths': [[[0, 0], [1, 1]], [[2, 0], [3, 3]]]}
+    with pytest.raises(ValueError):
+        get_esrijson(coords, shape_type='Point')
+    with pytest.raises(ValueError):
+        get_esrijson(coords, shape_type='Multipatch')
+    with pytest.raises(ValueError):
+        get_esrijson([(1, 'a')])
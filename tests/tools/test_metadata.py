@@ -0,0 +1,209 @@
+# coding: utf-8
+#
+# Copyright 2019 Geocom Informatik AG / VertiGIS
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pytest
+
+import gpf.tools.metadata as metadata
+
+
+def test_describe_cache(monkeypatch):
+    calls = []
+
+    def describe(element):
+        calls.append(element)
+        return object()
+
+    monkeypatch.setattr(metadata._arcpy, 'Describe', describe)
+    monkeypatch.setattr(metadata, 'CACHE_SIZE', 2)
+    metadata.invalidate()
+
+    fc = os.path.join('C:', 'test.gdb', 'fds', 'fc')
+    desc = metadata.Describe(fc)
+    assert metadata.Describe(fc.upper())._obj is desc._obj
+    assert len(calls) == 1
+    assert metadata.Describe(fc, cached=False)._obj is not desc._obj
+    assert len(calls) == 2
+
+    metadata.invalidate(os.path.join('C:', 'test.gdb'))
+    metadata.Describe(fc)
+    assert len(calls) == 3
+
+    fc_a = os.path.join('C:', 'test.gdb', 'a')
+    fc_b = os.path.join('C:', 'test.gdb', 'b')
+    metadata.Describe(fc_a)
+    metadata.Describe(fc_b)
+    metadata.Describe(fc)
+    assert len(calls) == 6
+
+    # Layers, table views and in-memory data are never cached
+    for element in ('pipes_lyr', os.path.join('C:', 'pipes.lyr'), os.path.join('in_memory', 'fc')):
+        metadata.Describe(element)
+        metadata.Describe(element)
+    assert len(calls) == 12
+    assert metadata.describe(fc_b) is metadata.describe(fc_b.upper())
+    assert len(calls) == 12
+
+    monkeypatch.setattr(metadata, 'CACHE_TTL', -1)
+    metadata.Describe(fc_a)
+    metadata.Describe(fc_a)
+    assert len(calls) == 14
+    metadata.invalidate()
+
+
+def test_count_many(monkeypatch):
+    class FakeDescribe(object):
+        catalogPath = os.path.join('C:', 'test.sde', 'owner.table')
+        name = 'OWNER.TABLE'
+        isVersioned = False
+
+    class FakeSQLExecute(object):
+        def __init__(self, workspace):
+            assert workspace == 'test.sde'
+
+        @staticmethod
+        def execute(sql):
+            queries.append(sql)
+            return [[2, 5.0, None]]
+
+    class FakeWorkspace(str):
+        is_remote = True
+
+    queries = []
+    monkeypatch.setattr(metadata, '_describe', lambda element, refresh=False: FakeDescribe())
+    monkeypatch.setattr(metadata._paths, 'get_workspace', lambda path, root=False: FakeWorkspace('test.sde'))
+    monkeypatch.setattr(metadata._arcpy, 'ArcSDESQLExecute', FakeSQLExecute)
+    desc = metadata.Describe(FakeDescribe.catalogPath)
+    assert desc.count_many([]) == []
+    assert desc.count_many(['A = 1', 'B > 2', 'C IS NULL']) == [2, 5, 0]
+    assert queries == ['SELECT SUM(CASE WHEN A = 1 THEN 1 ELSE 0 END), SUM(CASE WHEN B > 2 THEN 1 ELSE 0 END), '
+                       'SUM(CASE WHEN C IS NULL THEN 1 ELSE 0 END) FROM OWNER.TABLE']
+    with pytest.raises(ValueError):
+        desc.count_many([1])
+
+
+
+def test_count_many_cursor(monkeypatch):
+    class FakeDescObject(object):
+        OIDFieldName = 'OBJECTID'
+        catalogPath = os.path.join('C:', 'data', 'test.gdb', 'pipes')
+        isVersioned = False
+
+    class FakeCursor(object):
+        rows = [(1, 'a', 'x'), (2, 'b', 'x'), (3, 'b', None), (4, None, 'y')]
+        opened = []
+
+        def __init__(self, table_path, field_names, where_clause=None, **kwargs):
+            self.opened.append((field_names, where_clause))
+            self._fields = field_names
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            pass
+
+        def fetch_batches(self, size=2):
+            # Only the OID@ field is supported by the fake cursor if a where clause is used
+            if self._fields == 'OID@':
+                rows = [r for r in self.rows if r[1] == 'b']
+            else:
+                rows = [r[:len(self._fields)] for r in self.rows]
+            for i in xrange(0, len(rows), size):
+                yield rows[i:i + size]
+
+    monkeypatch.setattr(metadata, '_describe', lambda element, refresh=False: FakeDescObject())
+    monkeypatch.setattr(metadata._cursors, 'SearchCursor', FakeCursor)
+    desc = metadata.Describe(FakeDescObject.catalogPath)
+
+    # All where clauses are evaluated in a single pass
+    assert desc.count_many(['A > 1', "B = 'b'", 'C IS NULL OR A = 1']) == [3, 2, 2]
+    assert FakeCursor.opened == [(['A', 'B', 'C'], "(A > 1) OR (B = 'b') OR (C IS NULL OR A = 1)")]
+
+    # Unsupported where clauses are counted separately
+    del FakeCursor.opened[:]
+    assert desc.count_many(['A > 1', "UPPER(B) = 'B'", "B = 'b'"]) == [3, 2, 2]
+    assert FakeCursor.opened == [(['A', 'B'], "(A > 1) OR (B = 'b')"), ('OID@', "UPPER(B) = 'B'")]
+
+    # An empty where clause reads all rows
+    del FakeCursor.opened[:]
+    assert desc.count_many(['', 'A <= 2']) == [4, 2]
+    assert FakeCursor.opened == [(['A'], None)]
+
+
+def test_oid_range(monkeypatch):
+    class FakeDescObject(object):
+        OIDFieldName = 'OBJECTID'
+        catalogPath = None
+
+    class FakeCursor(object):
+        # The fake cursor ignores the ORDER BY clause, like a shapefile or dBASE table
+        rows = [(5, ), (2, ), (9, ), (3, ), (7, )]
+        opened = []
+
+        def __init__(self, table_path, field_names, where_clause=None, **kwargs):
+            self.opened.append(kwargs)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            pass
+
+        def __iter__(self):
+            return iter(self.rows)
+
+        def fetch_batches(self, size=2):
+            for i in xrange(0, len(self.rows), size):
+                yield self.rows[i:i + size]
+
+    monkeypatch.setattr(metadata, '_describe', lambda element, refresh=False: FakeDescObject())
+    monkeypatch.setattr(metadata._cursors, 'SearchCursor', FakeCursor)
+
+    FakeDescObject.catalogPath = os.path.join('C:', 'data', 'pipes.shp')
+    assert metadata.Describe(FakeDescObject.catalogPath).get_oid_range() == (2, 9)
+    assert FakeCursor.opened == [{}]
+
+    del FakeCursor.opened[:]
+    FakeDescObject.catalogPath = os.path.join('C:', 'data', 'test.gdb', 'pipes')
+    metadata.Describe(FakeDescObject.catalogPath).get_oid_range()
+    assert [kwargs['sql_clause'][1] for kwargs in FakeCursor.opened] == [
+        'ORDER BY OBJECTID ASC', 'ORDER BY OBJECTID DESC'
+    ]
+
+    FakeDescObject.OIDFieldName = None
+    assert metadata.Describe(FakeDescObject.catalogPath).get_oid_range() == (None, None)
+
+
+def test_partitions(monkeypatch):
+    class FakeDescObject(object):
+        OIDFieldName = 'OBJECTID'
+        catalogPath = os.path.join('C:', 'data', 'test.gdb', 'pipes')
+
+    monkeypatch.setattr(metadata, '_describe', lambda element, refresh=False: FakeDescObject())
+    monkeypatch.setattr(metadata.Describe, 'get_oid_range', lambda self: (1, 10))
+    monkeypatch.setattr(metadata._q._arcpy, 'AddFieldDelimiters', lambda datasource, field: field)
+    monkeypatch.setattr(metadata._q, '_delimiters', {})
+    desc = metadata.Describe(FakeDescObject.catalogPath)
+    assert desc.get_partitions(3) == [
+        u'OBJECTID BETWEEN 1 AND 4', u'OBJECTID BETWEEN 5 AND 7', u'OBJECTID BETWEEN 8 AND 10'
+    ]
+    assert desc.get_partitions(2, 'A = 1') == [
+        u'(A = 1) AND OBJECTID BETWEEN 1 AND 5', u'(A = 1) AND OBJECTID BETWEEN 6 AND 10'
+    ]
+    monkeypatch.setattr(metadata.Describe, 'get_oid_range', lambda self: (None, None))
+    assert desc.get_partitions(3) == []
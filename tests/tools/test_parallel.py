@@ -0,0 +1,150 @@
+# coding: utf-8
+#
+# Copyright 2019 Geocom Informatik AG / VertiGIS
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from itertools import imap
+
+import pytest
+
+from gpf.tools import parallel
+
+ROWS = {oid: (oid * 3, None) for oid in xrange(1, 101)}
+
+
+def _get_rows(where_clause):
+    lower, upper = 1, 100
+    if where_clause:
+        lower, upper = (int(v) for v in re.search(r'BETWEEN (\d+) AND (\d+)', where_clause).groups())
+    return [(oid, ) + ROWS[oid] for oid in xrange(lower, upper + 1)]
+
+
+class FakeDescribe(object):
+
+    def __init__(self, element):
+        pass
+
+    @staticmethod
+    def get_partitions(num_parts, where_clause=None):
+        return ['OBJECTID BETWEEN {} AND {}'.format(i, i + 24) for i in xrange(1, 101, 25)]
+
+
+class FakeCursor(object):
+    """ Replacement for the Search- and UpdateCursor, which records the opened where clauses and updated rows. """
+
+    opened = []
+    updated = []
+
+    def __init__(self, table_path, field_names, where_clause=None, editor=None):
+        self.opened.append(where_clause)
+        self.rows = _get_rows(where_clause)
+        if field_names[0] != parallel._const.FIELD_OID:
+            self.rows = [row[1:] for row in self.rows]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def fetch_batches(self, size=10):
+        for i in xrange(0, len(self.rows), size):
+            yield self.rows[i:i + size]
+
+    def updateRow(self, row):
+        self.updated.append(tuple(row))
+
+
+class FakeEditor(object):
+
+    def __init__(self, path, chunk_size=0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class FakePool(object):
+    """ Runs the jobs serially in the current process, so that the test does not depend on fork(). """
+
+    def __init__(self, processes):
+        self.processes = processes
+
+    @staticmethod
+    def imap(func, iterable):
+        return imap(func, iterable)
+
+    def close(self):
+        pass
+
+    def terminate(self):
+        pass
+
+    def join(self):
+        pass
+
+
+def calc_status(values):
+    length, status = values
+    if length % 2:
+        return None
+    return length, 'short' if length < 100 else 'long'
+
+
+@pytest.fixture
+def fake_cursor(monkeypatch):
+    monkeypatch.setattr(FakeCursor, 'opened', [])
+    monkeypatch.setattr(FakeCursor, 'updated', [])
+    monkeypatch.setattr(parallel._cursors, 'SearchCursor', FakeCursor)
+    monkeypatch.setattr(parallel._cursors, 'UpdateCursor', FakeCursor)
+    return FakeCursor
+
+
+def test_write_part(fake_cursor):
+    updates = [(2, (6, 'short')), (4, (12, 'short')), (200, (600, 'long'))]
+    assert parallel._write_part('test', ['LENGTH', 'STATUS'], 'OBJECTID BETWEEN 1 AND 10', updates, None) == 2
+    assert fake_cursor.updated == [(2, 6, 'short'), (4, 12, 'short')]
+    assert parallel._write_part('test', ['LENGTH', 'STATUS'], None, [], None) == 0
+
+
+def test_compute_part(fake_cursor):
+    job = ('test', ['LENGTH', 'STATUS'], 'OBJECTID BETWEEN 31 AND 36', calc_status)
+    assert parallel._compute_part(job) == [(32, (96, 'short')), (34, (102, 'long')), (36, (108, 'long'))]
+
+
+def test_update_parallel(monkeypatch, fake_cursor):
+    monkeypatch.setattr(parallel._meta, 'Describe', FakeDescribe)
+    monkeypatch.setattr(parallel._cursors, 'Editor', FakeEditor)
+    monkeypatch.setattr(parallel._mp, 'Pool', FakePool)
+
+    # Serial update: row_func is applied in a single UpdateCursor
+    expected = [(oid, oid * 3, 'short' if oid * 3 < 100 else 'long') for oid in xrange(2, 101, 2)]
+    assert parallel.update_parallel('test', ['LENGTH', 'STATUS'], calc_status, processes=1) == 50
+    assert fake_cursor.updated == [row[1:] for row in expected]
+    assert fake_cursor.opened == [None]
+
+    # Parallel update: the (partitioned) table is read by the pool and the updates are written back by ObjectID range
+    del fake_cursor.updated[:]
+    assert parallel.update_parallel('test', ['LENGTH', 'STATUS'], calc_status, processes=2) == 50
+    assert fake_cursor.updated == expected
+
+    with pytest.raises(ValueError):
+        parallel.update_parallel('test', 'LENGTH', None)
@@ -16,6 +16,7 @@
 
 import pytest
 
+import gpf.tools.queries as queries
 from gpf.tools.queries import *
 
 
@@ -92,3 +93,81 @@ def test_add_kwargs():
     keywords = {'test': 0}
     assert add_where(keywords, Where('A').LessThan(4)) is None
     assert keywords == {'test': 0, 'where_clause': u'A < 4'}
+
+
+def test_partition():
+    assert [str(w) for w in partition('OBJECTID', 1, 10, 3)] == ['OBJECTID BETWEEN 1 AND 4',
+                                                                 'OBJECTID BETWEEN 5 AND 7',
+                                                                 'OBJECTID BETWEEN 8 AND 10']
+    assert [str(w) for w in partition('A', 5, 6, 4)] == ['A BETWEEN 5 AND 5', 'A BETWEEN 6 AND 6']
+    assert [str(w) for w in partition('A', 0, 99, 1)] == ['A BETWEEN 0 AND 99']
+    with pytest.raises(ValueError):
+        partition('A', 1, 10, 0)
+    with pytest.raises(ValueError):
+        partition('A', 10, 1, 2)
+
+
+def test_where_shared(monkeypatch):
+    calls = []
+
+    def add_delimiters(datasource, field):
+        calls.append(field)
+        return '"{}"'.format(field)
+
+    monkeypatch.setattr(queries._arcpy, 'AddFieldDelimiters', add_delimiters)
+    monkeypatch.setattr(queries, '_delimiters', {})
+    base = Where('A').Equals(1)
+    q1 = base.And('B').IsNull()
+    q2 = base.And('C').IsNull()
+    q1.delimit_fields('test.gdb')
+    assert str(q1) == '"A" = 1 AND "B" IS NULL'
+    assert str(base) == 'A = 1'
+    assert str(q2) == 'A = 1 AND C IS NULL'
+    q2.delimit_fields('test.gdb')
+    assert str(q2) == '"A" = 1 AND "C" IS NULL'
+    assert calls == ['A', 'B', 'C']
+    assert str(combine(q1).Or(base)) == '( "A" = 1 AND "B" IS NULL ) OR A = 1'
+    with pytest.raises(SyntaxError):
+        base.Equals(2)
+
+
+def test_split_in():
+    assert [str(w) for w in split_in('A', [5, 1, 3, 2, 1, 4], 2)] == ['A IN (1, 2)', 'A IN (3, 4)', 'A IN (5)']
+    assert [str(w) for w in split_in('B', xrange(3))] == ['B IN (0, 1, 2)']
+    assert split_in('C', []) == []
+    with pytest.raises(ValueError):
+        split_in('D', [1], 0)
+
+
+def test_compile_clause():
+    fields, predicate = compile_clause("A > 1 AND (\"B\" LIKE 'x%' OR [C] IN (1, 2, NULL))")
+    assert fields == ['A', 'B', 'C']
+    assert predicate((2, 'xyz', 5)) is True
+    assert predicate((2, 'abc', 1)) is True
+    assert predicate((2, 'abc', 5)) is None
+    assert predicate((0, 'xyz', 1)) is False
+    assert predicate((None, 'xyz', 1)) is None
+
+    fields, predicate = compile_clause("a BETWEEN -1 AND 1.5 AND NOT B IS NULL AND D <> 'it''s'", ['B'])
+    assert fields == ['B', 'a', 'D']
+    assert predicate(('', 0, 'its')) is True
+    assert predicate((None, 0, 'its')) is False
+    assert predicate(('', 2, 'its')) is False
+    assert predicate(('', 0, "it's")) is False
+
+    fields, predicate = compile_clause(Where('A').NotIn([1, 2]))
+    assert fields == ['A']
+    assert predicate((3, )) is True
+    assert predicate((None, )) is None
+
+    fields, predicate = compile_clause("A NOT LIKE 'a!%_' ESCAPE '!'")
+    assert predicate(('a%b', )) is False
+    assert predicate(('abb', )) is True
+
+    assert compile_clause('')[1](()) is True
+    with pytest.raises(ValueError):
+        compile_clause("UPPER(A) = 'X'")
+    with pytest.raises(ValueError):
+        compile_clause("A = 1 AND")
+    with pytest.raises(ValueError):
+        compile_clause("A = 'x'")[1]((1, ))
@@ -0,0 +1,59 @@
+# coding: utf-8
+#
+# Copyright 2019 Geocom Informatik AG / VertiGIS
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from gpf.paths import Workspace
+from gpf.tools import scanner
+
+
+class FakeCursor(object):
+
+    def __init__(self, table_path, field_names, where_clause=None):
+        if table_path.endswith('bad'):
+            raise RuntimeError('cannot open {}'.format(table_path))
+        self.rows = [(1, where_clause), (2, None)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+def count_rows(table_path, rows):
+    return sum(1 for _ in rows)
+
+
+def test_scan(monkeypatch):
+    monkeypatch.setattr(scanner._cursors, 'SearchCursor', FakeCursor)
+    ws = Workspace('in_memory')
+    ws_scanner = scanner.WorkspaceScanner(ws, 2, False)
+    finished = []
+    results = ws_scanner.scan(count_rows, ['OID@'], ['a', 'b', 'bad'], 'A = 1', finished.append)
+    assert results == finished
+    assert sorted((r.table, r.result, bool(r)) for r in results) == [
+        (ws.make_path('a'), 2, True), (ws.make_path('b'), 2, True), (ws.make_path('bad'), None, False)
+    ]
+    assert all(r.seconds >= 0 for r in results)
+    assert ws_scanner.scan(count_rows, tables=[]) == []
+    with pytest.raises(ValueError):
+        ws_scanner.scan(None)
+    with pytest.raises(ValueError):
+        scanner.WorkspaceScanner(ws, -1)
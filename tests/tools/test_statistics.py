@@ -0,0 +1,85 @@
+# coding: utf-8
+#
+# Copyright 2019 Geocom Informatik AG / VertiGIS
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+
+import pytest
+
+from gpf.tools import statistics as stats
+
+
+def test_fieldstats():
+    fs = stats.FieldStatistics(True, True)
+    for v in (3, 1, None, 2, 3):
+        fs.add(v)
+    assert (fs.count, fs.min, fs.max, fs.sum, fs.mean, fs.distinct) == (4, 1, 3, 9, 2.25, 3)
+    assert fs.histogram == {1: 1, 2: 1, 3: 2, None: 1}
+    fs = stats.FieldStatistics()
+    fs.add(u'b')
+    fs.add(u'a')
+    assert (fs.min, fs.max, fs.get(stats.SUM), fs.mean, fs.distinct, fs.histogram) == (u'a', u'b', None, None, None, None)
+    assert stats.FieldStatistics().get(stats.SUM) is None
+    with pytest.raises(ValueError):
+        fs.get('median')
+
+
+def test_statistics():
+    rows = [(u'A', 1.0, u'x'), (u'B', 2.0, u'y'), (u'A', 3.0, None)]
+    s = stats.Statistics({'value': (stats.MIN, stats.MEAN), 'name': stats.DISTINCT})
+    assert s.fields == ['name', 'value']
+    s = stats.Statistics(OrderedDict([('value', stats.MIN), ('name', stats.DISTINCT)]))
+    assert s.fields == ['value', 'name']
+    s = stats.Statistics({'VALUE': [stats.COUNT, stats.MAX], 'name': stats.HISTOGRAM}, group_by='group')
+    assert s.fields == ['group', 'name', 'VALUE']
+    s.update(row[:1] + (row[2], row[1]) for row in rows)
+    assert len(s) == 2
+    assert s.result() == {
+        u'A': {'VALUE': {stats.COUNT: 2, stats.MAX: 3.0}, 'name': {stats.HISTOGRAM: {u'x': 1, None: 1}}},
+        u'B': {'VALUE': {stats.COUNT: 1, stats.MAX: 2.0}, 'name': {stats.HISTOGRAM: {u'y': 1}}}
+    }
+    s = stats.Statistics(['value'])
+    assert s.result() == {'value': {stats.COUNT: 0, stats.MIN: None, stats.MAX: None, stats.SUM: None, stats.MEAN: None}}
+    s = stats.Statistics(['a', 'b'], ['a', 'B'])
+    assert s.fields == ['a', 'B']
+    s.add((1, 2))
+    assert s.result()[(1, 2)]['b'][stats.SUM] == 2
+    with pytest.raises(ValueError):
+        stats.Statistics([])
+    with pytest.raises(ValueError):
+        stats.Statistics({'a': 'median'})
+
+
+def test_histogram_bins():
+    fs = stats.FieldStatistics(True, True, 10)
+    for v in (3, 12, None, 19.5, -1, 12):
+        fs.add(v)
+    assert fs.histogram == {-10: 1, 0: 1, 10: 3, None: 1}
+    assert fs.distinct == 4
+    fs = stats.FieldStatistics(histogram=True, bins=[0, 1, 5])
+    for v in (-2, 0, 0.5, 3, 5, 100):
+        fs.add(v)
+    assert fs.histogram == {float('-inf'): 1, 0: 2, 1: 1, 5: 2}
+    with pytest.raises(ValueError):
+        fs.add(u'a')
+    for bins in (0, -1, [], [1, 1], [2, 1], 'a'):
+        with pytest.raises(ValueError):
+            stats.FieldStatistics(histogram=True, bins=bins)
+
+    s = stats.Statistics({'value': stats.HISTOGRAM}, bins={'VALUE': 2})
+    s.update([(1, ), (2, ), (3, ), (4, )])
+    assert s.result() == {'value': {stats.HISTOGRAM: {0: 1, 2: 2, 4: 1}}}
+    with pytest.raises(ValueError):
+        stats.Statistics({'value': stats.HISTOGRAM}, bins={'other': 2})